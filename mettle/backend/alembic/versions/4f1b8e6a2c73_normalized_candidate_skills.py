@@ -0,0 +1,93 @@
+"""normalized_candidate_skills
+
+Revision ID: 4f1b8e6a2c73
+Revises: e3a7c95d1f02
+Create Date: 2026-10-17 16:20:47.905316
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1b8e6a2c73'
+down_revision: Union[str, None] = 'e3a7c95d1f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn) -> None:
+    # Same interning rule as app.services.skills.skill_key
+    def key_of(name):
+        return " ".join(name.split()).casefold()
+
+    candidates = sa.table('candidates', sa.column('id', sa.String()), sa.column('skills', sa.Text()))
+    skills = sa.table('skills', sa.column('id', sa.Integer()), sa.column('name'), sa.column('key'))
+    links = sa.table('candidate_skills', sa.column('candidate_id', sa.String()), sa.column('skill_id'))
+
+    skill_ids = {}
+    last_id = None
+    while True:
+        query = sa.select(candidates.c.id, sa.cast(candidates.c.skills, sa.Text)).order_by(candidates.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(candidates.c.id > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        batch_links = []
+        for candidate_id, raw in rows:
+            names = json.loads(raw) if raw else None
+            seen = set()
+            for name in names if isinstance(names, list) else ():
+                if not isinstance(name, str) or not key_of(name) or key_of(name) in seen:
+                    continue
+                key = key_of(name)
+                seen.add(key)
+                if key not in skill_ids:
+                    skill_ids[key] = conn.execute(
+                        sa.insert(skills).values(name=" ".join(name.split()), key=key).returning(skills.c.id)
+                    ).scalar_one()
+                batch_links.append({'candidate_id': candidate_id, 'skill_id': skill_ids[key]})
+        if batch_links:
+            conn.execute(sa.insert(links), batch_links)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'skills',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key'),
+    )
+    op.create_table(
+        'candidate_skills',
+        sa.Column('candidate_id', sa.UUID(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('candidate_id', 'skill_id'),
+    )
+    op.create_index('ix_candidate_skills_skill_id_candidate_id', 'candidate_skills', ['skill_id', 'candidate_id'], unique=False)
+
+    _backfill(op.get_bind())
+
+    # Skill filters now go through candidate_skills
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_candidates_skills")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE INDEX ix_candidates_skills ON candidates USING gin ((skills::jsonb))")
+    op.drop_index('ix_candidate_skills_skill_id_candidate_id', table_name='candidate_skills')
+    op.drop_table('candidate_skills')
+    op.drop_table('skills')
@@ -0,0 +1,32 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 7c41e9a2d5b3
+Revises: 0342bfd8b348
+Create Date: 2026-10-17 09:12:40.215873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9a2d5b3'
+down_revision: Union[str, None] = '0342bfd8b348'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_candidates_created_at_id', 'candidates', ['created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_applications_applied_at_id', 'applications', ['applied_at', 'id'], unique=False)
+    op.create_index('ix_applications_job_id_applied_at_id', 'applications', ['job_id', 'applied_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_job_id_applied_at_id', table_name='applications')
+    op.drop_index('ix_applications_applied_at_id', table_name='applications')
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
+    op.drop_index('ix_candidates_created_at_id', table_name='candidates')
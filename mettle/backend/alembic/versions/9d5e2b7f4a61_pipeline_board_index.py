@@ -0,0 +1,29 @@
+"""pipeline_board_index
+
+Revision ID: 9d5e2b7f4a61
+Revises: 4f1b8e6a2c73
+Create Date: 2026-10-17 17:34:09.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d5e2b7f4a61'
+down_revision: Union[str, None] = '4f1b8e6a2c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_applications_job_id_stage_applied_at_id', 'applications',
+        ['job_id', 'stage', 'applied_at', 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_job_id_stage_applied_at_id', table_name='applications')
@@ -0,0 +1,80 @@
+"""recruiting_analytics_counters
+
+Revision ID: a4e8c2d7f916
+Revises: c6a1f3d8e205
+Create Date: 2026-10-17 20:11:08.264913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8c2d7f916'
+down_revision: Union[str, None] = 'c6a1f3d8e205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _counter_columns():
+    return [
+        sa.Column('created', sa.Integer(), nullable=False),
+        sa.Column('entered', sa.Integer(), nullable=False),
+        sa.Column('exited', sa.Integer(), nullable=False),
+        sa.Column('current', sa.Integer(), nullable=False),
+        sa.Column('seconds_in_stage', sa.Float(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Nullable first: SQLite cannot add a column with a non-constant default
+    op.add_column('applications', sa.Column('stage_entered_at', sa.DateTime(timezone=True), nullable=True))
+    # Best available guess for existing rows: the last write, usually the last stage move
+    op.execute("UPDATE applications SET stage_entered_at = updated_at")
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column(
+            'stage_entered_at',
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        )
+
+    op.create_table(
+        'job_stage_stats',
+        sa.Column('job_id', sa.UUID(), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id', 'source', 'stage'),
+    )
+    op.create_table(
+        'source_stage_stats',
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        *_counter_columns(),
+        sa.PrimaryKeyConstraint('source', 'stage'),
+    )
+
+    # Same starting point as app.services.analytics.rebuild: no transition
+    # history exists yet, so every application counts as created in its stage
+    op.execute(
+        "INSERT INTO job_stage_stats (job_id, source, stage, created, entered, exited, current, seconds_in_stage) "
+        "SELECT a.job_id, c.source, a.stage, count(*), count(*), 0, count(*), 0 "
+        "FROM applications a JOIN candidates c ON c.id = a.candidate_id "
+        "GROUP BY a.job_id, c.source, a.stage"
+    )
+    op.execute(
+        "INSERT INTO source_stage_stats (source, stage, created, entered, exited, current, seconds_in_stage) "
+        "SELECT source, stage, sum(created), sum(entered), sum(exited), sum(current), sum(seconds_in_stage) "
+        "FROM job_stage_stats GROUP BY source, stage"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('source_stage_stats')
+    op.drop_table('job_stage_stats')
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_column('stage_entered_at')
@@ -0,0 +1,50 @@
+"""unique_application_per_candidate_job
+
+Revision ID: b8d2f6c1a9e4
+Revises: 7c41e9a2d5b3
+Create Date: 2026-10-17 11:48:05.532104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f6c1a9e4'
+down_revision: Union[str, None] = '7c41e9a2d5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicates that slipped past the old check-then-insert, keeping the earliest
+    op.execute(
+        """
+        DELETE FROM applications WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY candidate_id, job_id ORDER BY applied_at, id
+                ) AS rn
+                FROM applications
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+    # Repair counters that lost concurrent read-modify-write increments
+    op.execute(
+        """
+        UPDATE jobs SET applicants_count = (
+            SELECT COUNT(*) FROM applications WHERE applications.job_id = jobs.id
+        )
+        """
+    )
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.create_unique_constraint('uq_applications_candidate_id_job_id', ['candidate_id', 'job_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_constraint('uq_applications_candidate_id_job_id', type_='unique')
@@ -0,0 +1,40 @@
+"""list_filter_indexes
+
+Revision ID: c6a1f3d8e205
+Revises: 9d5e2b7f4a61
+Create Date: 2026-10-17 19:02:41.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a1f3d8e205'
+down_revision: Union[str, None] = '9d5e2b7f4a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_candidates_status_created_at_id', 'candidates', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_candidates_source_created_at_id', 'candidates', ['source', 'created_at', 'id'], unique=False)
+    op.create_index('ix_candidates_location_created_at_id', 'candidates', ['location', 'created_at', 'id'], unique=False)
+    op.create_index('ix_candidates_score_id', 'candidates', ['score', 'id'], unique=False)
+    op.create_index('ix_candidates_status_score_id', 'candidates', ['status', 'score', 'id'], unique=False)
+    op.create_index('ix_candidates_experience_years_id', 'candidates', ['experience_years', 'id'], unique=False)
+    op.create_index('ix_jobs_status_created_at_id', 'jobs', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_department_created_at_id', 'jobs', ['department', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_department_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_status_created_at_id', table_name='jobs')
+    op.drop_index('ix_candidates_experience_years_id', table_name='candidates')
+    op.drop_index('ix_candidates_status_score_id', table_name='candidates')
+    op.drop_index('ix_candidates_score_id', table_name='candidates')
+    op.drop_index('ix_candidates_location_created_at_id', table_name='candidates')
+    op.drop_index('ix_candidates_source_created_at_id', table_name='candidates')
+    op.drop_index('ix_candidates_status_created_at_id', table_name='candidates')
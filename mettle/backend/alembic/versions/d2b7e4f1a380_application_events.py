@@ -0,0 +1,81 @@
+"""application_events
+
+Revision ID: d2b7e4f1a380
+Revises: a4e8c2d7f916
+Create Date: 2026-10-17 21:04:52.117390
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7e4f1a380'
+down_revision: Union[str, None] = 'a4e8c2d7f916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as the default of Settings.event_partition_months_ahead; the app's
+# background task creates later months (app.database.maintain_event_partitions)
+MONTHS_AHEAD = 3
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stages',
+        sa.Column('code', sa.SmallInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('code'),
+        sa.UniqueConstraint('name'),
+    )
+    # Board stages get the low codes, in board order, then every other stage in use
+    stages = sa.table('stages', sa.column('name', sa.String()))
+    op.bulk_insert(stages, [
+        {'name': name} for name in ('Applied', 'Screening', 'Interview', 'Offer', 'Hired', 'Rejected')
+    ])
+    op.execute(
+        "INSERT INTO stages (name) SELECT DISTINCT stage FROM applications "
+        "WHERE stage NOT IN (SELECT name FROM stages) ORDER BY stage"
+    )
+
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    op.create_table(
+        'application_events',
+        sa.Column('job_id', sa.UUID(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()') if is_postgres else sa.text("(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"), nullable=False),
+        sa.Column('application_id', sa.UUID(), nullable=False),
+        sa.Column('from_stage', sa.SmallInteger(), nullable=True),
+        sa.Column('to_stage', sa.SmallInteger(), nullable=False),
+        sa.Column('actor_id', sa.UUID(), nullable=True),
+        sa.PrimaryKeyConstraint('job_id', 'occurred_at', 'application_id'),
+        postgresql_partition_by='RANGE (occurred_at)',
+    )
+    if is_postgres:
+        op.execute("CREATE TABLE application_events_default PARTITION OF application_events DEFAULT")
+        today = datetime.now(timezone.utc).date()
+        for offset in range(MONTHS_AHEAD + 1):
+            start, end = _month_start(today, offset), _month_start(today, offset + 1)
+            op.execute(
+                f"CREATE TABLE application_events_{start:%Y_%m} PARTITION OF application_events "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+
+    # Existing applications start their history in their current stage
+    op.execute(
+        "INSERT INTO application_events (job_id, occurred_at, application_id, from_stage, to_stage) "
+        "SELECT a.job_id, a.stage_entered_at, a.id, NULL, s.code "
+        "FROM applications a JOIN stages s ON s.name = a.stage"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('application_events')
+    op.drop_table('stages')
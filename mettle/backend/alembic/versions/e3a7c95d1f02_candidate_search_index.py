@@ -0,0 +1,76 @@
+"""candidate_search_index
+
+Revision ID: e3a7c95d1f02
+Revises: b8d2f6c1a9e4
+Create Date: 2026-10-17 14:05:12.480391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c95d1f02'
+down_revision: Union[str, None] = 'b8d2f6c1a9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_EXPERIENCE = "(SELECT group_concat(value, ' ') FROM json_tree({row}.experience) WHERE type = 'text')"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # The generated column is computed for existing rows as it is added.
+        op.execute("""
+            ALTER TABLE candidates ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(role, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(summary, '')), 'C') ||
+                setweight(json_to_tsvector('simple', coalesce(experience, '[]'::json), '["string"]'), 'D')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_candidates_search_vector ON candidates USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_candidates_skills ON candidates USING gin ((skills::jsonb))")
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE candidates_fts USING fts5("
+        "name, role, summary, experience, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(f"""
+        CREATE TRIGGER candidates_fts_insert AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, name, role, summary, experience)
+            VALUES (new.rowid, new.name, new.role, new.summary, {FTS_EXPERIENCE.format(row='new')});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER candidates_fts_update AFTER UPDATE OF name, role, summary, experience ON candidates BEGIN
+            UPDATE candidates_fts SET name = new.name, role = new.role, summary = new.summary,
+                experience = {FTS_EXPERIENCE.format(row='new')}
+            WHERE rowid = new.rowid;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER candidates_fts_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = old.rowid;
+        END
+    """)
+    op.execute(f"""
+        INSERT INTO candidates_fts (rowid, name, role, summary, experience)
+        SELECT rowid, name, role, summary, {FTS_EXPERIENCE.format(row='candidates')} FROM candidates
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_candidates_skills', table_name='candidates')
+        op.drop_index('ix_candidates_search_vector', table_name='candidates')
+        op.drop_column('candidates', 'search_vector')
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS candidates_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS candidates_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS candidates_fts_insert")
+    op.execute("DROP TABLE IF EXISTS candidates_fts")
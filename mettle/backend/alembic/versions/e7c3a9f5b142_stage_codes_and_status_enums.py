@@ -0,0 +1,155 @@
+"""stage_codes_and_status_enums
+
+Revision ID: e7c3a9f5b142
+Revises: d2b7e4f1a380
+Create Date: 2026-10-17 22:38:15.530127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a9f5b142'
+down_revision: Union[str, None] = 'd2b7e4f1a380'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_PIPELINE_STAGES = ('Applied', 'Screening', 'Interview', 'Offer', 'Hired', 'Rejected')
+CANDIDATE_STATUSES = ('New', 'Screening', 'Interview', 'Offer', 'Hired', 'Rejected')
+JOB_STATUSES = ('Open', 'Closed', 'Draft')
+STATS_TABLES = {'job_stage_stats': ['job_id', 'source'], 'source_stage_stats': ['source']}
+COUNTERS = ['created', 'entered', 'exited', 'current', 'seconds_in_stage']
+
+
+def _stage_code():
+    return sa.SmallInteger().with_variant(sa.Integer(), 'sqlite')
+
+
+def _counter_columns():
+    return [
+        sa.Column('created', sa.Integer(), nullable=False),
+        sa.Column('entered', sa.Integer(), nullable=False),
+        sa.Column('exited', sa.Integer(), nullable=False),
+        sa.Column('current', sa.Integer(), nullable=False),
+        sa.Column('seconds_in_stage', sa.Float(), nullable=False),
+    ]
+
+
+def _swap_stats_table(name: str, to_codes: bool) -> None:
+    """Rebuild a stage counter table keyed by stage code (or back by name), copying its rows."""
+    keys = STATS_TABLES[name]
+    columns = {
+        'job_id': sa.Column('job_id', sa.UUID(), nullable=False),
+        'source': sa.Column('source', sa.String(length=50), nullable=False),
+    }
+    stage, old_stage = ('stage_code', 'stage') if to_codes else ('stage', 'stage_code')
+    foreign_keys = [sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE')] if 'job_id' in keys else []
+    op.create_table(
+        f'{name}_new',
+        *[columns[key] for key in keys],
+        sa.Column(stage, _stage_code() if to_codes else sa.String(length=50), nullable=False),
+        *_counter_columns(),
+        *foreign_keys,
+        sa.PrimaryKeyConstraint(*keys, stage),
+    )
+    selected = [f't.{key}' for key in keys] + ['s.code' if to_codes else 's.name'] + [f't.{counter}' for counter in COUNTERS]
+    op.execute(
+        f"INSERT INTO {name}_new ({', '.join([*keys, stage, *COUNTERS])}) "
+        f"SELECT {', '.join(selected)} FROM {name} t "
+        f"JOIN stages s ON {'s.name = t.stage' if to_codes else 's.code = t.stage_code'}"
+    )
+    op.drop_table(name)
+    op.rename_table(f'{name}_new', name)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"ALTER TABLE {name} RENAME CONSTRAINT {name}_new_pkey TO {name}_pkey")
+        if foreign_keys:
+            op.execute(f"ALTER TABLE {name} RENAME CONSTRAINT {name}_new_job_id_fkey TO {name}_job_id_fkey")
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    # Every stage in use gets a code (the previous revision interned those in use then)
+    op.execute(
+        "INSERT INTO stages (name) SELECT DISTINCT stage FROM applications "
+        "WHERE stage NOT IN (SELECT name FROM stages) ORDER BY stage"
+    )
+    op.add_column('applications', sa.Column('stage_code', _stage_code(), nullable=True))
+    op.execute("UPDATE applications SET stage_code = (SELECT code FROM stages WHERE stages.name = applications.stage)")
+    op.drop_index('ix_applications_job_id_stage_applied_at_id', table_name='applications')
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column('stage_code', existing_type=_stage_code(), nullable=False)
+        batch_op.create_foreign_key('fk_applications_stage_code_stages', 'stages', ['stage_code'], ['code'])
+        batch_op.drop_column('stage')
+    op.create_index(
+        'ix_applications_job_id_stage_code_applied_at_id', 'applications',
+        ['job_id', 'stage_code', 'applied_at', 'id'], unique=False,
+    )
+
+    for name in STATS_TABLES:
+        _swap_stats_table(name, to_codes=True)
+
+    op.create_table(
+        'job_pipeline_stages',
+        sa.Column('job_id', sa.UUID(), nullable=False),
+        sa.Column('stage_code', _stage_code(), nullable=False),
+        sa.Column('position', sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['stage_code'], ['stages.code']),
+        sa.PrimaryKeyConstraint('job_id', 'stage_code'),
+        sa.UniqueConstraint('job_id', 'position', name='uq_job_pipeline_stages_job_id_position'),
+    )
+    # Jobs with applications in other stages keep them: their own pipeline is
+    # the default one followed by those stages, by name
+    defaults = ', '.join(f"'{name}'" for name in DEFAULT_PIPELINE_STAGES)
+    custom_jobs = (
+        "SELECT DISTINCT a.job_id FROM applications a JOIN stages s ON s.code = a.stage_code "
+        f"WHERE s.name NOT IN ({defaults})"
+    )
+    for position, name in enumerate(DEFAULT_PIPELINE_STAGES):
+        op.execute(
+            "INSERT INTO job_pipeline_stages (job_id, stage_code, position) "
+            f"SELECT j.job_id, s.code, {position} FROM ({custom_jobs}) j JOIN stages s ON s.name = '{name}'"
+        )
+    op.execute(
+        "INSERT INTO job_pipeline_stages (job_id, stage_code, position) "
+        f"SELECT a.job_id, s.code, {len(DEFAULT_PIPELINE_STAGES)} - 1 + dense_rank() OVER ("
+        "  PARTITION BY a.job_id ORDER BY s.name"
+        ") FROM (SELECT DISTINCT job_id, stage_code FROM applications) a "
+        f"JOIN stages s ON s.code = a.stage_code WHERE s.name NOT IN ({defaults})"
+    )
+
+    if is_postgres:
+        # Four-byte enum values instead of varchar; indexes on status are rebuilt
+        for table, type_name, values in (
+            ('candidates', 'candidate_status', CANDIDATE_STATUSES),
+            ('jobs', 'job_status', JOB_STATUSES),
+        ):
+            sa.Enum(*values, name=type_name).create(op.get_bind())
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN status TYPE {type_name} USING status::{type_name}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, type_name in (('candidates', 'candidate_status'), ('jobs', 'job_status')):
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN status TYPE varchar(50) USING status::text")
+            op.execute(f"DROP TYPE {type_name}")
+
+    op.drop_table('job_pipeline_stages')
+    for name in STATS_TABLES:
+        _swap_stats_table(name, to_codes=False)
+
+    op.add_column('applications', sa.Column('stage', sa.String(length=50), nullable=True))
+    op.execute("UPDATE applications SET stage = (SELECT name FROM stages WHERE stages.code = applications.stage_code)")
+    op.drop_index('ix_applications_job_id_stage_code_applied_at_id', table_name='applications')
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column('stage', existing_type=sa.String(length=50), nullable=False)
+        batch_op.drop_constraint('fk_applications_stage_code_stages', type_='foreignkey')
+        batch_op.drop_column('stage_code')
+    op.create_index(
+        'ix_applications_job_id_stage_applied_at_id', 'applications',
+        ['job_id', 'stage', 'applied_at', 'id'], unique=False,
+    )
@@ -0,0 +1,35 @@
+"""application_source
+
+Revision ID: f1d4b8e2c690
+Revises: e7c3a9f5b142
+Create Date: 2026-10-18 09:12:44.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d4b8e2c690'
+down_revision: Union[str, None] = 'e7c3a9f5b142'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing applications take their candidate's source as it is now, which
+    # is what the stage counters were attributed to until this revision
+    op.add_column('applications', sa.Column('source', sa.String(length=50), nullable=True))
+    op.execute(
+        "UPDATE applications SET source = "
+        "(SELECT source FROM candidates WHERE candidates.id = applications.candidate_id)"
+    )
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column('source', existing_type=sa.String(length=50), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_column('source')
@@ -1,23 +1,153 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import ast
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from sqlalchemy import event, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
+from typing import AsyncGenerator, Dict, Optional, Tuple
 
 from app.config import settings
+from app.metrics import after_cursor_execute, before_cursor_execute, record_pool_wait
+from app.query_guard import query_guard
 
+logger = logging.getLogger(__name__)
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.is_development,
-    future=True,
+
+class PoolMetrics:
+    """Checkout-wait and in-use gauges for one engine's connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.total_wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def on_checkout(self, *args) -> None:
+        self.checkouts += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, *args) -> None:
+        self.in_use = max(0, self.in_use - 1)
+
+    def stats(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "avg_checkout_wait_ms": round(self.total_wait_seconds / self.waits * 1000, 3) if self.waits else 0.0,
+            "max_checkout_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.metrics.observe_wait(waited)
+            record_pool_wait(waited)
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def _engine_options(url: str) -> dict:
+    """Engine keyword arguments for `url` from the resolved pool settings."""
+    parsed = make_url(url)
+    options = {"echo": settings.db_echo, "future": True}
+    if parsed.get_backend_name() == "sqlite":
+        # Set rather than left to the dialect, whose default differs by
+        # driver (QueuePool for pysqlite files): a file database opens a
+        # connection per checkout, so concurrent writers queue on the file
+        # lock instead of a pool, and an in-memory one is a single shared
+        # connection or it would vanish between checkouts.
+        in_memory = parsed.database in (None, "", ":memory:")
+        options["poolclass"] = StaticPool if in_memory else NullPool
+        options["connect_args"] = {"timeout": 30}
+        return options
+
+    pool = settings.db_pool_options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=pool["pool_size"],
+        max_overflow=pool["max_overflow"],
+        pool_timeout=pool["pool_timeout"],
+        pool_recycle=pool["pool_recycle"],
+        pool_pre_ping=pool["pool_pre_ping"],
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args = {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+        if pool["statement_timeout_ms"]:
+            connect_args["server_settings"] = {"statement_timeout": str(pool["statement_timeout_ms"])}
+        options["connect_args"] = connect_args
+    return options
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # SQLite ignores FOREIGN KEY / ON DELETE clauses unless asked per connection.
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # WAL lets readers proceed while a writer holds the lock.
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    new_engine = create_async_engine(url, **_engine_options(url))
+    metrics = pool_metrics[name] = PoolMetrics()
+    if isinstance(new_engine.pool, InstrumentedAsyncQueuePool):
+        new_engine.pool.metrics = metrics
+    event.listen(new_engine.sync_engine, "checkout", metrics.on_checkout)
+    event.listen(new_engine.sync_engine, "checkin", metrics.on_checkin)
+    event.listen(new_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(new_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    if query_guard.enabled:
+        event.listen(new_engine.sync_engine, "before_cursor_execute", query_guard.before_cursor_execute)
+        event.listen(new_engine.sync_engine, "after_cursor_execute", query_guard.after_cursor_execute)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _configure_sqlite_connection)
+    return new_engine
+
+
+# Create async engines
+engine = _create_engine(settings.database_url, "primary")
+read_engine = (
+    _create_engine(settings.database_read_replica_url, "replica")
+    if settings.database_read_replica_url
+    else engine
 )
 
-# Session factory
+# Session factories
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -33,8 +163,181 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a read-only session, served by the read replica when configured.
+
+    Reads may lag the primary; routes that must observe their own writes should use get_db.
+    """
+    async with read_session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
+
+UNIQUE_VIOLATION = "unique"
+FOREIGN_KEY_VIOLATION = "foreign_key"
+
+_INTEGRITY_ERROR_CODES = {
+    "23505": UNIQUE_VIOLATION,
+    "23503": FOREIGN_KEY_VIOLATION,
+    "SQLITE_CONSTRAINT_UNIQUE": UNIQUE_VIOLATION,
+    "SQLITE_CONSTRAINT_PRIMARYKEY": UNIQUE_VIOLATION,
+    "SQLITE_CONSTRAINT_FOREIGNKEY": FOREIGN_KEY_VIOLATION,
+}
+
+
+def integrity_violation(exc: IntegrityError) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Classify an IntegrityError as (kind, constraint_name).
+
+    kind is UNIQUE_VIOLATION, FOREIGN_KEY_VIOLATION or None; the constraint
+    name is only reported by PostgreSQL.
+    """
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlite_errorname", None)
+    constraint = getattr(orig.__cause__, "constraint_name", None)
+    return _INTEGRITY_ERROR_CODES.get(code), constraint
+
+
+async def update_returning(db: AsyncSession, model, row_id, values: dict):
+    """
+    Apply `values` to the `model` row with primary key `row_id` and return it,
+    or None when there is no such row.
+
+    A single UPDATE ... RETURNING, so onupdate columns such as updated_at come
+    back without a follow-up SELECT; with no values it is a plain SELECT.
+    """
+    if values:
+        statement = update(model).where(model.id == row_id).values(**values).returning(model)
+    else:
+        statement = select(model).where(model.id == row_id)
+    result = await db.execute(statement)
+    return result.scalar_one_or_none()
+
+
+def pool_stats() -> dict:
+    """Pool status and checkout gauges for every engine."""
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    return {
+        name: {"status": db_engine.pool.status(), **pool_metrics[name].stats()}
+        for name, db_engine in engines.items()
+    }
+
+
 async def init_db() -> None:
-    """Initialize database tables."""
+    """
+    Initialize database tables with the default pipeline stages, and the
+    application event partitions on Postgres.
+    """
     from app.models.base import Base
+    from app.services.history import ensure_event_partitions
+    from app.services.stages import seed_default_stages
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await seed_default_stages(conn)
+        await ensure_event_partitions(conn, settings.event_partition_months_ahead)
+
+
+async def maintain_event_partitions(interval_seconds: float) -> None:
+    """
+    Create upcoming application event partitions now and every
+    `interval_seconds` after, for as long as the process runs. Started in
+    the background by the app on Postgres; a failed run is logged and
+    retried at the next interval.
+    """
+    from app.services.history import ensure_event_partitions
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await ensure_event_partitions(conn, settings.event_partition_months_ahead)
+        except Exception:
+            logger.exception("Creating application event partitions failed")
+        await asyncio.sleep(interval_seconds)
+
+
+# Migration scripts of the backend, wherever the process was started from
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+class SchemaRevisionError(RuntimeError):
+    """The database is not at the migration head this code expects."""
+
+
+def _revision_ids(value) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+def migration_heads() -> set:
+    """
+    Head revisions of the Alembic migration scripts, read from their
+    `revision` / `down_revision` assignments. Parsing beats loading the
+    scripts through Alembic, which imports every one of them, at startup.
+    """
+    revisions, parents = set(), set()
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        values = {}
+        # The identifiers sit in the module header, before any function
+        header = path.read_text().split("\ndef ", 1)[0]
+        for node in ast.parse(header).body:
+            target = node.target if isinstance(node, ast.AnnAssign) else (
+                node.targets[0] if isinstance(node, ast.Assign) else None
+            )
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                values[target.id] = ast.literal_eval(node.value)
+        revisions.update(_revision_ids(values.get("revision")))
+        parents.update(_revision_ids(values.get("down_revision")))
+    return revisions - parents
+
+
+async def verify_db(db_engine: Optional[AsyncEngine] = None) -> None:
+    """
+    Startup without DDL, for databases managed by `alembic upgrade`: check
+    the database (the primary engine's by default) is at the migration head
+    with one query. Event partitions are left to maintain_event_partitions,
+    off the startup path.
+
+    Raises SchemaRevisionError so a worker never serves against a schema it
+    does not match.
+    """
+    heads = migration_heads()
+    async with (db_engine or engine).connect() as conn:
+        try:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+        except Exception as exc:
+            raise SchemaRevisionError("Database has no Alembic revision; run `alembic upgrade head`") from exc
+        if current != heads:
+            raise SchemaRevisionError(
+                f"Database is at revision {', '.join(sorted(current)) or 'none'}, "
+                f"expected {', '.join(sorted(heads))}; run `alembic upgrade head`"
+            )
+
+
+async def _warm_engine(db_engine: AsyncEngine, connections: int) -> None:
+    from app.services.stages import default_stage_codes
+    async with AsyncExitStack() as stack:
+        # Hold every connection at once so the pool has to open each of them
+        opened = [await stack.enter_async_context(db_engine.connect()) for _ in range(connections)]
+        for conn in opened:
+            async with AsyncSession(bind=conn) as session:
+                await default_stage_codes(session)
+
+
+async def warm_pools() -> None:
+    """
+    Open the pool's connections before the first request and run the
+    stage code lookup on each: asyncpg prepares the statement per
+    connection, and the process-wide stage code cache gets filled.
+    SQLite opens connections on demand, so there only the cache is filled.
+    """
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    await asyncio.gather(*(
+        _warm_engine(db_engine, 1 if db_engine.dialect.name == "sqlite" else settings.db_pool_options["pool_size"])
+        for db_engine in engines
+    ))
@@ -9,8 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.services.principals import principal_cache, principal_from_claims
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 
 async def get_current_user(
@@ -19,6 +21,9 @@ async def get_current_user(
 ) -> User:
     """
     Validate the access token and returning the current user.
+
+    The user comes from token claims (when embedded) or the principal cache
+    before falling back to the database; both return a detached copy.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,10 +45,21 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    user = principal_from_claims(user_id, payload)
+    if user is not None:
+        return user
+    
+    issued_at = payload.get("iat")
+    generation = principal_cache.generation(user_id)
+    user = principal_cache.get(user_id, issued_at)
+    if user is not None:
+        return user
+    
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    principal_cache.put(user, issued_at, generation)
     return user
 
 
@@ -58,6 +74,20 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_actor_id(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[uuid.UUID]:
+    """
+    Id of the user behind the bearer token, if a valid one was sent, for
+    audit records on endpoints that do not require authentication. Only the
+    token signature is checked; the user is not looked up.
+    """
+    if not token:
+        return None
+    try:
+        return uuid.UUID(jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm]).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
 class RoleChecker:
     """
     Dependency for checking user roles.
@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER
+
+ETAG_HEADER = "ETag"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak validator over `parts`: equal parts, equal tag."""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def item_etag(row_id: Any, updated_at: datetime) -> str:
+    """ETag of a single resource, changing whenever its row is written."""
+    return weak_etag(row_id, updated_at.isoformat())
+
+
+def page_etag(request: Request, rows: Sequence[Any], response: Response) -> str:
+    """
+    ETag of a list page: the query string that picked it, the id and
+    updated_at of each row on it, and the cursor and total headers already
+    set on `response`.
+
+    Built from the loaded page, so revalidating costs the page query (flat
+    with keyset cursors) and the total, but no serialization. Writing a
+    listed row, or a row entering or leaving the page, changes the tag.
+    """
+    return weak_etag(
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        [(row.id, row.updated_at.isoformat()) for row in rows],
+        [response.headers.get(name) for name in (NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER)],
+    )
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored.
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag `response` with `etag` and Cache-Control.
+
+    Returns a 304 to send instead of the body when the request's
+    If-None-Match already names this representation, else None.
+    """
+    headers = {ETAG_HEADER: etag, "Cache-Control": settings.http_cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,19 +1,42 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import init_db
-from app.routers import jobs, candidates, applications, auth
+from app.database import engine, init_db, maintain_event_partitions, pool_stats, verify_db, warm_pools
+from app.http_cache import ETAG_HEADER
+from app.metrics import METRICS_CONTENT_TYPE, SERVER_TIMING_HEADER, RequestMetricsMiddleware, request_metrics
+from app.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_ESTIMATED_HEADER, TOTAL_COUNT_HEADER
+from app.query_guard import QueryGuardMiddleware, query_guard
+from app.services.passwords import hasher
+from app.services.principals import principal_cache
+from app.services.response_cache import response_cache
+from app.routers import jobs, candidates, applications, auth, analytics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup
-    await init_db()
+    # Startup: production databases are migrated ahead of the deploy, so
+    # workers only check the revision instead of each running create_all
+    if settings.startup_schema == "verify":
+        await verify_db()
+    else:
+        await init_db()
+    if settings.db_warm_pool:
+        await warm_pools()
+    partitions = None
+    if engine.dialect.name == "postgresql" and settings.event_partition_interval_seconds > 0:
+        partitions = asyncio.create_task(maintain_event_partitions(settings.event_partition_interval_seconds))
     yield
-    # Shutdown (cleanup if needed)
+    # Shutdown
+    if partitions is not None:
+        partitions.cancel()
+    hasher.shutdown()
+    if response_cache.backend is not None:
+        await response_cache.backend.close()
 
 
 app = FastAPI(
@@ -30,14 +53,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_ESTIMATED_HEADER,
+        ETAG_HEADER, SERVER_TIMING_HEADER,
+    ],
 )
 
+app.add_middleware(QueryGuardMiddleware, guard=query_guard)
+
+# Outermost, so request timings include the other middleware
+app.add_middleware(RequestMetricsMiddleware, collector=request_metrics)
+
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(candidates.router, prefix="/api/candidates", tags=["Candidates"])
 app.include_router(applications.router, prefix="/api/applications", tags=["Applications"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 
 
 @app.get("/")
@@ -52,5 +85,15 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": settings.environment,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "password_hashing": hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "database_pool": pool_stats(),
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request and connection pool metrics in the Prometheus text format."""
+    return Response(request_metrics.render(pool_stats()), media_type=METRICS_CONTENT_TYPE)
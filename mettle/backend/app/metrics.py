@@ -0,0 +1,230 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+SERVER_TIMING_HEADER = "Server-Timing"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds for latency, DB time and pool wait histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestTimings:
+    """Database work done on behalf of the request being served."""
+    db_seconds: float = 0.0
+    statements: int = 0
+    pool_wait_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_pool_wait(seconds: float) -> None:
+    """Charge a connection checkout wait to the current request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.pool_wait_seconds += seconds
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["request_metrics_started"] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    if timings is None:
+        return
+    started = conn.info.pop("request_metrics_started", None)
+    if started is not None:
+        timings.db_seconds += time.perf_counter() - started
+        timings.statements += 1
+
+
+class Histogram:
+    """Prometheus-style histogram: per-bucket counts, plus the sum of observations."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Bucket bounds are inclusive ("le"), hence bisect_left
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(le, count of observations <= le) for every bucket, ending with +Inf."""
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteMetrics:
+    """Histograms for one (method, route template)."""
+
+    def __init__(self):
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.db = Histogram(LATENCY_BUCKETS)
+        self.pool_wait = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+
+
+_HISTOGRAMS = (
+    ("mettle_http_request_duration_seconds", "duration", "Time from receiving a request to the end of its response."),
+    ("mettle_http_request_db_seconds", "db", "Time spent executing SQL statements per request."),
+    ("mettle_http_request_pool_wait_seconds", "pool_wait", "Time spent waiting for a pooled connection per request."),
+    ("mettle_http_request_db_statements", "statements", "SQL statements executed per request."),
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    """
+    Per-route request latency, DB time, statement count and pool wait,
+    collected in process and rendered in the Prometheus text format.
+
+    Routes are labelled by their path template (/api/jobs/{job_id}), so
+    cardinality stays bounded. Each worker process keeps its own numbers;
+    Prometheus scrapes and sums them per instance. Not thread-safe; updated
+    from the event loop only.
+    """
+
+    def __init__(self, enabled: bool = True, server_timing: bool = True):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, timings: RequestTimings) -> None:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.duration.observe(duration)
+        metrics.db.observe(timings.db_seconds)
+        metrics.pool_wait.observe(timings.pool_wait_seconds)
+        metrics.statements.observe(timings.statements)
+        response_key = (method, route, status)
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.responses.clear()
+
+    def render(self, pools: Optional[Dict[str, dict]] = None) -> str:
+        """The collected metrics, plus `pools` (as from pool_stats()), in the Prometheus text format."""
+        lines = [
+            "# HELP mettle_http_requests_total Responses sent, by route and status code.",
+            "# TYPE mettle_http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.responses.items()):
+            lines.append(f"mettle_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+        for name, attribute, help_text in _HISTOGRAMS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), metrics in sorted(self.routes.items()):
+                histogram = getattr(metrics, attribute)
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {count}")
+                labels = _labels(method=method, route=route)
+                lines.append(f"{name}_sum{labels} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{labels} {sum(histogram.counts)}")
+        if pools:
+            lines += _pool_lines(pools)
+        return "\n".join(lines) + "\n"
+
+
+_POOL_GAUGES = (
+    ("mettle_db_pool_checkouts_total", "counter", "checkouts", "Connections checked out of the pool."),
+    ("mettle_db_pool_in_use", "gauge", "in_use", "Connections currently checked out."),
+    ("mettle_db_pool_max_in_use", "gauge", "max_in_use", "Most connections checked out at once."),
+    ("mettle_db_pool_max_checkout_wait_ms", "gauge", "max_checkout_wait_ms", "Longest wait for a pooled connection."),
+)
+
+
+def _pool_lines(pools: Dict[str, dict]):
+    for name, kind, key, help_text in _POOL_GAUGES:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} {kind}"
+        for pool, stats in sorted(pools.items()):
+            yield f"{name}{_labels(pool=pool)} {stats[key]}"
+
+
+def server_timing(duration: float, timings: RequestTimings) -> str:
+    """Server-Timing header value: time so far, DB time (with statement count) and pool wait, in ms."""
+    return (
+        f"app;dur={duration * 1000:.1f}, "
+        f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.statements} statements", '
+        f"pool;dur={timings.pool_wait_seconds * 1000:.1f}"
+    )
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request into `collector`, with the
+    request's DB time, statement count and pool wait gathered by the
+    cursor and pool hooks above.
+
+    The Server-Timing header goes out with the response start, so for
+    streamed responses it covers the work done before the first chunk;
+    the histograms cover the whole response.
+    """
+
+    def __init__(self, app, collector: RequestMetrics):
+        self.app = app
+        self.collector = collector
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.collector.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.collector.server_timing:
+                    header = server_timing(time.perf_counter() - started, timings)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (SERVER_TIMING_HEADER.lower().encode(), header.encode()),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            self.collector.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - started,
+                timings,
+            )
+
+
+request_metrics = RequestMetrics(enabled=settings.request_metrics_enabled, server_timing=settings.server_timing_header)
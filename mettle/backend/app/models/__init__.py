@@ -3,5 +3,9 @@ from app.models.user import User
 from app.models.job import Job
 from app.models.candidate import Candidate
 from app.models.application import Application
+from app.models.skill import Skill, CandidateSkill
+from app.models.analytics import JobStageStats, SourceStageStats
+from app.models.stage import Stage, JobPipelineStage
+from app.models.application_event import ApplicationEvent
 
-__all__ = ["Base", "TimestampMixin", "User", "Job", "Candidate", "Application"]
+__all__ = ["Base", "TimestampMixin", "User", "Job", "Candidate", "Application", "Skill", "CandidateSkill", "JobStageStats", "SourceStageStats", "Stage", "JobPipelineStage", "ApplicationEvent"]
@@ -0,0 +1,53 @@
+import uuid
+from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+from app.models.stage import StageCode
+
+
+class StageCounters:
+    """
+    Application counters of one stage, kept in step with every application
+    write by app.services.analytics.
+
+    `entered` counts arrivals (creation or a move in) and `exited` moves out;
+    `seconds_in_stage` sums the time spent by the exited ones. Deleting an
+    application only lowers `current`, so the history stays intact.
+    """
+
+    created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    entered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    exited: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    current: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    seconds_in_stage: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+class JobStageStats(Base, StageCounters):
+    """Counters per job, candidate source and stage; removed with the job."""
+
+    __tablename__ = "job_stage_stats"
+
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)  # Candidate source when applying
+    stage_code: Mapped[int] = mapped_column(StageCode, primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<JobStageStats {self.job_id} {self.source} {self.stage_code}>"
+
+
+class SourceStageStats(Base, StageCounters):
+    """Counters per candidate source and stage across all jobs: the roll-up of JobStageStats."""
+
+    __tablename__ = "source_stage_stats"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    stage_code: Mapped[int] = mapped_column(StageCode, primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<SourceStageStats {self.source} {self.stage_code}>"
@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, DateTime
+from sqlalchemy import ForeignKey, DateTime, Index, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.models.base import Base, TimestampMixin
+from app.models.stage import StageCode
 
 if TYPE_CHECKING:
     from app.models.job import Job
@@ -16,6 +17,14 @@ class Application(Base, TimestampMixin):
     """Application linking candidates to jobs."""
     
     __tablename__ = "applications"
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "job_id", name="uq_applications_candidate_id_job_id"),
+        # Keyset pagination sort key, unfiltered and per job
+        Index("ix_applications_applied_at_id", "applied_at", "id"),
+        Index("ix_applications_job_id_applied_at_id", "job_id", "applied_at", "id"),
+        # Pipeline board: per-stage ranking within a job
+        Index("ix_applications_job_id_stage_code_applied_at_id", "job_id", "stage_code", "applied_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -34,12 +43,22 @@ class Application(Base, TimestampMixin):
         nullable=False,
         index=True,
     )
-    stage: Mapped[str] = mapped_column(String(50), default="Applied")  # Pipeline stage
+    # The candidate's source when they applied; analytics attribute the
+    # application to it, so later edits to the candidate move no counters
+    source: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Pipeline stage, as a code of the stages lookup table
+    stage_code: Mapped[int] = mapped_column(StageCode, ForeignKey("stages.code"), nullable=False)
     applied_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
         nullable=False,
     )
+    # When the application moved into its current stage, for time-in-stage analytics
+    stage_entered_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
     
     # Relationships
     candidate: Mapped["Candidate"] = relationship("Candidate", back_populates="applications")
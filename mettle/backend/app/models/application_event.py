@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, SmallInteger, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class ApplicationEvent(Base):
+    """
+    Append-only record of an application entering a stage.
+
+    Rows are never updated and outlive the application (no foreign keys).
+    The primary key leads with (job_id, occurred_at), the order a job's
+    history is read in, and on Postgres the table is range-partitioned by
+    month of occurred_at (see app.services.history).
+    """
+    
+    __tablename__ = "application_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+    
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+    )
+    application_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    from_stage: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)  # Stage code; null on creation
+    to_stage: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # Stage code
+    actor_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)  # Authenticated user, if any
+    
+    def __repr__(self) -> str:
+        return f"<ApplicationEvent {self.application_id} {self.from_stage} -> {self.to_stage}>"
@@ -1,6 +1,15 @@
 from datetime import datetime
 from sqlalchemy import DateTime, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
+from sqlalchemy.sql.functions import now
+
+
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw) -> str:
+    # CURRENT_TIMESTAMP has whole-second resolution, too coarse for updated_at
+    # based ETags; match the microsecond text SQLAlchemy writes for datetimes.
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
 
 
 class Base(DeclarativeBase):
@@ -11,13 +20,22 @@ class Base(DeclarativeBase):
 class TimestampMixin:
     """Mixin for created_at and updated_at timestamps."""
     
+    # Fetch the server-generated timestamps with INSERT/UPDATE ... RETURNING
+    # instead of a separate SELECT on next access.
+    __mapper_args__ = {"eager_defaults": True}
+    
+    # now() is also rendered into every INSERT, so SQLite tables built by
+    # migrations, whose DDL default is still CURRENT_TIMESTAMP, get the same
+    # sub-second timestamps as those built by create_all.
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        default=func.now(),
         server_default=func.now(),
         nullable=False,
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        default=func.now(),
         server_default=func.now(),
         onupdate=func.now(),
         nullable=False,
@@ -1,10 +1,11 @@
 import uuid
-from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Integer, JSON
+from typing import Optional, List, TYPE_CHECKING, get_args
+from sqlalchemy import DDL, Enum, String, Text, Integer, JSON, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.models.base import Base, TimestampMixin
+from app.schemas.candidate import CandidateStatus
 
 if TYPE_CHECKING:
     from app.models.application import Application
@@ -14,6 +15,17 @@ class Candidate(Base, TimestampMixin):
     """Candidate/applicant model."""
     
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Keyset pagination sort key
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        # List filters (equality prefix + default sort) and alternative sorts
+        Index("ix_candidates_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_candidates_source_created_at_id", "source", "created_at", "id"),
+        Index("ix_candidates_location_created_at_id", "location", "created_at", "id"),
+        Index("ix_candidates_score_id", "score", "id"),
+        Index("ix_candidates_status_score_id", "status", "score", "id"),
+        Index("ix_candidates_experience_years_id", "experience_years", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -27,7 +39,8 @@ class Candidate(Base, TimestampMixin):
     
     role: Mapped[str] = mapped_column(String(255), nullable=False)  # Applied position
     source: Mapped[str] = mapped_column(String(50), nullable=False)  # LinkedIn, GitHub, etc.
-    status: Mapped[str] = mapped_column(String(50), default="New")  # New, Screening, Interview, etc.
+    # Native enum on Postgres (4 bytes); plain string elsewhere
+    status: Mapped[str] = mapped_column(Enum(*get_args(CandidateStatus), name="candidate_status"), default="New")
     score: Mapped[int] = mapped_column(Integer, default=0)  # AI score 0-100
     
     location: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -48,7 +61,63 @@ class Candidate(Base, TimestampMixin):
         "Application",
         back_populates="candidate",
         cascade="all, delete-orphan",
+        # The foreign key cascades deletes; never load applications to delete them
+        passive_deletes=True,
     )
     
     def __repr__(self) -> str:
         return f"<Candidate {self.name}>"
+
+
+# Full-text search index over name/role/summary/experience, kept in step with
+# each row by the database itself: a generated, weighted tsvector column on
+# Postgres and an FTS5 table fed by triggers on SQLite. Only the string values
+# of the experience JSON are indexed, not its keys.
+SEARCH_INDEX_DDL = {
+    "postgresql": (
+        """
+        ALTER TABLE candidates ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(role, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(summary, '')), 'C') ||
+            setweight(json_to_tsvector('simple', coalesce(experience, '[]'::json), '["string"]'), 'D')
+        ) STORED
+        """,
+        "CREATE INDEX ix_candidates_search_vector ON candidates USING gin (search_vector)",
+    ),
+    "sqlite": (
+        # Keyed by the candidates rowid. VACUUM may renumber rowids of a table
+        # without an INTEGER PRIMARY KEY; re-run the backfill after one.
+        "CREATE VIRTUAL TABLE candidates_fts USING fts5("
+        "name, role, summary, experience, tokenize = 'unicode61 remove_diacritics 2')",
+        """
+        CREATE TRIGGER candidates_fts_insert AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, name, role, summary, experience)
+            VALUES (new.rowid, new.name, new.role, new.summary,
+                    (SELECT group_concat(value, ' ') FROM json_tree(new.experience) WHERE type = 'text'));
+        END
+        """,
+        """
+        CREATE TRIGGER candidates_fts_update AFTER UPDATE OF name, role, summary, experience ON candidates BEGIN
+            UPDATE candidates_fts SET name = new.name, role = new.role, summary = new.summary,
+                experience = (SELECT group_concat(value, ' ') FROM json_tree(new.experience) WHERE type = 'text')
+            WHERE rowid = new.rowid;
+        END
+        """,
+        """
+        CREATE TRIGGER candidates_fts_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = old.rowid;
+        END
+        """,
+    ),
+}
+SEARCH_INDEX_DROP_DDL = {
+    "sqlite": ("DROP TABLE IF EXISTS candidates_fts",),
+}
+
+for _dialect_name, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(Candidate.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect_name))
+for _dialect_name, _statements in SEARCH_INDEX_DROP_DDL.items():
+    for _statement in _statements:
+        event.listen(Candidate.__table__, "before_drop", DDL(_statement).execute_if(dialect=_dialect_name))
@@ -1,10 +1,11 @@
 import uuid
-from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Integer, JSON
+from typing import Optional, List, TYPE_CHECKING, get_args
+from sqlalchemy import Enum, String, Text, Integer, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.models.base import Base, TimestampMixin
+from app.schemas.job import JobStatus
 
 if TYPE_CHECKING:
     from app.models.application import Application
@@ -14,6 +15,13 @@ class Job(Base, TimestampMixin):
     """Job posting model."""
     
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination sort key
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        # List filters: equality prefix + default sort
+        Index("ix_jobs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_jobs_department_created_at_id", "department", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -24,7 +32,8 @@ class Job(Base, TimestampMixin):
     department: Mapped[str] = mapped_column(String(100), nullable=False)  # Engineering, Sales, etc.
     location: Mapped[str] = mapped_column(String(255), nullable=False)
     job_type: Mapped[str] = mapped_column(String(50), nullable=False)  # Full-time, Contract, Remote
-    status: Mapped[str] = mapped_column(String(50), default="Draft")  # Open, Closed, Draft
+    # Native enum on Postgres (4 bytes); plain string elsewhere
+    status: Mapped[str] = mapped_column(Enum(*get_args(JobStatus), name="job_status"), default="Draft")
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     requirements: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
     applicants_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -34,6 +43,8 @@ class Job(Base, TimestampMixin):
         "Application",
         back_populates="job",
         cascade="all, delete-orphan",
+        # The foreign key cascades deletes; never load applications to delete them
+        passive_deletes=True,
     )
     
     def __repr__(self) -> str:
@@ -0,0 +1,43 @@
+import uuid
+from sqlalchemy import String, Integer, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class Skill(Base):
+    """Interned skill name shared by every candidate listing it."""
+    
+    __tablename__ = "skills"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)  # Spelling first seen
+    key: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)  # Case/space-folded name
+    
+    def __repr__(self) -> str:
+        return f"<Skill {self.name}>"
+
+
+class CandidateSkill(Base):
+    """Candidate to skill link; Candidate.skills keeps the ordered list for display."""
+    
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # Skill -> candidates lookups; the primary key serves candidate -> skills
+        Index("ix_candidate_skills_skill_id_candidate_id", "skill_id", "candidate_id"),
+    )
+    
+    candidate_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("candidates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    skill_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("skills.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<CandidateSkill {self.candidate_id} -> {self.skill_id}>"
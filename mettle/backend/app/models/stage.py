@@ -0,0 +1,41 @@
+import uuid
+from sqlalchemy import ForeignKey, Integer, SmallInteger, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+# SQLite only auto-numbers an INTEGER PRIMARY KEY
+StageCode = SmallInteger().with_variant(Integer, "sqlite")
+
+
+class Stage(Base):
+    """Interned pipeline stage name; other tables store its smallint code instead of the text."""
+    
+    __tablename__ = "stages"
+    
+    code: Mapped[int] = mapped_column(StageCode, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<Stage {self.code} {self.name}>"
+
+
+class JobPipelineStage(Base):
+    """One stage of a job's own pipeline; jobs without any use the default pipeline."""
+    
+    __tablename__ = "job_pipeline_stages"
+    __table_args__ = (
+        UniqueConstraint("job_id", "position", name="uq_job_pipeline_stages_job_id_position"),
+    )
+    
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    stage_code: Mapped[int] = mapped_column(StageCode, ForeignKey("stages.code"), primary_key=True)
+    position: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # Board order
+    
+    def __repr__(self) -> str:
+        return f"<JobPipelineStage {self.job_id} {self.position}: {self.stage_code}>"
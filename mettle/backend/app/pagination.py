@@ -0,0 +1,197 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, String, and_, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+_NEXT = "n"
+_PREV = "p"
+
+
+@dataclass
+class Cursor:
+    """Decoded keyset position: the sort key of a boundary row and the paging direction."""
+    value: Any
+    id: UUID
+    direction: str = _NEXT
+
+
+def encode_cursor(value: Any, row_id: UUID, direction: str = _NEXT) -> str:
+    """Encode a keyset position (sort value and id) as an opaque, URL-safe token."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, str(row_id), direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, value_type: type = datetime) -> Cursor:
+    """
+    Decode a token produced by encode_cursor for a sort column of `value_type`,
+    rejecting anything malformed, or made for another sort, with a 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, row_id, direction = json.loads(raw)
+        if value_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif type(value) is not value_type:
+            raise TypeError(value)
+        cursor = Cursor(value, UUID(row_id), direction)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor.direction not in (_NEXT, _PREV):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor
+
+
+def _value_bounds(value: Any, dialect_name: str):
+    """
+    Return (lower, upper, equal) comparands for a cursor sort value.
+
+    SQLite stores timestamps as text: CURRENT_TIMESTAMP server defaults have no
+    fractional part while SQLAlchemy writes Python datetimes with microseconds,
+    so a whole-second value must match both spellings.
+    """
+    if dialect_name == "sqlite" and isinstance(value, datetime) and not value.microsecond:
+        short = literal(value.strftime("%Y-%m-%d %H:%M:%S"), String)
+        full = literal(value.strftime("%Y-%m-%d %H:%M:%S.%f"), String)
+        return short, full, [short, full]
+    return value, value, [value]
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_column: Any,
+    id_column: Any,
+    response: Response,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    scalars: bool = True,
+    descending: bool = True,
+) -> List[Any]:
+    """
+    Run a list query ordered by (sort_column, id_column), newest/largest
+    first unless `descending` is False. The sort column must be non-null.
+
+    Without a cursor this is plain offset pagination. With a cursor the page is
+    located by a keyset predicate on the composite sort key, so latency does not
+    grow with page depth. Cursors for the neighbouring pages are returned in the
+    X-Next-Cursor / X-Prev-Cursor response headers.
+
+    Pass scalars=False when `query` selects columns rather than one entity,
+    to get Row objects; the sort key columns must then be among them.
+    """
+    position = decode_cursor(cursor, sort_column.type.python_type) if cursor else None
+    backward = position is not None and position.direction == _PREV
+
+    if position is None:
+        order = (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+        query = query.order_by(*order).offset(skip)
+    else:
+        lower, upper, equal = _value_bounds(position.value, db.get_bind().dialect.name)
+        # Walking back through a descending list reads ascending, and vice versa
+        if descending != backward:
+            query = query.where(
+                and_(
+                    sort_column <= upper,
+                    or_(
+                        sort_column < lower,
+                        and_(sort_column.in_(equal), id_column < position.id),
+                    ),
+                )
+            ).order_by(sort_column.desc(), id_column.desc())
+        else:
+            query = query.where(
+                and_(
+                    sort_column >= lower,
+                    or_(
+                        sort_column > upper,
+                        and_(sort_column.in_(equal), id_column > position.id),
+                    ),
+                )
+            ).order_by(sort_column.asc(), id_column.asc())
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+
+    if rows:
+        def key(row):
+            return getattr(row, sort_column.key), getattr(row, id_column.key)
+
+        # Walking backwards always came from a later page; walking forwards has
+        # an earlier page whenever we started from a cursor or an offset.
+        has_next = True if backward else has_more
+        has_prev = has_more if backward else (position is not None or skip > 0)
+        if has_next:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]), _NEXT)
+        if has_prev:
+            response.headers[PREV_CURSOR_HEADER] = encode_cursor(*key(rows[0]), _PREV)
+    return rows
+
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, keeping its bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _estimated_rows(db: AsyncSession, query: Select) -> int:
+    plan = await db.scalar(_Explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def set_total_count(db: AsyncSession, query: Select, response: Response) -> None:
+    """
+    Set X-Total-Count to the number of rows matching the list `query`.
+
+    Rows are only counted up to settings.exact_count_limit, so the cost is
+    bounded whatever the table size. Past that, Postgres gives the planner's
+    estimate for the filtered query, flagged by X-Total-Count-Estimated;
+    other databases, used in development, count every row.
+    """
+    exact_limit = settings.exact_count_limit
+    matching = query.with_only_columns(literal(1), maintain_column_froms=True).order_by(None)
+    total = await db.scalar(select(func.count()).select_from(matching.limit(exact_limit + 1).subquery()))
+    if total > exact_limit:
+        if db.get_bind().dialect.name == "postgresql":
+            # Never report fewer rows than were just counted
+            total = max(await _estimated_rows(db, query), total)
+            response.headers[TOTAL_COUNT_ESTIMATED_HEADER] = "true"
+        else:
+            total = await db.scalar(select(func.count()).select_from(matching.subquery()))
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
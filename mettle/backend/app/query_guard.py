@@ -0,0 +1,170 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\$\d+|(?<![\w.])\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    The shape of a SQL statement: literals and bind parameters replaced by
+    ?, IN lists and multi-row VALUES collapsed to one (?), whitespace
+    normalized. Statements differing only in their values share a shape.
+    """
+    shape = _LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    shape = _ROW_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestQueries:
+    """Statements run while serving one request, by shape."""
+    method: str
+    path: str
+    shapes: Counter = field(default_factory=Counter)
+    slow: List[str] = field(default_factory=list)
+    scope: Optional[dict] = field(default=None, repr=False)
+
+    @property
+    def route(self) -> str:
+        """The matched route's path template once routing has run, else the request path."""
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else self.path
+
+    @property
+    def statements(self) -> int:
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(shape, times run) for each shape run more than `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """The plan of `statement`, from a separate connection so a failure cannot affect the request."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    raw = conn.engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    finally:
+        raw.rollback()
+        raw.close()
+
+
+class QueryGuard:
+    """
+    Development and test guard against N+1 queries and slow statements.
+
+    Fingerprints every statement run while serving a request. At the end of
+    the request, shapes run more than `repeat_threshold` times are logged
+    as suspected N+1 queries. Statements slower than `slow_query_ms` are
+    logged as they finish, with their plan when `explain` is set.
+
+    Off by default outside development and test; the cost is a regex per
+    new statement string and an extra connection per slow statement.
+    """
+
+    def __init__(self, enabled: bool, repeat_threshold: int = 5, slow_query_ms: float = 100.0, explain: bool = True):
+        self.enabled = enabled
+        self.repeat_threshold = repeat_threshold
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self._observers: List[Callable[[RequestQueries], None]] = []
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current.get() is not None:
+            conn.info["query_guard_started"] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        queries = _current.get()
+        if queries is None:
+            return
+        started = conn.info.pop("query_guard_started", None)
+        shape = fingerprint(statement)
+        queries.shapes[shape] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        if elapsed_ms > self.slow_query_ms:
+            queries.slow.append(shape)
+            self._log_slow(conn, statement, parameters, context, executemany, elapsed_ms, queries)
+
+    def _log_slow(self, conn, statement, parameters, context, executemany, elapsed_ms, queries) -> None:
+        plan = ""
+        streamed = context is not None and context.execution_options.get("stream_results")
+        if self.explain and not executemany and not streamed and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                plan = "\n" + _explain(conn, statement, parameters)
+            except Exception as exc:
+                plan = f"\n(EXPLAIN failed: {exc})"
+        logger.warning(
+            "Slow query in %s: %.1f ms (budget %.0f ms): %s%s",
+            queries, elapsed_ms, self.slow_query_ms, _WHITESPACE.sub(" ", statement).strip(), plan,
+        )
+
+    def finish(self, queries: RequestQueries) -> None:
+        for shape, count in queries.repeated(self.repeat_threshold):
+            logger.warning("Possible N+1 in %s: ran %d times: %s", queries, count, shape)
+        for observer in self._observers:
+            observer(queries)
+
+    @contextmanager
+    def observe(self) -> Iterator[List[RequestQueries]]:
+        """Collect the queries of every request finished inside the block."""
+        finished: List[RequestQueries] = []
+        self._observers.append(finished.append)
+        try:
+            yield finished
+        finally:
+            self._observers.remove(finished.append)
+
+
+class QueryGuardMiddleware:
+    """ASGI middleware giving each HTTP request its own RequestQueries for `guard` to fill."""
+
+    def __init__(self, app, guard: QueryGuard):
+        self.app = app
+        self.guard = guard
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.guard.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope["method"], scope["path"], scope=scope)
+        token = _current.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            self.guard.finish(queries)
+
+
+query_guard = QueryGuard(
+    enabled=settings.query_guard,
+    repeat_threshold=settings.query_guard_repeat_threshold,
+    slow_query_ms=settings.query_guard_slow_query_ms,
+    explain=settings.query_guard_explain,
+)
@@ -0,0 +1,39 @@
+from uuid import UUID
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.schemas.analytics import JobFunnel, SourceEffectiveness, StageTime
+from app.services import analytics
+
+router = APIRouter()
+
+
+@router.get("/funnel", response_model=JobFunnel)
+async def get_funnel(
+    job_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Stage funnel for one job, or across all jobs without `job_id`.
+
+    Read from the stage counters maintained on every application write, so
+    the cost depends on the number of stages and sources, not applications.
+    """
+    return await analytics.funnel(db, job_id)
+
+
+@router.get("/time-in-stage", response_model=List[StageTime])
+async def get_time_in_stage(
+    job_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Mean hours spent in each stage by applications that moved on, for one job or all jobs."""
+    return await analytics.time_in_stage(db, job_id)
+
+
+@router.get("/sources", response_model=List[SourceEffectiveness])
+async def get_source_effectiveness(db: AsyncSession = Depends(get_read_db)):
+    """Applications, hires and hire rate per candidate source."""
+    return await analytics.source_effectiveness(db)
@@ -1,91 +1,288 @@
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Iterable, List, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
+from app.config import settings
+from app.database import (
+    FOREIGN_KEY_VIOLATION,
+    UNIQUE_VIOLATION,
+    get_db,
+    get_read_db,
+    integrity_violation,
+)
+from app.http_cache import conditional_response, item_etag, page_etag
 from app.models.application import Application
-from app.models.job import Job
 from app.models.candidate import Candidate
-from app.schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse
+from app.models.job import Job
+from app.models.stage import Stage
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_total_count
+from app.schemas.application import (
+    ApplicationBulkDelete,
+    ApplicationBulkDeleteResult,
+    ApplicationBulkStageResult,
+    ApplicationBulkStageUpdate,
+    ApplicationCreate,
+    ApplicationResponse,
+    ApplicationUpdate,
+)
+from app.serialization import render_rows, response_columns
+from app.dependencies import get_actor_id
+from app.services import analytics, history
+from app.services.applicants import lock_applications, release_applicants
+from app.services.exports import query_export_response
+from app.services.response_cache import job_write_tags, response_cache
+from app.services.stages import default_stage_codes, literal_code, stage_allowed, stage_code_of, stage_codes
 
 router = APIRouter()
 
+# Applications store a stage code; responses carry the stage name, joined in
+_application_columns = response_columns(Application, ApplicationResponse, expressions={"stage": Stage.name})
+# What INSERT/UPDATE ... RETURNING can give back; the stage name is known to the caller
+_returned_columns = response_columns(
+    Application, ApplicationResponse, [name for name in ApplicationResponse.model_fields if name != "stage"]
+)
+
+
+def _with_stage_names(query):
+    return query.join(Stage, Stage.code == Application.stage_code)
+
+
+def _criteria(job_id: Optional[UUID], candidate_id: Optional[UUID], stage: Optional[str]) -> list:
+    criteria = []
+    if job_id:
+        criteria.append(Application.job_id == job_id)
+    if candidate_id:
+        criteria.append(Application.candidate_id == candidate_id)
+    if stage:
+        criteria.append(Application.stage_code == stage_code_of(stage))
+    return criteria
+
+
+def _not_in_pipeline(stages: Iterable[str]) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Stage not in the job's pipeline: {', '.join(sorted(stages))}")
+
+
+async def _stage_codes(db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+    """Codes of the stage `names`; a name no pipeline uses is rejected with a 400."""
+    names = set(names)
+    codes = await stage_codes(db, names)
+    if len(codes) < len(names):
+        raise _not_in_pipeline(names - set(codes))
+    return codes
+
 
 @router.get("", response_model=List[ApplicationResponse])
 async def list_applications(
+    request: Request,
+    response: Response,
     job_id: UUID = None,
     candidate_id: UUID = None,
     stage: str = None,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List applications with optional filtering by job, candidate, or stage."""
-    query = select(Application).order_by(Application.applied_at.desc())
-    
-    if job_id:
-        query = query.where(Application.job_id == job_id)
-    if candidate_id:
-        query = query.where(Application.candidate_id == candidate_id)
-    if stage:
-        query = query.where(Application.stage == stage)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    """
+    List applications with optional filtering by job, candidate, or stage.
+
+    Results are capped at `limit`; follow the X-Next-Cursor response header
+    (passed back as `cursor`) to fetch further pages. Honours If-None-Match.
+    X-Total-Count carries the number of matching applications, estimated
+    past settings.exact_count_limit on Postgres.
+    """
+    criteria = _criteria(job_id, candidate_id, stage)
+    query = _with_stage_names(select(*_application_columns)).where(*criteria)
+    applications = await paginate(
+        db, query, Application.applied_at, Application.id, response,
+        limit=limit, cursor=cursor, scalars=False,
+    )
+    await set_total_count(db, select(Application).where(*criteria), response)
+    not_modified = conditional_response(request, response, page_etag(request, applications, response))
+    if not_modified:
+        return not_modified
+    return render_rows(applications, response) if settings.fast_list_serialization else applications
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def export_applications(
+    file_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    job_id: UUID = None,
+    candidate_id: UUID = None,
+    stage: str = None,
+):
+    """Stream every matching application as CSV or NDJSON."""
+    columns = [
+        Stage.name.label("stage") if column is Application.__table__.c.stage_code else column
+        for column in Application.__table__.c
+    ]
+    query = _with_stage_names(select(*columns)).where(*_criteria(job_id, candidate_id, stage))
+    return query_export_response(query, file_format, "applications")
 
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
-async def get_application(application_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Get a single application by ID."""
-    result = await db.execute(select(Application).where(Application.id == application_id))
-    application = result.scalar_one_or_none()
+async def get_application(
+    application_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a single application by ID. Honours If-None-Match."""
+    result = await db.execute(_with_stage_names(select(*_application_columns)).where(Application.id == application_id))
+    application = result.one_or_none()
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
-    return application
+    etag = item_etag(application.id, application.updated_at)
+    return conditional_response(request, response, etag) or application
 
 
 @router.post("", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_application(
     app_data: ApplicationCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
+    actor_id: Optional[UUID] = Depends(get_actor_id),
 ):
-    """Create a new application (link candidate to job)."""
-    # Verify job exists
-    job_result = await db.execute(select(Job).where(Job.id == app_data.job_id))
-    job = job_result.scalar_one_or_none()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    """
+    Create a new application (link candidate to job).
+
+    The insert relies on the foreign keys and the (candidate_id, job_id) unique
+    constraint instead of checking first. It reads the candidate's source
+    from the candidates row, so it inserts nothing when the candidate is
+    missing or the stage is not in the job's pipeline. The job's
+    applicants_count is bumped atomically in SQL so concurrent applies never
+    lose an update.
+    """
+    codes = await _stage_codes(db, [app_data.stage])
+    code = literal_code(codes[app_data.stage])
+    allowed = stage_allowed(app_data.job_id, code, await default_stage_codes(db))
+    try:
+        result = await db.execute(
+            insert(Application)
+            .from_select(
+                ["candidate_id", "job_id", "stage_code", "source"],
+                select(
+                    Candidate.id,
+                    literal(app_data.job_id, Application.job_id.type),
+                    code,
+                    Candidate.source,
+                ).where(Candidate.id == app_data.candidate_id, allowed),
+            )
+            .returning(*_returned_columns)
+        )
+        application = result.one_or_none()
+    except IntegrityError as exc:
+        await db.rollback()
+        kind, constraint = integrity_violation(exc)
+        if kind == UNIQUE_VIOLATION:
+            raise HTTPException(status_code=400, detail="Application already exists")
+        if kind == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(status_code=404, detail=await _missing_parent(db, app_data, constraint))
+        raise
+    if application is None:
+        job_exists = await db.scalar(select(Job.id).where(Job.id == app_data.job_id))
+        if not job_exists:
+            raise HTTPException(status_code=404, detail="Job not found")
+        candidate_exists = await db.scalar(select(Candidate.id).where(Candidate.id == app_data.candidate_id))
+        if not candidate_exists:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        raise _not_in_pipeline([app_data.stage])
+    await analytics.record_created(db, Application.id == application.id)
+    await history.record_created(db, Application.id == application.id, actor_id)
     
-    # Verify candidate exists
-    candidate_result = await db.execute(
-        select(Candidate).where(Candidate.id == app_data.candidate_id)
+    # Counter update last, so the job row lock is held only until commit
+    department = await db.scalar(
+        update(Job)
+        .where(Job.id == app_data.job_id)
+        .values(applicants_count=Job.applicants_count + 1)
+        .returning(Job.department)
+        .execution_options(synchronize_session=False)
     )
-    if not candidate_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    # Check for duplicate application
-    existing = await db.execute(
-        select(Application).where(
-            Application.candidate_id == app_data.candidate_id,
-            Application.job_id == app_data.job_id,
+    await response_cache.invalidate(job_write_tags(app_data.job_id, department), background_tasks)
+    return {**application._asdict(), "stage": app_data.stage}
+
+
+async def _missing_parent(db: AsyncSession, app_data: ApplicationCreate, constraint: str = None) -> str:
+    """Name the missing row behind a foreign key violation on applications."""
+    if constraint:
+        return "Job not found" if "job_id" in constraint else "Candidate not found"
+    # SQLite does not report which constraint failed; only reached on the error path.
+    job_exists = await db.scalar(select(Job.id).where(Job.id == app_data.job_id))
+    return "Candidate not found" if job_exists else "Job not found"
+
+
+def _stage_values(new_code) -> dict:
+    """UPDATE values moving applications to stage `new_code`; the stage clock restarts only on a change."""
+    return {
+        "stage_code": new_code,
+        "stage_entered_at": case(
+            (Application.stage_code != new_code, func.now()),
+            else_=Application.stage_entered_at,
+        ),
+    }
+
+
+@router.patch("/bulk", response_model=ApplicationBulkStageResult)
+async def bulk_update_stage(
+    bulk_data: ApplicationBulkStageUpdate,
+    db: AsyncSession = Depends(get_db),
+    actor_id: Optional[UUID] = Depends(get_actor_id),
+):
+    """
+    Move many applications between pipeline stages in one UPDATE ... RETURNING.
+
+    Explicit moves come back in request order, and ids matching no
+    application are listed in `not_found`. The moves are applied together
+    or not at all, and rejected if any targets a stage outside its job's
+    pipeline. Each application changing stage gets a history event.
+    """
+    defaults = await default_stage_codes(db)
+    if bulk_data.moves is None:
+        codes = await _stage_codes(db, [bulk_data.to_stage])
+        new_code = literal_code(codes[bulk_data.to_stage])
+        if not await db.scalar(select(stage_allowed(bulk_data.job_id, new_code, defaults))):
+            raise _not_in_pipeline([bulk_data.to_stage])
+        from_code = (await stage_codes(db, [bulk_data.from_stage])).get(bulk_data.from_stage)
+        if from_code is None:
+            return ApplicationBulkStageResult(updated=[])
+        condition = (Application.job_id == bulk_data.job_id) & (Application.stage_code == from_code)
+    else:
+        stages = {move.id: move.stage for move in bulk_data.moves}
+        codes = await _stage_codes(db, stages.values())
+        new_code = case(
+            {application_id: literal_code(codes[stage]) for application_id, stage in stages.items()},
+            value=Application.id,
         )
+        condition = Application.id.in_(list(stages)) & stage_allowed(Application.job_id, new_code, defaults)
+    await lock_applications(db, condition)
+    await analytics.record_stage_changes(db, condition, new_code)
+    await history.record_stage_changes(db, condition, new_code, actor_id)
+    statement = update(Application).where(condition).values(**_stage_values(new_code))
+    result = await db.execute(
+        statement.returning(*_returned_columns).execution_options(synchronize_session=False)
     )
-    if existing.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Application already exists")
+    updated = result.all()
     
-    application = Application(
-        candidate_id=app_data.candidate_id,
-        job_id=app_data.job_id,
-        stage=app_data.stage,
+    if bulk_data.moves is None:
+        return ApplicationBulkStageResult(updated=[{**row._asdict(), "stage": bulk_data.to_stage} for row in updated])
+    by_id = {row.id: {**row._asdict(), "stage": stages[row.id]} for row in updated}
+    not_updated = [application_id for application_id in stages if application_id not in by_id]
+    if not_updated:
+        # Only reached when some moves failed: tell disallowed stages from missing ids
+        disallowed = set((await db.scalars(select(Application.id).where(Application.id.in_(not_updated)))).all())
+        if disallowed:
+            raise _not_in_pipeline({stages[application_id] for application_id in disallowed})
+    return ApplicationBulkStageResult(
+        updated=[by_id[application_id] for application_id in stages if application_id in by_id],
+        not_found=not_updated,
     )
-    db.add(application)
-    
-    # Increment job applicants count
-    job.applicants_count += 1
-    
-    await db.flush()
-    await db.refresh(application)
-    return application
 
 
 @router.patch("/{application_id}", response_model=ApplicationResponse)
@@ -93,31 +290,70 @@ async def update_application(
     application_id: UUID,
     app_data: ApplicationUpdate,
     db: AsyncSession = Depends(get_db),
+    actor_id: Optional[UUID] = Depends(get_actor_id),
 ):
-    """Update application stage (for pipeline movements)."""
-    result = await db.execute(select(Application).where(Application.id == application_id))
-    application = result.scalar_one_or_none()
+    """
+    Update application stage (for pipeline movements), logging the move to
+    the job's history. The stage must be in the job's pipeline.
+    """
+    codes = await _stage_codes(db, [app_data.stage])
+    new_code = literal_code(codes[app_data.stage])
+    condition = (Application.id == application_id) & stage_allowed(
+        Application.job_id, new_code, await default_stage_codes(db)
+    )
+    await lock_applications(db, condition)
+    await analytics.record_stage_changes(db, condition, new_code)
+    await history.record_stage_changes(db, condition, new_code, actor_id)
+    result = await db.execute(
+        update(Application).where(condition).values(**_stage_values(new_code)).returning(*_returned_columns)
+    )
+    application = result.one_or_none()
     if not application:
+        if await db.scalar(select(Application.id).where(Application.id == application_id)):
+            raise _not_in_pipeline([app_data.stage])
         raise HTTPException(status_code=404, detail="Application not found")
-    
-    application.stage = app_data.stage
-    await db.flush()
-    await db.refresh(application)
-    return application
+    return {**application._asdict(), "stage": app_data.stage}
+
+
+@router.delete("/bulk", response_model=ApplicationBulkDeleteResult)
+async def bulk_delete_applications(
+    bulk_data: ApplicationBulkDelete,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete many applications in one DELETE ... RETURNING. Ids matching no
+    application are listed in `not_found`.
+    """
+    ids = list(dict.fromkeys(bulk_data.ids))
+    condition = Application.id.in_(ids)
+    await lock_applications(db, condition)
+    await analytics.record_removed(db, condition)
+    jobs = await release_applicants(db, condition)
+    deleted = set((await db.scalars(delete(Application).where(condition).returning(Application.id))).all())
+    await response_cache.invalidate(
+        [tag for job_id, department in jobs for tag in job_write_tags(job_id, department)], background_tasks
+    )
+    return ApplicationBulkDeleteResult(
+        deleted=[application_id for application_id in ids if application_id in deleted],
+        not_found=[application_id for application_id in ids if application_id not in deleted],
+    )
 
 
 @router.delete("/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_application(application_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Delete an application."""
-    result = await db.execute(select(Application).where(Application.id == application_id))
-    application = result.scalar_one_or_none()
-    if not application:
+async def delete_application(
+    application_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete an application in one DELETE ... RETURNING, decrementing its job's applicants_count in SQL."""
+    condition = Application.id == application_id
+    await lock_applications(db, condition)
+    await analytics.record_removed(db, condition)
+    jobs = await release_applicants(db, condition)
+    deleted = await db.scalar(delete(Application).where(condition).returning(Application.id))
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Application not found")
-    
-    # Decrement job applicants count
-    job_result = await db.execute(select(Job).where(Job.id == application.job_id))
-    job = job_result.scalar_one_or_none()
-    if job and job.applicants_count > 0:
-        job.applicants_count -= 1
-    
-    await db.delete(application)
+    await response_cache.invalidate(
+        [tag for job_id, department in jobs for tag in job_write_tags(job_id, department)], background_tasks
+    )
@@ -4,52 +4,45 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from jose import jwt
-from passlib.context import CryptContext
 import uuid
 
-from app.database import get_db
+from app.database import UNIQUE_VIOLATION, get_db, integrity_violation
 from app.config import settings
 from app.models.user import User
 from app.schemas.auth import Token, UserCreate, UserResponse, PasswordResetRequest, PasswordResetConfirm
 from app.dependencies import get_current_user
+from app.services.passwords import get_password_hash, password_needs_rehash, verify_password
+from app.services.principals import token_claims
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    issued_at = datetime.utcnow()
+    expire = issued_at + (expires_delta or timedelta(minutes=15))
+    to_encode.update({"exp": expire, "iat": issued_at})
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
-    # Check if email exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash(user_data.password),
         full_name=user_data.full_name,
     )
     db.add(user)
-    await db.flush()
-    await db.refresh(user)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        await db.rollback()
+        if integrity_violation(exc)[0] == UNIQUE_VIOLATION:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise
     return user
 
 
@@ -62,15 +55,19 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made with an older cost factor while we have the plaintext
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(form_data.password)
+    
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data=token_claims(user),
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
     )
     return Token(access_token=access_token)
@@ -117,7 +114,7 @@ async def reset_password(request: PasswordResetConfirm, db: AsyncSession = Depen
     if user.reset_token_expires_at < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Token expired")
         
-    user.hashed_password = get_password_hash(request.new_password)
+    user.hashed_password = await get_password_hash(request.new_password)
     user.reset_token = None
     user.reset_token_expires_at = None
     
@@ -1,99 +1,277 @@
+from datetime import datetime
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 
-from app.database import get_db
+from app.config import settings
+from app.database import UNIQUE_VIOLATION, get_db, get_read_db, integrity_violation, update_returning
+from app.filtering import Filter, ListParams, ListSpec
+from app.http_cache import conditional_response, item_etag, page_etag
+from app.models.application import Application
 from app.models.candidate import Candidate
-from app.schemas.candidate import CandidateCreate, CandidateUpdate, CandidateResponse
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_total_count
+from app.schemas.candidate import (
+    CandidateBulkDelete,
+    CandidateBulkDeleteResult,
+    CandidateCreate,
+    CandidateImportReport,
+    CandidateResponse,
+    CandidateStatus,
+    CandidateSummary,
+    CandidateUpdate,
+    SourceType,
+)
+from app.serialization import parse_fields, projected_list_adapter, render_rows, response_columns
+from app.services import analytics
+from app.services.applicants import lock_applications, release_applicants
+from app.services.candidates import CandidateImporter, candidate_values
+from app.services.exports import export_response
+from app.services.response_cache import (
+    ALL_CANDIDATES_TAG, CANDIDATE_LISTS_TAG, candidate_tag, job_write_tags, render_json, response_cache,
+)
+from app.services.search import search_candidates_query
+from app.services.skills import set_candidate_skills
 
 router = APIRouter()
 
+_candidate_adapter = TypeAdapter(CandidateResponse)
+_candidate_list_adapter = TypeAdapter(List[CandidateResponse])
+_candidate_summary_list_adapter = TypeAdapter(List[CandidateSummary])
+_candidate_columns = response_columns(Candidate, CandidateResponse)
+_summary_fields = tuple(CandidateSummary.model_fields)
 
-@router.get("", response_model=List[CandidateResponse])
+# Filter panel parameters, backed by (status|source|location, created_at, id)
+# and (score|experience_years, id) indexes
+CANDIDATE_LIST_SPEC = ListSpec(
+    filters={
+        "status_filter": Filter(Candidate.status, annotation=CandidateStatus),
+        "source": Filter(Candidate.source, annotation=SourceType),
+        "location": Filter(Candidate.location),
+        "score_min": Filter(Candidate.score, "gte", int, constraints={"ge": 0, "le": 100}),
+        "score_max": Filter(Candidate.score, "lte", int, constraints={"ge": 0, "le": 100}),
+        "experience_min": Filter(Candidate.experience_years, "gte", int, "Minimum years of experience", {"ge": 0}),
+        "experience_max": Filter(Candidate.experience_years, "lte", int, "Maximum years of experience", {"ge": 0}),
+        "created_after": Filter(Candidate.created_at, "gte", datetime),
+        "created_before": Filter(Candidate.created_at, "lt", datetime),
+    },
+    sorts={
+        "created_at": Candidate.created_at,
+        "updated_at": Candidate.updated_at,
+        "score": Candidate.score,
+        "experience_years": Candidate.experience_years,
+    },
+    default_sort="-created_at",
+)
+
+
+@router.get("", response_model=Union[List[CandidateResponse], List[CandidateSummary]])
 async def list_candidates(
+    request: Request,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    params: ListParams = Depends(CANDIDATE_LIST_SPEC.dependency),
+    fields: List[str] = Query([], description="Candidate fields to return, repeated or comma-separated"),
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List all candidates with optional filtering and sorting.
+
+    Pass an X-Next-Cursor / X-Prev-Cursor header value as `cursor` for keyset
+    pagination; `skip` is ignored in that mode. Cursors belong to the sort
+    they were issued for. X-Total-Count carries the number of matching
+    candidates, estimated past settings.exact_count_limit on Postgres.
+    Honours If-None-Match. Responses are cached per query string until any
+    candidate is written.
+
+    `view=summary` returns CandidateSummary items for list views; `fields`
+    picks any subset of CandidateResponse fields instead (`id` is always
+    included). Columns outside the chosen fields, such as the summary text
+    and the experience/education/certifications JSON, are not read.
+    """
+    if fields and view != "full":
+        raise HTTPException(status_code=400, detail="Pass either fields or view, not both")
+    selected = _summary_fields if view == "summary" else parse_fields(fields, CandidateResponse) if fields else None
+    if selected is None:
+        adapter = _candidate_list_adapter
+    elif view == "summary":
+        adapter = _candidate_summary_list_adapter
+    else:
+        adapter = projected_list_adapter(CandidateResponse, selected)
+    # The sort key is always read so paginate can build cursors, and
+    # updated_at for the page's ETag
+    always_read = (params.sort_column.key, "id", "updated_at")
+    loaded = None if selected is None else selected + tuple(
+        name for name in dict.fromkeys(always_read) if name not in selected
+    )
+    fast = settings.fast_list_serialization
+    
+    async def load() -> Response:
+        if fast:
+            query = select(*(response_columns(Candidate, CandidateResponse, loaded) if loaded else _candidate_columns))
+        else:
+            query = select(Candidate)
+        query = params.apply(query)
+        page_query = query
+        if loaded and not fast:
+            page_query = query.options(load_only(*(getattr(Candidate, name) for name in loaded)))
+        candidates = await paginate(
+            db, page_query, params.sort_column, Candidate.id, response,
+            limit=limit, cursor=cursor, skip=skip, scalars=not fast, descending=params.descending,
+        )
+        await set_total_count(db, query, response)
+        not_modified = conditional_response(request, response, page_etag(request, candidates, response))
+        if not_modified:
+            return not_modified
+        if fast:
+            return render_rows(candidates, response, selected)
+        return render_json(adapter, candidates, response)
+    
+    return await response_cache.serve(request, [CANDIDATE_LISTS_TAG, ALL_CANDIDATES_TAG], load)
+
+
+@router.get("/search", response_model=List[CandidateResponse])
+async def search_candidates(
+    q: Optional[str] = None,
+    skills: List[str] = Query([]),
+    skills_match: Literal["all", "any"] = "all",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Ranked full-text search over name, role, summary and experience.
+
+    `skills` may be repeated or comma-separated; `skills_match` decides
+    whether a candidate needs all of them or any one.
+    """
+    wanted = [skill.strip() for value in skills for skill in value.split(",") if skill.strip()]
+    if not (q and q.strip()) and not wanted:
+        raise HTTPException(status_code=400, detail="Provide a search query or at least one skill")
+    
+    query = search_candidates_query(db.get_bind().dialect.name, q, wanted, match_all=skills_match == "all")
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def export_candidates(
+    file_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
     status_filter: str = None,
     source: str = None,
-    db: AsyncSession = Depends(get_db),
 ):
-    """List all candidates with optional filtering."""
-    query = select(Candidate).order_by(Candidate.created_at.desc())
-    
+    """Stream every matching candidate as CSV or NDJSON."""
+    criteria = []
     if status_filter:
-        query = query.where(Candidate.status == status_filter)
+        criteria.append(Candidate.status == status_filter)
     if source:
-        query = query.where(Candidate.source == source)
-    
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+        criteria.append(Candidate.source == source)
+    return export_response(Candidate.__table__, criteria, file_format, "candidates")
 
 
 @router.get("/{candidate_id}", response_model=CandidateResponse)
-async def get_candidate(candidate_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Get a single candidate by ID."""
-    result = await db.execute(select(Candidate).where(Candidate.id == candidate_id))
-    candidate = result.scalar_one_or_none()
-    if not candidate:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    return candidate
+async def get_candidate(
+    candidate_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a single candidate by ID. Honours If-None-Match; cached until the candidate is written."""
+    async def load() -> Response:
+        result = await db.execute(select(Candidate).where(Candidate.id == candidate_id))
+        candidate = result.scalar_one_or_none()
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        etag = item_etag(candidate.id, candidate.updated_at)
+        return conditional_response(request, response, etag) or render_json(_candidate_adapter, candidate, response)
+    
+    return await response_cache.serve(request, [candidate_tag(candidate_id), ALL_CANDIDATES_TAG], load)
 
 
 @router.post("", response_model=CandidateResponse, status_code=status.HTTP_201_CREATED)
 async def create_candidate(
     candidate_data: CandidateCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new candidate."""
-    # Check if email exists
-    result = await db.execute(
-        select(Candidate).where(Candidate.email == candidate_data.email)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Candidate with this email already exists")
-    
-    # Calculate experience years from experience list
-    experience_years = len(candidate_data.experience) if candidate_data.experience else 0
-    
-    candidate = Candidate(
-        name=candidate_data.name,
-        email=candidate_data.email,
-        phone=candidate_data.phone,
-        photo_url=candidate_data.photo_url,
-        role=candidate_data.role,
-        source=candidate_data.source,
-        location=candidate_data.location,
-        skills=candidate_data.skills,
-        tags=candidate_data.skills[:3] if candidate_data.skills else [],
-        summary=candidate_data.summary,
-        experience=[exp.model_dump() for exp in candidate_data.experience] if candidate_data.experience else None,
-        education=[edu.model_dump() for edu in candidate_data.education] if candidate_data.education else None,
-        certifications=[cert.model_dump() for cert in candidate_data.certifications] if candidate_data.certifications else None,
-        experience_years=experience_years,
-        status="New",
-        score=0,
-    )
+    candidate = Candidate(**candidate_values(candidate_data))
     db.add(candidate)
-    await db.flush()
-    await db.refresh(candidate)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        await db.rollback()
+        if integrity_violation(exc)[0] == UNIQUE_VIOLATION:
+            raise HTTPException(status_code=400, detail="Candidate with this email already exists")
+        raise
+    if candidate.skills:
+        await set_candidate_skills(db, {candidate.id: candidate.skills}, replace=False)
+    await response_cache.invalidate([CANDIDATE_LISTS_TAG], background_tasks)
     return candidate
 
 
+@router.post(
+    "/bulk",
+    response_model=CandidateImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_import_candidates(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file_format: Optional[Literal["ndjson", "csv"]] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Bulk import candidates from a streamed NDJSON or CSV body, upserting on email.
+
+    Each NDJSON line (or CSV row after the header) is validated like
+    POST /api/candidates. In CSV, list columns take a JSON array or, for
+    skills, `;`-separated values. The format follows `format`, else the
+    Content-Type. Returns counts plus a per-row error report.
+    """
+    if file_format is None:
+        content_type = request.headers.get("content-type", "")
+        file_format = "csv" if content_type.startswith("text/csv") else "ndjson"
+    
+    importer = CandidateImporter(
+        db,
+        chunk_size=settings.bulk_import_chunk_size,
+        max_errors=settings.bulk_import_max_errors,
+    )
+    report = await importer.run(request.stream(), file_format)
+    if report.upserted:
+        await response_cache.invalidate([ALL_CANDIDATES_TAG], background_tasks)
+    return report
+
+
 @router.patch("/{candidate_id}", response_model=CandidateResponse)
 async def update_candidate(
     candidate_id: UUID,
     candidate_data: CandidateUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing candidate."""
-    result = await db.execute(select(Candidate).where(Candidate.id == candidate_id))
-    candidate = result.scalar_one_or_none()
-    if not candidate:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
     update_data = candidate_data.model_dump(exclude_unset=True)
     
     # Handle nested objects
@@ -104,20 +282,59 @@ async def update_candidate(
     if "certifications" in update_data and update_data["certifications"]:
         update_data["certifications"] = [cert.model_dump() if hasattr(cert, 'model_dump') else cert for cert in update_data["certifications"]]
     
-    for field, value in update_data.items():
-        setattr(candidate, field, value)
-    
-    await db.flush()
-    await db.refresh(candidate)
+    candidate = await update_returning(db, Candidate, candidate_id, update_data)
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    if "skills" in update_data:
+        await set_candidate_skills(db, {candidate.id: candidate.skills})
+    await response_cache.invalidate([candidate_tag(candidate.id), CANDIDATE_LISTS_TAG], background_tasks)
     return candidate
 
 
+@router.delete("/bulk", response_model=CandidateBulkDeleteResult)
+async def bulk_delete_candidates(
+    bulk_data: CandidateBulkDelete,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete many candidates in one DELETE ... RETURNING, like delete_candidate.
+    Ids matching no candidate are listed in `not_found`.
+    """
+    ids = list(dict.fromkeys(bulk_data.ids))
+    applications = Application.candidate_id.in_(ids)
+    await lock_applications(db, applications)
+    await analytics.record_removed(db, applications)
+    jobs = await release_applicants(db, applications)
+    deleted = set((await db.scalars(delete(Candidate).where(Candidate.id.in_(ids)).returning(Candidate.id))).all())
+    tags = [candidate_tag(candidate_id) for candidate_id in deleted] + [CANDIDATE_LISTS_TAG]
+    for job_id, department in jobs:
+        tags.extend(job_write_tags(job_id, department))
+    await response_cache.invalidate(tags, background_tasks)
+    return CandidateBulkDeleteResult(
+        deleted=[candidate_id for candidate_id in ids if candidate_id in deleted],
+        not_found=[candidate_id for candidate_id in ids if candidate_id not in deleted],
+    )
+
+
 @router.delete("/{candidate_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_candidate(candidate_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Delete a candidate."""
-    result = await db.execute(select(Candidate).where(Candidate.id == candidate_id))
-    candidate = result.scalar_one_or_none()
-    if not candidate:
+async def delete_candidate(
+    candidate_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a candidate in one DELETE ... RETURNING; their applications go
+    with them through the foreign key, taken off their jobs' counts first.
+    """
+    applications = Application.candidate_id == candidate_id
+    await lock_applications(db, applications)
+    await analytics.record_removed(db, applications)
+    jobs = await release_applicants(db, applications)
+    deleted = await db.scalar(delete(Candidate).where(Candidate.id == candidate_id).returning(Candidate.id))
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    await db.delete(candidate)
+    tags = [candidate_tag(candidate_id), CANDIDATE_LISTS_TAG]
+    for job_id, department in jobs:
+        tags.extend(job_write_tags(job_id, department))
+    await response_cache.invalidate(tags, background_tasks)
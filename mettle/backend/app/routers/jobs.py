@@ -1,49 +1,205 @@
+from datetime import datetime
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_read_db, update_returning
+from app.filtering import Filter, ListParams, ListSpec
+from app.http_cache import conditional_response, item_etag, page_etag
+from app.models.application import Application
 from app.models.job import Job
-from app.schemas.job import JobCreate, JobUpdate, JobResponse
+from app.models.stage import Stage
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_total_count
+from app.schemas.application import JobPipeline, JobStages, JobStagesUpdate
+from app.schemas.job import (
+    DepartmentType,
+    JobBulkDelete,
+    JobBulkDeleteResult,
+    JobCreate,
+    JobResponse,
+    JobStatus,
+    JobType,
+    JobUpdate,
+)
+from app.serialization import render_rows, response_columns
+from app.services import analytics, history
+from app.services.exports import query_export_response
+from app.services.pipeline import job_pipeline
+from app.services.stages import DEFAULT_PIPELINE_STAGES, pipeline_stages, set_pipeline_stages
+from app.services.response_cache import (
+    JOB_LISTS_TAG, job_list_tag, job_tag, job_write_tags, render_json, response_cache,
+)
 
 router = APIRouter()
 
+_job_adapter = TypeAdapter(JobResponse)
+_job_list_adapter = TypeAdapter(List[JobResponse])
+_job_columns = response_columns(Job, JobResponse)
+
+# Filter panel parameters; each equality filter has a (column, created_at, id) index
+JOB_LIST_SPEC = ListSpec(
+    filters={
+        "status_filter": Filter(Job.status, annotation=JobStatus),
+        "department": Filter(Job.department, annotation=DepartmentType),
+        "job_type": Filter(Job.job_type, annotation=JobType),
+        "location": Filter(Job.location),
+        "created_after": Filter(Job.created_at, "gte", datetime),
+        "created_before": Filter(Job.created_at, "lt", datetime),
+    },
+    sorts={
+        "created_at": Job.created_at,
+        "updated_at": Job.updated_at,
+        "applicants_count": Job.applicants_count,
+        "title": Job.title,
+    },
+    default_sort="-created_at",
+)
+
 
 @router.get("", response_model=List[JobResponse])
 async def list_jobs(
+    request: Request,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    status_filter: str = None,
-    department: str = None,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    params: ListParams = Depends(JOB_LIST_SPEC.dependency),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List all jobs with optional filtering."""
-    query = select(Job).order_by(Job.created_at.desc())
+    """
+    List all jobs with optional filtering and sorting.
+
+    Pass an X-Next-Cursor / X-Prev-Cursor header value as `cursor` for keyset
+    pagination; `skip` is ignored in that mode. Cursors belong to the sort
+    they were issued for. X-Total-Count carries the number of matching jobs,
+    estimated past settings.exact_count_limit on Postgres. Honours
+    If-None-Match. Responses are cached per query string until a job in the
+    listed department is written.
+    """
+    fast = settings.fast_list_serialization
     
-    if status_filter:
-        query = query.where(Job.status == status_filter)
-    if department:
-        query = query.where(Job.department == department)
+    async def load() -> Response:
+        query = params.apply(select(*_job_columns) if fast else select(Job))
+        jobs = await paginate(
+            db, query, params.sort_column, Job.id, response,
+            limit=limit, cursor=cursor, skip=skip, scalars=not fast, descending=params.descending,
+        )
+        await set_total_count(db, query, response)
+        not_modified = conditional_response(request, response, page_etag(request, jobs, response))
+        if not_modified:
+            return not_modified
+        return render_rows(jobs, response) if fast else render_json(_job_list_adapter, jobs, response)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    department = params.filters["department"] or None
+    return await response_cache.serve(request, [JOB_LISTS_TAG, job_list_tag(department)], load)
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Get a single job by ID."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    if not job:
+async def get_job(
+    job_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a single job by ID. Honours If-None-Match; cached until the job is written."""
+    async def load() -> Response:
+        result = await db.execute(select(Job).where(Job.id == job_id))
+        job = result.scalar_one_or_none()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        etag = item_etag(job.id, job.updated_at)
+        return conditional_response(request, response, etag) or render_json(_job_adapter, job, response)
+    
+    return await response_cache.serve(request, [job_tag(job_id)], load)
+
+
+@router.get("/{job_id}/pipeline", response_model=JobPipeline)
+async def get_job_pipeline(
+    job_id: UUID,
+    per_stage: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Pipeline board for a job: application counts for every stage plus the
+    `per_stage` most recent applications of each, with candidate details.
+    """
+    pipeline = await job_pipeline(db, job_id, per_stage)
+    if pipeline is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return pipeline
+
+
+async def _require_job(db: AsyncSession, job_id: UUID) -> None:
+    result = await db.execute(select(Job.id).where(Job.id == job_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
+def _job_stages(job_id: UUID, stages: List[str]) -> JobStages:
+    return JobStages(job_id=job_id, stages=stages, is_default=tuple(stages) == DEFAULT_PIPELINE_STAGES)
+
+
+@router.get("/{job_id}/stages", response_model=JobStages)
+async def get_job_stages(job_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    """The stages of a job's pipeline in board order: its own, or else the default pipeline."""
+    await _require_job(db, job_id)
+    return _job_stages(job_id, await pipeline_stages(db, job_id))
+
+
+@router.put("/{job_id}/stages", response_model=JobStages)
+async def set_job_stages(job_id: UUID, stages_data: JobStagesUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Replace a job's pipeline. Applications may only enter these stages from
+    now on; a stage still holding applications of the job cannot be dropped.
+    """
+    await _require_job(db, job_id)
+    codes = await set_pipeline_stages(db, job_id, stages_data.stages)
+    stranded = await db.scalars(
+        select(Stage.name)
+        .where(Stage.code.in_(
+            select(Application.stage_code)
+            .where(Application.job_id == job_id, Application.stage_code.not_in(list(codes.values())))
+        ))
+        .order_by(Stage.name)
+    )
+    stranded = stranded.all()
+    if stranded:
+        raise HTTPException(
+            status_code=400, detail=f"Stages still holding applications: {', '.join(stranded)}"
+        )
+    return _job_stages(job_id, stages_data.stages)
+
+
+@router.get(
+    "/{job_id}/history",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def stream_job_history(
+    job_id: UUID,
+    since: Optional[datetime] = None,
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Stream the stage history of a job's applications, oldest first: one
+    event per creation or stage change, optionally from `since` on.
+    """
+    await _require_job(db, job_id)
+    return query_export_response(history.job_history_query(job_id, since), file_format, f"job-{job_id}-history")
 
 
 @router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
-async def create_job(job_data: JobCreate, db: AsyncSession = Depends(get_db)):
+async def create_job(
+    job_data: JobCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
     """Create a new job posting."""
     job = Job(
         title=job_data.title,
@@ -56,7 +212,7 @@ async def create_job(job_data: JobCreate, db: AsyncSession = Depends(get_db)):
     )
     db.add(job)
     await db.flush()
-    await db.refresh(job)
+    await response_cache.invalidate(job_write_tags(job.id, job.department), background_tasks)
     return job
 
 
@@ -64,29 +220,57 @@ async def create_job(job_data: JobCreate, db: AsyncSession = Depends(get_db)):
 async def update_job(
     job_id: UUID,
     job_data: JobUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing job."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
+    values = job_data.model_dump(exclude_unset=True)
+    job = await update_returning(db, Job, job_id, values)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    update_data = job_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(job, field, value)
-    
-    await db.flush()
-    await db.refresh(job)
+    tags = job_write_tags(job.id, job.department)
+    if "department" in values:
+        # The old department's lists are stale too, but RETURNING only gives the new one
+        tags.append(JOB_LISTS_TAG)
+    await response_cache.invalidate(tags, background_tasks)
     return job
 
 
+@router.delete("/bulk", response_model=JobBulkDeleteResult)
+async def bulk_delete_jobs(
+    bulk_data: JobBulkDelete,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete many job postings in one DELETE ... RETURNING, like delete_job.
+    Ids matching no job are listed in `not_found`.
+    """
+    ids = list(dict.fromkeys(bulk_data.ids))
+    await analytics.record_jobs_removed(db, ids)
+    deleted = dict((await db.execute(delete(Job).where(Job.id.in_(ids)).returning(Job.id, Job.department))).all())
+    await response_cache.invalidate(
+        [tag for job_id, department in deleted.items() for tag in job_write_tags(job_id, department)],
+        background_tasks,
+    )
+    return JobBulkDeleteResult(
+        deleted=[job_id for job_id in ids if job_id in deleted],
+        not_found=[job_id for job_id in ids if job_id not in deleted],
+    )
+
+
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Delete a job posting."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-    if not job:
+async def delete_job(
+    job_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a job posting in one DELETE ... RETURNING; its applications and
+    pipeline go with it through the foreign keys, never loaded.
+    """
+    await analytics.record_jobs_removed(db, [job_id])
+    department = await db.scalar(delete(Job).where(Job.id == job_id).returning(Job.department))
+    if department is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    await db.delete(job)
+    await response_cache.invalidate(job_write_tags(job_id, department), background_tasks)
@@ -1,11 +1,24 @@
 from app.schemas.job import JobCreate, JobUpdate, JobResponse
-from app.schemas.candidate import CandidateCreate, CandidateUpdate, CandidateResponse
-from app.schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse
+from app.schemas.candidate import (
+    CandidateCreate, CandidateUpdate, CandidateResponse, CandidateImportError, CandidateImportReport,
+)
+from app.schemas.application import (
+    ApplicationCreate, ApplicationUpdate, ApplicationResponse,
+    ApplicationStageMove, ApplicationBulkStageUpdate, ApplicationBulkStageResult,
+    ApplicationBulkDelete, ApplicationBulkDeleteResult,
+    PipelineCandidate, PipelineCard, PipelineStage, JobPipeline, JobStagesUpdate, JobStages,
+)
+from app.schemas.analytics import FunnelStage, JobFunnel, StageTime, SourceEffectiveness
 from app.schemas.auth import Token, TokenData, UserCreate, UserLogin, UserResponse
 
 __all__ = [
     "JobCreate", "JobUpdate", "JobResponse",
     "CandidateCreate", "CandidateUpdate", "CandidateResponse",
+    "CandidateImportError", "CandidateImportReport",
     "ApplicationCreate", "ApplicationUpdate", "ApplicationResponse",
+    "ApplicationStageMove", "ApplicationBulkStageUpdate", "ApplicationBulkStageResult",
+    "ApplicationBulkDelete", "ApplicationBulkDeleteResult",
+    "PipelineCandidate", "PipelineCard", "PipelineStage", "JobPipeline", "JobStagesUpdate", "JobStages",
+    "FunnelStage", "JobFunnel", "StageTime", "SourceEffectiveness",
     "Token", "TokenData", "UserCreate", "UserLogin", "UserResponse",
 ]
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+
+
+class FunnelStage(BaseModel):
+    """How many applications reached a stage and how many are still in it."""
+    stage: str
+    entered: int
+    current: int
+    share_of_applications: Optional[float] = None
+    # entered / entered of the previous progression stage; None for Rejected and custom stages
+    conversion_from_previous: Optional[float] = None
+
+
+class JobFunnel(BaseModel):
+    """Stage funnel of one job, or of every job when job_id is null."""
+    job_id: Optional[UUID] = None
+    applications: int
+    stages: List[FunnelStage]
+
+
+class StageTime(BaseModel):
+    """Mean time spent in a stage by the applications that have left it."""
+    stage: str
+    exited: int
+    current: int
+    average_hours: Optional[float] = None
+
+
+class SourceEffectiveness(BaseModel):
+    """Applications and hires attributed to one candidate source."""
+    source: str
+    applications: int
+    hires: int
+    in_pipeline: int
+    hire_rate: Optional[float] = None
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -20,6 +21,33 @@ class ApplicationUpdate(BaseModel):
     stage: str
 
 
+class ApplicationStageMove(BaseModel):
+    """Move one application to a stage."""
+    id: UUID
+    stage: str
+
+
+class ApplicationBulkStageUpdate(BaseModel):
+    """
+    Bulk stage transition: either explicit `moves`, or every application of
+    `job_id` currently in `from_stage` moved to `to_stage`.
+    """
+    moves: Optional[List[ApplicationStageMove]] = Field(None, min_length=1, max_length=1000)
+    job_id: Optional[UUID] = None
+    from_stage: Optional[str] = None
+    to_stage: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_mode(self):
+        by_stage = (self.job_id, self.from_stage, self.to_stage)
+        if self.moves is not None:
+            if any(value is not None for value in by_stage):
+                raise ValueError("Give either moves or job_id/from_stage/to_stage, not both")
+        elif any(value is None for value in by_stage):
+            raise ValueError("Give moves, or all of job_id, from_stage and to_stage")
+        return self
+
+
 class ApplicationResponse(ApplicationBase):
     """Application response schema."""
     id: UUID
@@ -29,3 +57,74 @@ class ApplicationResponse(ApplicationBase):
     
     class Config:
         from_attributes = True
+
+
+class ApplicationBulkStageResult(BaseModel):
+    """Outcome of a bulk stage transition."""
+    updated: List[ApplicationResponse]
+    not_found: List[UUID] = []
+
+
+class ApplicationBulkDelete(BaseModel):
+    """Applications to delete together."""
+    ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class ApplicationBulkDeleteResult(BaseModel):
+    """Outcome of a bulk delete, in request order."""
+    deleted: List[UUID]
+    not_found: List[UUID] = []
+
+
+class PipelineCandidate(BaseModel):
+    """Candidate fields shown on a pipeline card."""
+    id: UUID
+    name: str
+    email: str
+    photo_url: Optional[str] = None
+    role: str
+    location: Optional[str] = None
+    score: int
+    tags: Optional[List[str]] = None
+
+
+class PipelineCard(BaseModel):
+    """An application on the pipeline board."""
+    id: UUID
+    stage: str
+    applied_at: datetime
+    candidate: PipelineCandidate
+
+
+class PipelineStage(BaseModel):
+    """A board column: every application in the stage is counted, the newest are listed."""
+    stage: str
+    count: int
+    cards: List[PipelineCard]
+
+
+class JobStagesUpdate(BaseModel):
+    """A job's own pipeline: its stage names in board order."""
+    stages: List[str] = Field(..., min_length=1, max_length=50)
+    
+    @model_validator(mode="after")
+    def check_stages(self):
+        if any(not stage or len(stage) > 50 for stage in self.stages):
+            raise ValueError("Stage names must be 1 to 50 characters")
+        if len(set(self.stages)) < len(self.stages):
+            raise ValueError("Stage names must be unique")
+        return self
+
+
+class JobStages(BaseModel):
+    """The stages applications to a job may be in, in board order."""
+    job_id: UUID
+    stages: List[str]
+    is_default: bool
+
+
+class JobPipeline(BaseModel):
+    """Pipeline board for one job."""
+    job_id: UUID
+    total: int
+    stages: List[PipelineStage]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Literal
 from uuid import UUID
 from datetime import datetime
@@ -45,3 +45,14 @@ class JobResponse(JobBase):
     
     class Config:
         from_attributes = True
+
+
+class JobBulkDelete(BaseModel):
+    """Job postings to delete together."""
+    ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class JobBulkDeleteResult(BaseModel):
+    """Outcome of a bulk delete, in request order."""
+    deleted: List[UUID]
+    not_found: List[UUID] = []
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from pydantic_core import to_json
+from sqlalchemy import Row
+
+
+def response_columns(
+    model: Any,
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+    expressions: Optional[Mapping[str, Any]] = None,
+) -> Tuple[Any, ...]:
+    """
+    The columns of `model` named by the fields of `schema` (or by `fields`), in order.
+
+    Selecting these instead of the entity gives rows that already have the
+    response's shape; a field with no matching column fails at import.
+    `expressions` supplies fields that are not columns of `model`, such as a
+    name looked up through a join; they are labelled with the field name.
+    """
+    columns = model.__table__.c
+    expressions = expressions or {}
+    names = list(fields if fields is not None else schema.model_fields)
+    missing = [name for name in names if name not in columns and name not in expressions]
+    if missing:
+        raise ValueError(f"{schema.__name__} fields without a {model.__name__} column: {missing}")
+    return tuple(expressions[name].label(name) if name in expressions else columns[name] for name in names)
+
+
+def parse_fields(values: Sequence[str], schema: Type[BaseModel]) -> Tuple[str, ...]:
+    """
+    A sparse fieldset from repeated or comma-separated `fields` query values.
+
+    Returned in `schema` field order with `id` always included; names that
+    are not fields of `schema` are rejected with a 400.
+    """
+    requested = {name.strip() for value in values for name in value.split(",") if name.strip()}
+    unknown = sorted(requested - set(schema.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def projected_list_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    """Adapter for lists of `schema` cut down to `fields`, built once per fieldset."""
+    projected = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[projected])
+
+
+def render_rows(rows: Sequence[Row], response: Response, fields: Optional[Sequence[str]] = None) -> Response:
+    """
+    Serialize rows selected with response_columns straight to a JSON Response,
+    keeping the headers set on the endpoint's injected `response`. With
+    `fields`, only those columns are written, so sort keys selected for
+    pagination can be left out.
+
+    Skips building and validating a model per row: values are trusted as the
+    database returns them, including JSON columns, which only hold data that
+    was validated on the way in. The endpoint's response_model still
+    documents the shape in OpenAPI.
+    """
+    if fields is None:
+        body = to_json([row._asdict() for row in rows])
+    else:
+        body = to_json([{name: row._mapping[name] for name in fields} for row in rows])
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
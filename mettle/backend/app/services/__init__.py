@@ -0,0 +1 @@
+# Empty init for services package
@@ -0,0 +1,224 @@
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, Integer, delete, func, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import JobStageStats, SourceStageStats
+from app.models.application import Application
+from app.models.stage import Stage
+from app.schemas.analytics import FunnelStage, JobFunnel, SourceEffectiveness, StageTime
+from app.services.stages import DEFAULT_PIPELINE_STAGES, pipeline_stages
+
+COUNTERS = ("created", "entered", "exited", "current", "seconds_in_stage")
+
+# Applications progress through the stages of their pipeline in order, and
+# conversion is measured between neighbours. Rejected, and stages no longer
+# in the pipeline, only report their share of all applications.
+REJECTED_STAGE = "Rejected"
+HIRED_STAGE = "Hired"
+
+
+def seconds_since(column: Any, dialect_name: str):
+    """SQL expression for the seconds elapsed since the timestamp `column`."""
+    if dialect_name == "postgresql":
+        return func.extract("epoch", func.now() - column)
+    return (func.julianday("now") - func.julianday(column)) * 86400.0
+
+
+def _counts(created: int = 0, entered: int = 0, exited: int = 0, current: int = 0, seconds=None) -> list:
+    return [
+        literal(created, Integer).label("created"),
+        literal(entered, Integer).label("entered"),
+        literal(exited, Integer).label("exited"),
+        literal(current, Integer).label("current"),
+        (seconds if seconds is not None else literal(0.0, Float)).label("seconds_in_stage"),
+    ]
+
+
+def _attributed(*columns):
+    # Applications are attributed to the source recorded when they were created
+    return select(Application.job_id, Application.source, *columns)
+
+
+async def _upsert(db: AsyncSession, model, keys: List[str], rows) -> None:
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(model).from_select([*keys, *COUNTERS], rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: getattr(model, name) + statement.excluded[name] for name in COUNTERS},
+    )
+    await db.execute(statement)
+
+
+async def _apply(db: AsyncSession, deltas) -> None:
+    """Add per-(job, source, stage) counter `deltas` to both stats tables."""
+    deltas = deltas.subquery()
+    sums = [func.sum(deltas.c[name]).label(name) for name in COUNTERS]
+    await _upsert(
+        db, JobStageStats, ["job_id", "source", "stage_code"],
+        select(deltas.c.job_id, deltas.c.source, deltas.c.stage_code, *sums)
+        .group_by(deltas.c.job_id, deltas.c.source, deltas.c.stage_code),
+    )
+    await _upsert(
+        db, SourceStageStats, ["source", "stage_code"],
+        select(deltas.c.source, deltas.c.stage_code, *sums).group_by(deltas.c.source, deltas.c.stage_code),
+    )
+
+
+async def record_created(db: AsyncSession, condition) -> None:
+    """Count the applications matching `condition` as just created. Call after inserting them."""
+    await _apply(db, _attributed(Application.stage_code, *_counts(created=1, entered=1, current=1)).where(condition))
+
+
+async def record_stage_changes(db: AsyncSession, condition, new_code) -> None:
+    """
+    Count the applications matching `condition` as moving to stage
+    `new_code`, a SQL expression that may vary per row. Call with the rows
+    locked (applicants.lock_applications) and before the UPDATE, which must
+    also reset stage_entered_at on the rows that change stage.
+    """
+    moving = [condition, Application.stage_code != new_code]
+    elapsed = seconds_since(Application.stage_entered_at, db.get_bind().dialect.name)
+    exits = _attributed(Application.stage_code, *_counts(exited=1, current=-1, seconds=elapsed)).where(*moving)
+    entries = _attributed(new_code.label("stage_code"), *_counts(entered=1, current=1)).where(*moving)
+    await _apply(db, union_all(exits, entries))
+
+
+async def record_removed(db: AsyncSession, condition) -> None:
+    """
+    Drop the applications matching `condition` from the current counts.
+    Call with the rows locked (applicants.lock_applications), before
+    deleting them.
+    """
+    await _apply(db, _attributed(Application.stage_code, *_counts(current=-1)).where(condition))
+
+
+async def record_jobs_removed(db: AsyncSession, job_ids: Sequence[uuid.UUID]) -> None:
+    """
+    Take the counters of jobs `job_ids` out of the source roll-up. Call
+    before deleting the jobs; their own rows go with them through the
+    foreign key.
+    """
+    job_rows = select(
+        JobStageStats.source,
+        JobStageStats.stage_code,
+        *[(-func.sum(getattr(JobStageStats, name))).label(name) for name in COUNTERS],
+    ).where(JobStageStats.job_id.in_(job_ids)).group_by(JobStageStats.source, JobStageStats.stage_code)
+    await _upsert(db, SourceStageStats, ["source", "stage_code"], job_rows)
+
+
+async def rebuild(db: AsyncSession) -> None:
+    """
+    Recompute both stats tables from the applications as they are now.
+
+    Transition history is not stored anywhere else, so rebuilt counters
+    start over: every application counts as created in its current stage.
+    """
+    await db.execute(delete(JobStageStats))
+    await db.execute(delete(SourceStageStats))
+    count = func.count()
+    await db.execute(
+        JobStageStats.__table__.insert().from_select(
+            ["job_id", "source", "stage_code", *COUNTERS],
+            _attributed(Application.stage_code, count, count, literal(0), count, literal(0.0))
+            .group_by(Application.job_id, Application.source, Application.stage_code),
+        )
+    )
+    await db.execute(
+        SourceStageStats.__table__.insert().from_select(
+            ["source", "stage_code", *COUNTERS],
+            select(
+                JobStageStats.source,
+                JobStageStats.stage_code,
+                *[func.sum(getattr(JobStageStats, name)) for name in COUNTERS],
+            ).group_by(JobStageStats.source, JobStageStats.stage_code),
+        )
+    )
+
+
+def _ordered_stages(stages, pipeline: Sequence[str]) -> List[str]:
+    return [stage for stage in pipeline if stage in stages] + sorted(
+        stage for stage in stages if stage not in pipeline
+    )
+
+
+def _ratio(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+
+async def _stage_totals(db: AsyncSession, job_id: Optional[uuid.UUID]) -> Dict[str, dict]:
+    model = JobStageStats if job_id is not None else SourceStageStats
+    query = (
+        select(Stage.name, *[func.sum(getattr(model, name)).label(name) for name in COUNTERS])
+        .join(Stage, Stage.code == model.stage_code)
+        .group_by(Stage.name)
+    )
+    if job_id is not None:
+        query = query.where(JobStageStats.job_id == job_id)
+    return {row.name: row._asdict() for row in (await db.execute(query)).all()}
+
+
+async def funnel(db: AsyncSession, job_id: Optional[uuid.UUID] = None) -> JobFunnel:
+    """Applications reaching each stage of the job's pipeline (the default one for all jobs)."""
+    totals = await _stage_totals(db, job_id)
+    pipeline = await pipeline_stages(db, job_id) if job_id is not None else DEFAULT_PIPELINE_STAGES
+    progression = [stage for stage in pipeline if stage != REJECTED_STAGE]
+    applications = sum(row["created"] for row in totals.values())
+    stages = []
+    previous = None
+    for stage in _ordered_stages(set(totals) | set(pipeline), pipeline):
+        row = totals.get(stage, {})
+        entered = row.get("entered") or 0
+        in_funnel = stage in progression
+        stages.append(FunnelStage(
+            stage=stage,
+            entered=entered,
+            current=row.get("current") or 0,
+            share_of_applications=_ratio(entered, applications),
+            conversion_from_previous=_ratio(entered, previous) if in_funnel and previous is not None else None,
+        ))
+        if in_funnel:
+            previous = entered
+    return JobFunnel(job_id=job_id, applications=applications, stages=stages)
+
+
+async def time_in_stage(db: AsyncSession, job_id: Optional[uuid.UUID] = None) -> List[StageTime]:
+    """Mean time applications spent in each stage before leaving it."""
+    totals = await _stage_totals(db, job_id)
+    return [
+        StageTime(
+            stage=stage,
+            exited=totals[stage]["exited"],
+            current=totals[stage]["current"],
+            average_hours=round(totals[stage]["seconds_in_stage"] / totals[stage]["exited"] / 3600, 2)
+            if totals[stage]["exited"] else None,
+        )
+        for stage in _ordered_stages(totals, DEFAULT_PIPELINE_STAGES)
+    ]
+
+
+async def source_effectiveness(db: AsyncSession) -> List[SourceEffectiveness]:
+    """Applications and hires per candidate source, best hire rate first."""
+    query = (
+        select(
+            SourceStageStats.source,
+            func.sum(SourceStageStats.created).label("applications"),
+            func.sum(SourceStageStats.entered).filter(Stage.name == HIRED_STAGE).label("hires"),
+            func.sum(SourceStageStats.current).filter(Stage.name != HIRED_STAGE).label("in_pipeline"),
+        )
+        .join(Stage, Stage.code == SourceStageStats.stage_code)
+        .group_by(SourceStageStats.source)
+    )
+    sources = [
+        SourceEffectiveness(
+            source=row.source,
+            applications=row.applications,
+            hires=row.hires or 0,
+            in_pipeline=row.in_pipeline or 0,
+            hire_rate=_ratio(row.hires or 0, row.applications),
+        )
+        for row in (await db.execute(query)).all()
+    ]
+    return sorted(sources, key=lambda item: (-(item.hire_rate or 0), item.source))
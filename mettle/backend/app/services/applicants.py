@@ -0,0 +1,51 @@
+from typing import List, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.application import Application
+from app.models.job import Job
+
+
+async def lock_applications(db: AsyncSession, condition) -> None:
+    """
+    Lock the applications matching `condition` until the transaction ends.
+    Call before reading their stage into counters or history and changing
+    or deleting them: a concurrent move of the same rows waits, then reads
+    the stage it left them in. Rows are locked in id order, so writers
+    overlapping on several rows cannot deadlock.
+
+    Postgres only; SQLite takes one writer at a time already.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    await db.execute(
+        select(Application.id).where(condition).order_by(Application.id).with_for_update(of=Application)
+    )
+
+
+async def release_applicants(db: AsyncSession, condition) -> List[Tuple]:
+    """
+    Take the applications matching `condition` off their jobs'
+    applicants_count, in one UPDATE ... FROM. Call before deleting them.
+
+    Returns (job id, department) for each job touched, for cache
+    invalidation.
+    """
+    removed = (
+        select(Application.job_id, func.count().label("removed"))
+        .where(condition)
+        .group_by(Application.job_id)
+        .subquery()
+    )
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == removed.c.job_id)
+        .values(applicants_count=case(
+            (Job.applicants_count > removed.c.removed, Job.applicants_count - removed.c.removed),
+            else_=0,
+        ))
+        .returning(Job.id, Job.department)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.services.ttl_cache import TTLCache
+
+
+class CacheBackendError(Exception):
+    """The cache backend could not be reached or answered with an error."""
+
+
+class MemoryCacheBackend:
+    """
+    Per-process backend on top of TTLCache.
+
+    Tag versions live in a plain dict so they are never evicted ahead of the
+    entries that captured them; if it outgrows `max_tags` everything is
+    dropped at once, which is always safe.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_size: int, max_tags: Optional[int] = None):
+        self._entries = TTLCache(max_size, ttl_seconds=0)
+        self._locks = TTLCache(max_size, ttl_seconds=0)
+        self._tags: Dict[str, Tuple[str, float]] = {}
+        self.max_tags = max_tags if max_tags is not None else max_size * 4
+
+    def _version(self, tag: str) -> Optional[str]:
+        entry = self._tags.get(tag)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._tags[tag]
+            return None
+        return entry[0]
+
+    async def fetch(self, key: str, tags: Sequence[str]) -> Tuple[Optional[bytes], List[Optional[str]]]:
+        return self._entries.get(key), [self._version(tag) for tag in tags]
+
+    async def store(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._entries.set(key, value, ttl_seconds)
+
+    async def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        if key in self._locks:
+            return False
+        self._locks.set(key, True, ttl_seconds)
+        return True
+
+    async def unlock(self, key: str) -> None:
+        self._locks.pop(key)
+
+    async def bump(self, tags: Sequence[str], version: str, ttl_seconds: float) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        for tag in tags:
+            self._tags[tag] = (version, expires_at)
+        if len(self._tags) > self.max_tags:
+            self._entries.clear()
+            self._tags.clear()
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._locks.clear()
+        self._tags.clear()
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisCacheBackend:
+    """
+    Backend on redis.asyncio, over a pool of up to `max_connections`
+    connections; a command waits at most `timeout_seconds` for a free
+    connection, to connect, and for its reply.
+
+    Only GET, SET (PX/NX), MGET and DEL are used. Entries and tag versions
+    are written with expiries, so the server never needs manual cleanup.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "", timeout_seconds: float = 1.0, max_connections: int = 10):
+        self.key_prefix = key_prefix
+        self.timeout_seconds = timeout_seconds
+        self._pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=timeout_seconds,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds,
+        )
+        self._client = aioredis.Redis(connection_pool=self._pool)
+
+    async def execute(self, *commands: tuple) -> list:
+        """Send `commands` in one pipelined round-trip and return their replies."""
+        pipeline = self._client.pipeline(transaction=False)
+        for command in commands:
+            pipeline.execute_command(*command)
+        try:
+            return await pipeline.execute()
+        except (RedisError, OSError, asyncio.TimeoutError) as exc:
+            raise CacheBackendError(str(exc) or type(exc).__name__) from exc
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}tag:{tag}"
+
+    async def fetch(self, key: str, tags: Sequence[str]) -> Tuple[Optional[bytes], List[Optional[str]]]:
+        commands = [("GET", self.key_prefix + key)]
+        if tags:
+            commands.append(("MGET", *(self._tag_key(tag) for tag in tags)))
+        replies = await self.execute(*commands)
+        versions = [version.decode() if version is not None else None for version in replies[1]] if tags else []
+        return replies[0], versions
+
+    async def store(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.execute(("SET", self.key_prefix + key, value, "PX", int(ttl_seconds * 1000)))
+
+    async def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        reply, = await self.execute(("SET", f"{self.key_prefix}lock:{key}", 1, "NX", "PX", int(ttl_seconds * 1000)))
+        # redis-py maps SET's reply to True, or None when NX found the key
+        return bool(reply)
+
+    async def unlock(self, key: str) -> None:
+        await self.execute(("DEL", f"{self.key_prefix}lock:{key}"))
+
+    async def bump(self, tags: Sequence[str], version: str, ttl_seconds: float) -> None:
+        ttl_ms = int(ttl_seconds * 1000)
+        await self.execute(*(("SET", self._tag_key(tag), version, "PX", ttl_ms) for tag in tags))
+
+    async def close(self) -> None:
+        await self._pool.disconnect()
@@ -0,0 +1,279 @@
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.candidate import Candidate
+from app.schemas.candidate import CandidateCreate, CandidateImportError, CandidateImportReport
+from app.services.skills import set_candidate_skills
+
+# Columns refreshed when an imported email already exists; status and score
+# belong to the pipeline and are left untouched.
+_UPSERT_COLUMNS = (
+    "name", "phone", "photo_url", "role", "source", "location", "skills", "tags",
+    "summary", "experience", "education", "certifications", "experience_years",
+)
+# CSV cells holding lists: JSON arrays, or ';'-separated values for skills.
+_CSV_LIST_COLUMNS = ("skills", "experience", "education", "certifications")
+# Longest CSV record accepted; a quoted field may span lines, so an
+# unbalanced quote would otherwise buffer the rest of the upload.
+MAX_CSV_RECORD_CHARS = 1_000_000
+# Longest physical line accepted in either format; without newlines (one huge
+# NDJSON row, or a CR-only file) a line would otherwise buffer the upload.
+MAX_LINE_CHARS = 1_000_000
+
+
+def candidate_values(candidate_data: CandidateCreate) -> dict:
+    """Column values for a new candidate row."""
+    return {
+        "name": candidate_data.name,
+        "email": candidate_data.email,
+        "phone": candidate_data.phone,
+        "photo_url": candidate_data.photo_url,
+        "role": candidate_data.role,
+        "source": candidate_data.source,
+        "location": candidate_data.location,
+        "skills": candidate_data.skills,
+        "tags": candidate_data.skills[:3] if candidate_data.skills else [],
+        "summary": candidate_data.summary,
+        "experience": [exp.model_dump() for exp in candidate_data.experience] if candidate_data.experience else None,
+        "education": [edu.model_dump() for edu in candidate_data.education] if candidate_data.education else None,
+        "certifications": [cert.model_dump() for cert in candidate_data.certifications] if candidate_data.certifications else None,
+        # Calculate experience years from experience list
+        "experience_years": len(candidate_data.experience) if candidate_data.experience else 0,
+        "status": "New",
+        "score": 0,
+    }
+
+
+async def _iter_lines(stream: AsyncIterator[bytes], max_line_chars: int = MAX_LINE_CHARS) -> AsyncIterator[Union[str, dict]]:
+    """
+    Decoded lines of an upload, without their line endings. A line longer
+    than `max_line_chars` is dropped up to the next newline and reported as
+    an error record instead.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    parts: List[str] = []
+    length = 0
+    skipping = False
+    error = f"line exceeds {max_line_chars} characters"
+    async for chunk in stream:
+        *lines, tail = decoder.decode(chunk).split("\n")
+        for line in lines:
+            if not skipping:
+                if length + len(line) > max_line_chars:
+                    yield {"__error__": error}
+                else:
+                    parts.append(line)
+                    yield "".join(parts).rstrip("\r")
+            parts, length, skipping = [], 0, False
+        if not skipping and tail:
+            parts.append(tail)
+            length += len(tail)
+            if length > max_line_chars:
+                # No newline yet (one huge line, or a CR-only file): stop
+                # buffering and discard input until the next newline.
+                parts, length, skipping = [], 0, True
+                yield {"__error__": error}
+    if not skipping:
+        parts.append(decoder.decode(b"", final=True))
+        line = "".join(parts)
+        if len(line) > max_line_chars:
+            yield {"__error__": error}
+        elif line:
+            yield line.rstrip("\r")
+
+
+async def _iter_ndjson(lines: AsyncIterator[Union[str, dict]]) -> AsyncIterator[dict]:
+    async for line in lines:
+        if isinstance(line, dict):
+            yield line
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {"__error__": f"invalid JSON: {exc}"}
+            continue
+        yield record if isinstance(record, dict) else {"__error__": "row is not a JSON object"}
+
+
+def _csv_cell(column: str, value: str):
+    if value == "":
+        return None
+    if column in _CSV_LIST_COLUMNS:
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split(";") if item.strip()]
+    return value
+
+
+def _ends_in_quoted_field(line: str, quoted: bool) -> bool:
+    """
+    Whether a CSV record is still inside a quoted field after `line`, given
+    whether it was before it. Follows csv's default dialect: a quote opens a
+    quoted field only at the start of a field, doubled quotes inside one are
+    literal, and a stray quote in an unquoted field is just a character.
+    """
+    if '"' not in line:
+        return quoted
+    at_field_start = not quoted
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if quoted:
+            if char == '"':
+                if line.startswith('"', index + 1):
+                    index += 1
+                else:
+                    quoted = False
+        elif char == '"' and at_field_start:
+            quoted = True
+        at_field_start = not quoted and char == ","
+        index += 1
+    return quoted
+
+
+async def _iter_csv(lines: AsyncIterator[Union[str, dict]], max_record_chars: int = MAX_CSV_RECORD_CHARS) -> AsyncIterator[dict]:
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    pending_chars = 0
+    quoted = False
+    async for line in lines:
+        if isinstance(line, dict):
+            # An overlong line; the record it belonged to is lost with it
+            pending, pending_chars, quoted = [], 0, False
+            yield line
+            continue
+        # A quoted field may span physical lines; hold lines until it closes
+        pending.append(line)
+        pending_chars += len(line) + 1
+        quoted = _ends_in_quoted_field(line, quoted)
+        if quoted:
+            if pending_chars > max_record_chars:
+                # Most likely an unbalanced quote swallowing the rest of the
+                # file; drop the record and resync on the next line.
+                pending, pending_chars, quoted = [], 0, False
+                yield {"__error__": f"record exceeds {max_record_chars} characters (unterminated quoted field?)"}
+            continue
+        record = "\n".join(pending)
+        pending, pending_chars = [], 0
+        if not record.strip():
+            continue
+        cells = next(csv.reader([record]))
+        if header is None:
+            header = [cell.strip() for cell in cells]
+            continue
+        try:
+            yield {
+                column: _csv_cell(column, value)
+                for column, value in zip(header, cells)
+            }
+        except ValueError as exc:
+            yield {"__error__": f"invalid JSON cell: {exc}"}
+    if pending:
+        yield {"__error__": "unterminated quoted field at end of file"}
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    ]
+
+
+def _upsert_statement(dialect_name: str, rows: Iterable[dict]):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(Candidate).values(list(rows))
+    return statement.on_conflict_do_update(
+        index_elements=[Candidate.email],
+        set_={
+            **{column: statement.excluded[column] for column in _UPSERT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    ).returning(Candidate.id, Candidate.email)
+
+
+class CandidateImporter:
+    """
+    Validates streamed candidate records and upserts them on email in chunks.
+
+    Only one chunk of rows is held at a time and at most `max_errors` row
+    errors are kept, so memory does not grow with the size of the upload.
+    Each chunk is committed on its own; a chunk the database rejects is
+    reported row by row and the import continues.
+    """
+
+    def __init__(self, db: AsyncSession, chunk_size: int, max_errors: int):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.report = CandidateImportReport(processed=0, upserted=0, failed=0, errors=[])
+        self._chunk: Dict[str, tuple] = {}
+
+    def _fail(self, row: int, email: Optional[str], messages: List[str]) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(CandidateImportError(row=row, email=email, errors=messages))
+        else:
+            self.report.errors_truncated = True
+
+    async def _flush(self) -> None:
+        if not self._chunk:
+            return
+        chunk, self._chunk = self._chunk, {}
+        dialect_name = self.db.get_bind().dialect.name
+        try:
+            result = await self.db.execute(_upsert_statement(dialect_name, (values for _, values in chunk.values())))
+            # The returned id is the existing row's when the email was already known
+            await set_candidate_skills(self.db, {
+                candidate_id: chunk[email][1]["skills"] for candidate_id, email in result.all()
+            })
+            await self.db.commit()
+        except SQLAlchemyError as exc:
+            await self.db.rollback()
+            message = str(getattr(exc, "orig", exc))
+            for email, (row, _) in chunk.items():
+                self._fail(row, email, [f"database error: {message}"])
+            return
+        self.report.upserted += len(chunk)
+
+    async def add(self, row: int, record: dict) -> None:
+        self.report.processed += 1
+        if "__error__" in record:
+            self._fail(row, None, [record["__error__"]])
+            return
+        try:
+            candidate_data = CandidateCreate.model_validate(record)
+        except ValidationError as exc:
+            email = record.get("email")
+            self._fail(row, email if isinstance(email, str) else None, _validation_messages(exc))
+            return
+
+        values = candidate_values(candidate_data)
+        values["id"] = uuid.uuid4()
+        # One INSERT ... ON CONFLICT cannot touch a row twice, so a repeated
+        # email starts a new chunk and the later row wins.
+        if candidate_data.email in self._chunk:
+            await self._flush()
+        self._chunk[candidate_data.email] = (row, values)
+        if len(self._chunk) >= self.chunk_size:
+            await self._flush()
+
+    async def run(self, stream: AsyncIterator[bytes], file_format: str) -> CandidateImportReport:
+        lines = _iter_lines(stream)
+        records = _iter_csv(lines) if file_format == "csv" else _iter_ndjson(lines)
+        row = 0
+        async for record in records:
+            row += 1
+            await self.add(row, record)
+        await self._flush()
+        return self.report
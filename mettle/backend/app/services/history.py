@@ -0,0 +1,118 @@
+import uuid
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert, literal, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.application import Application
+from app.models.application_event import ApplicationEvent
+from app.models.stage import Stage
+
+
+def _actor(actor_id: Optional[uuid.UUID]):
+    return literal(actor_id, UUID(as_uuid=True))
+
+
+async def record_created(db: AsyncSession, condition, actor_id: Optional[uuid.UUID] = None) -> None:
+    """Log the applications matching `condition` as created in their stage. Call after inserting them."""
+    await db.execute(insert(ApplicationEvent).from_select(
+        ["job_id", "occurred_at", "application_id", "from_stage", "to_stage", "actor_id"],
+        select(
+            Application.job_id, func.now(), Application.id, literal(None),
+            Application.stage_code, _actor(actor_id),
+        ).where(condition),
+    ))
+
+
+async def record_stage_changes(db: AsyncSession, condition, new_code, actor_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Log the applications matching `condition` moving to stage `new_code`, a
+    SQL expression that may vary per row. Call with the rows locked
+    (applicants.lock_applications) and before the UPDATE, in its
+    transaction: the event's from_stage is then the stage the move leaves,
+    even when another request moves the same application concurrently.
+    Rows already in their new stage are skipped.
+    """
+    await db.execute(insert(ApplicationEvent).from_select(
+        ["job_id", "occurred_at", "application_id", "from_stage", "to_stage", "actor_id"],
+        select(
+            Application.job_id, func.now(), Application.id, Application.stage_code, new_code, _actor(actor_id),
+        ).where(condition, Application.stage_code != new_code),
+    ))
+
+
+def job_history_query(job_id: uuid.UUID, since: Optional[datetime] = None):
+    """A job's stage events in occurrence order, stage codes resolved to names."""
+    from_stage, to_stage = aliased(Stage), aliased(Stage)
+    query = (
+        select(
+            ApplicationEvent.application_id,
+            from_stage.name.label("from_stage"),
+            to_stage.name.label("to_stage"),
+            ApplicationEvent.occurred_at,
+            ApplicationEvent.actor_id,
+        )
+        .outerjoin(from_stage, from_stage.code == ApplicationEvent.from_stage)
+        .join(to_stage, to_stage.code == ApplicationEvent.to_stage)
+        .where(ApplicationEvent.job_id == job_id)
+        .order_by(ApplicationEvent.occurred_at, ApplicationEvent.application_id)
+    )
+    if since is not None:
+        query = query.where(ApplicationEvent.occurred_at >= since)
+    return query
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+# pg_advisory_xact_lock key serializing partition maintenance across workers
+_PARTITION_LOCK_KEY = 0x6D657474
+
+
+async def ensure_event_partitions(conn: AsyncConnection, months_ahead: int) -> None:
+    """
+    Create the monthly application_events partitions from this month to
+    `months_ahead` months on, plus a default partition for anything else.
+    Postgres only; elsewhere the table is not partitioned.
+
+    Must run periodically (see app.database.maintain_event_partitions) so
+    a month gets its partition before it starts. Should a month still be
+    missing, rows already written to the default partition for it are moved
+    into the new partition, with the default detached meanwhile; Postgres
+    refuses to create a partition whose rows sit in the default one.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    # Workers run this concurrently; the lock is released at commit
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS application_events_default PARTITION OF application_events DEFAULT"
+    ))
+    today = datetime.now(timezone.utc).date()
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        partition = f"application_events_{start:%Y_%m}"
+        if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": partition}) is not None:
+            continue
+        # Same literals as the partition bounds, so both resolve alike
+        in_month = f"occurred_at >= '{start.isoformat()}' AND occurred_at < '{end.isoformat()}'"
+        stranded = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM application_events_default WHERE {in_month})"))
+        if stranded:
+            await conn.execute(text("ALTER TABLE application_events DETACH PARTITION application_events_default"))
+        await conn.execute(text(
+            f"CREATE TABLE {partition} PARTITION OF application_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        if stranded:
+            await conn.execute(text(
+                f"INSERT INTO application_events SELECT * FROM application_events_default WHERE {in_month}"
+            ))
+            await conn.execute(text(f"DELETE FROM application_events_default WHERE {in_month}"))
+            await conn.execute(text(
+                "ALTER TABLE application_events ATTACH PARTITION application_events_default DEFAULT"
+            ))
@@ -0,0 +1,119 @@
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, null, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.application import Application
+from app.models.candidate import Candidate
+from app.models.job import Job
+from app.models.stage import JobPipelineStage, Stage
+from app.schemas.application import JobPipeline, PipelineCandidate, PipelineCard, PipelineStage
+from app.services.stages import DEFAULT_PIPELINE_STAGES
+
+_CARD_CANDIDATE_COLUMNS = (
+    Candidate.name, Candidate.email, Candidate.photo_url, Candidate.role,
+    Candidate.location, Candidate.score, Candidate.tags,
+)
+
+
+def pipeline_query(job_id: uuid.UUID, per_stage: int):
+    """
+    One statement for a job's whole board: a row per stage of the job's own
+    pipeline (with its board position), and a row per application among the
+    newest `per_stage` of each stage, joined to its candidate and carrying its
+    stage's total application count. Both are left joined to the job, so a
+    job with neither still returns one empty row and a missing job none.
+
+    Ranks and counts come from window functions over the job's applications,
+    read in (job_id, stage_code, applied_at, id) index order; stage names are
+    joined in for the few rows that are kept.
+    """
+    ranked = (
+        select(
+            Application.id,
+            Application.candidate_id,
+            Application.stage_code,
+            Application.applied_at,
+            func.row_number().over(
+                partition_by=Application.stage_code,
+                order_by=(Application.applied_at.desc(), Application.id.desc()),
+            ).label("position"),
+            func.count().over(partition_by=Application.stage_code).label("stage_count"),
+        )
+        .where(Application.job_id == job_id)
+        .subquery()
+    )
+    # Cards first: the union takes its column types from the first select
+    board = union_all(
+        select(
+            ranked.c.stage_code,
+            null().label("board_position"),
+            ranked.c.id,
+            ranked.c.candidate_id,
+            ranked.c.applied_at,
+            ranked.c.position,
+            ranked.c.stage_count,
+        ).where(ranked.c.position <= per_stage),
+        select(
+            JobPipelineStage.stage_code,
+            JobPipelineStage.position,
+            null(), null(), null(), null(), null(),
+        ).where(JobPipelineStage.job_id == job_id),
+    ).subquery()
+    return (
+        select(board, Stage.name.label("stage"), *_CARD_CANDIDATE_COLUMNS)
+        .select_from(Job)
+        .outerjoin(board, true())
+        .outerjoin(Stage, Stage.code == board.c.stage_code)
+        .outerjoin(Candidate, Candidate.id == board.c.candidate_id)
+        .where(Job.id == job_id)
+        .order_by(board.c.stage_code, board.c.position)
+    )
+
+
+async def job_pipeline(db: AsyncSession, job_id: uuid.UUID, per_stage: int) -> Optional[JobPipeline]:
+    """
+    Per-stage counts and top cards for a job's board, or None if there is no
+    such job. Columns follow the job's pipeline, shown even when empty;
+    stages since dropped from it follow while applications remain in them.
+    """
+    rows = (await db.execute(pipeline_query(job_id, per_stage))).all()
+    if not rows:
+        return None
+    own = sorted((row.board_position, row.stage) for row in rows if row.board_position is not None)
+    pipeline = [stage for _, stage in own] or list(DEFAULT_PIPELINE_STAGES)
+    stages: Dict[str, PipelineStage] = {
+        stage: PipelineStage(stage=stage, count=0, cards=[]) for stage in pipeline
+    }
+    extra: List[str] = []
+    for row in rows:
+        if row.id is None:
+            continue
+        column = stages.get(row.stage)
+        if column is None:
+            column = stages[row.stage] = PipelineStage(stage=row.stage, count=0, cards=[])
+            extra.append(row.stage)
+        column.count = row.stage_count
+        column.cards.append(PipelineCard(
+            id=row.id,
+            stage=row.stage,
+            applied_at=row.applied_at,
+            candidate=PipelineCandidate(
+                id=row.candidate_id,
+                name=row.name,
+                email=row.email,
+                photo_url=row.photo_url,
+                role=row.role,
+                location=row.location,
+                score=row.score,
+                tags=row.tags,
+            ),
+        ))
+
+    ordered = [stages[stage] for stage in pipeline] + [stages[stage] for stage in sorted(extra)]
+    return JobPipeline(
+        job_id=job_id,
+        total=sum(column.count for column in ordered),
+        stages=ordered,
+    )
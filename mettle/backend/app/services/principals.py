@@ -0,0 +1,125 @@
+import uuid
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.models.user import User
+from app.services.ttl_cache import TTLCache
+
+# Columns copied into cached principals; secrets are deliberately left out.
+_SNAPSHOT_FIELDS = ("id", "email", "full_name", "role", "is_active", "created_at", "updated_at")
+# Changes to any of these must be visible on the user's next request.
+_INVALIDATING_FIELDS = ("is_active", "role", "hashed_password")
+# Session.info key: users changed by this session, invalidated again at commit
+_CHANGED_USERS = "changed_principal_ids"
+
+
+class PrincipalCache:
+    """
+    Per-process cache of authenticated users keyed by user id and token `iat`.
+
+    Hits return a detached User copy, so get_current_user skips the users
+    SELECT. Invalidation bumps a per-user generation that is part of the key,
+    leaving stale entries unreachable until the LRU/TTL ages them out. Other
+    worker processes only observe invalidations once their TTL expires.
+
+    Generations live in the same LRU, so they stay bounded: one is written
+    after every entry it outdates, so those are evicted or expire first,
+    and a generation that ages out only turns current entries into misses.
+    A user loaded before an invalidation is not stored at all, so no stale
+    row lands under a generation that could come back.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+        self.invalidations = 0
+
+    def generation(self, user_id: uuid.UUID) -> int:
+        return self._cache.peek(("generation", user_id), 0)
+
+    def get(self, user_id: uuid.UUID, issued_at: Optional[int]) -> Optional[User]:
+        snapshot = self._cache.get((user_id, issued_at, self.generation(user_id)))
+        return User(**snapshot) if snapshot is not None else None
+
+    def put(self, user: User, issued_at: Optional[int], generation: int) -> None:
+        """Cache `user`, loaded while the user's generation was `generation`."""
+        if generation != self.generation(user.id):
+            return
+        snapshot = {field: getattr(user, field) for field in _SNAPSHOT_FIELDS}
+        self._cache.set((user.id, issued_at, generation), snapshot)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._cache.set(("generation", user_id), self.generation(user_id) + 1)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+
+def token_claims(user: User) -> dict:
+    """Claims identifying `user` in an access token."""
+    claims = {"sub": str(user.id)}
+    if settings.jwt_embed_claims:
+        claims.update({
+            "email": user.email,
+            "name": user.full_name,
+            "role": user.role,
+            "active": user.is_active,
+        })
+    return claims
+
+
+def principal_from_claims(user_id: uuid.UUID, payload: dict) -> Optional[User]:
+    """Build a detached User from embedded token claims, if the token has them."""
+    if not settings.jwt_embed_claims or "role" not in payload:
+        return None
+    return User(
+        id=user_id,
+        email=payload.get("email"),
+        full_name=payload.get("name"),
+        role=payload["role"],
+        is_active=payload.get("active", True),
+    )
+
+
+def _invalidate(target: User) -> None:
+    # Once at flush, so this session's own later requests miss, and again at
+    # commit: a request reading the user in between got the old row.
+    principal_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _INVALIDATING_FIELDS):
+        _invalidate(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    _invalidate(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,220 @@
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from fastapi import BackgroundTasks, Request, Response
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.http_cache import conditional_response
+from app.services.cache_backends import CacheBackendError, MemoryCacheBackend, RedisCacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Headers replayed from a cached response; all are determined by the request key.
+_CACHED_HEADERS = (
+    "content-type", "etag", "cache-control", "x-next-cursor", "x-prev-cursor", "x-total-count",
+    "x-total-count-estimated",
+)
+# How long one request may hold the refresh of a stale entry before others retry
+_REFRESH_LOCK_SECONDS = 10.0
+
+ALL_DEPARTMENTS = "*"
+
+
+def render_json(adapter: TypeAdapter, content: Any, response: Response) -> Response:
+    """
+    `content` serialized through `adapter` into a final Response carrying the
+    headers set on the endpoint's injected `response`, so it can be cached.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+def job_tag(job_id) -> str:
+    return f"job:{job_id}"
+
+
+def job_list_tag(department: Optional[str]) -> str:
+    """Tag of job lists filtered to `department`; ALL_DEPARTMENTS for unfiltered lists."""
+    return f"jobs:department:{department if department is not None else ALL_DEPARTMENTS}"
+
+
+JOB_LISTS_TAG = "jobs:list"
+
+
+def job_write_tags(job_id, *departments: Optional[str]) -> list:
+    """Tags to invalidate when a job in `departments` is created, changed or removed."""
+    return [job_tag(job_id), job_list_tag(None), *(job_list_tag(d) for d in departments if d is not None)]
+
+
+def candidate_tag(candidate_id) -> str:
+    return f"candidate:{candidate_id}"
+
+
+CANDIDATE_LISTS_TAG = "candidates:list"
+# Bumped by bulk imports, which may touch any candidate
+ALL_CANDIDATES_TAG = "candidates:all"
+
+
+class ResponseCache:
+    """
+    Caches rendered JSON responses of read endpoints, invalidated by tag.
+
+    Each entry records the versions of its tags as they were before the
+    response was computed; invalidating a tag gives it a new version, so
+    entries captured earlier are never served again. Past its TTL an entry
+    may still be served for `stale_seconds` while a single request
+    refreshes it, so a popular key expiring does not stampede the database.
+    Backend failures are logged and the request falls through uncached.
+    """
+
+    def __init__(self, backend, ttl_seconds: float, stale_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def lifetime_seconds(self) -> float:
+        return self.ttl_seconds + self.stale_seconds
+
+    @staticmethod
+    def key(request: Request) -> str:
+        params = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    def _replay(self, request: Request, entry: dict) -> Response:
+        response = Response(content=entry["body"], headers=entry["headers"])
+        etag = entry["headers"].get("etag")
+        if etag:
+            return conditional_response(request, response, etag) or response
+        return response
+
+    async def serve(
+        self,
+        request: Request,
+        tags: Sequence[str],
+        load: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Answer from the cache when possible, otherwise `load` the response and cache it."""
+        if self.backend is None:
+            return await load()
+        key = self.key(request)
+        locked = False
+        try:
+            raw, versions = await self.backend.fetch(key, tags)
+            entry = json.loads(raw) if raw is not None else None
+            if entry is not None and entry["versions"] == versions:
+                if entry["fresh_until"] > time.time():
+                    self.hits += 1
+                    return self._replay(request, entry)
+                locked = await self.backend.try_lock(key, _REFRESH_LOCK_SECONDS)
+                if not locked:
+                    self.stale_served += 1
+                    return self._replay(request, entry)
+        except CacheBackendError as exc:
+            self.errors += 1
+            logger.warning("Response cache unavailable: %s", exc)
+            return await load()
+
+        self.misses += 1
+        try:
+            response = await load()
+            if response.status_code == 200:
+                await self._store(key, versions, response)
+        finally:
+            if locked:
+                await self._unlock(key)
+        return response
+
+    async def _store(self, key: str, versions: list, response: Response) -> None:
+        entry = {
+            "versions": versions,
+            "fresh_until": time.time() + self.ttl_seconds,
+            "headers": {
+                name: value for name, value in response.headers.items() if name in _CACHED_HEADERS
+            },
+            "body": response.body.decode(),
+        }
+        try:
+            await self.backend.store(key, json.dumps(entry).encode(), self.lifetime_seconds)
+        except CacheBackendError as exc:
+            self.errors += 1
+            logger.warning("Response cache store failed: %s", exc)
+
+    async def _unlock(self, key: str) -> None:
+        try:
+            await self.backend.unlock(key)
+        except CacheBackendError:
+            self.errors += 1
+
+    async def invalidate(self, tags: Iterable[str], background_tasks: Optional[BackgroundTasks] = None) -> None:
+        """
+        Make every entry carrying any of `tags` unreachable. With the redis
+        backend that holds for every process sharing it; the memory backend
+        is per process, and other workers keep serving their entries until
+        they expire.
+
+        Called from a write handler, pass its `background_tasks` to bump the
+        tags once more after the transaction commits: a concurrent reader may
+        have cached pre-commit rows under the first bump in the meantime.
+        """
+        tags = list(dict.fromkeys(tags))
+        if self.backend is None or not tags:
+            return
+        if await self._bump(tags):
+            self.invalidations += len(tags)
+        if background_tasks is not None:
+            background_tasks.add_task(self._bump, tags)
+
+    async def _bump(self, tags: list) -> bool:
+        # Versions must never repeat, or an old entry could match again; they
+        # outlive every entry that could have captured the previous value.
+        version = f"{time.time_ns():x}"
+        try:
+            await self.backend.bump(tags, version, self.lifetime_seconds)
+        except CacheBackendError as exc:
+            self.errors += 1
+            logger.warning("Response cache invalidation failed: %s", exc)
+            return False
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_served + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "hits": self.hits,
+            "stale_served": self.stale_served,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits + self.stale_served) / lookups, 4) if lookups else 0.0,
+            "stale_ratio": round(self.stale_served / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _backend_from_settings():
+    if settings.response_cache_backend == "memory":
+        return MemoryCacheBackend(settings.response_cache_size)
+    if settings.response_cache_backend == "redis":
+        return RedisCacheBackend(
+            settings.response_cache_url,
+            key_prefix=settings.response_cache_key_prefix,
+            max_connections=settings.response_cache_max_connections,
+        )
+    return None
+
+
+response_cache = ResponseCache(
+    _backend_from_settings(),
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    stale_seconds=settings.response_cache_stale_seconds,
+)
@@ -0,0 +1,56 @@
+import re
+from typing import Optional, Sequence
+
+from sqlalchemy import Select, column, func, literal_column, select, table
+
+from app.models.candidate import Candidate
+from app.services.skills import candidates_with_skills
+
+_TERM = re.compile(r"\w+")
+
+_fts = table("candidates_fts", column("rowid"))
+# bm25() weights for the FTS5 columns: name, role, summary, experience
+_FTS_WEIGHTS = (10.0, 4.0, 1.0, 1.0)
+
+
+def _fts5_match(text: str) -> str:
+    # Quote every term so user input is never parsed as FTS5 query syntax;
+    # the terms are ANDed, like plain words in websearch_to_tsquery.
+    return " ".join(f'"{term}"' for term in _TERM.findall(text))
+
+
+def _postgres_search(query: Select, text: str) -> Select:
+    vector = literal_column("candidates.search_vector")
+    ts_query = func.websearch_to_tsquery("simple", text)
+    return query.where(vector.op("@@")(ts_query)).order_by(func.ts_rank_cd(vector, ts_query).desc())
+
+
+def _sqlite_search(query: Select, text: str) -> Select:
+    return (
+        query.join(_fts, _fts.c.rowid == literal_column("candidates.rowid"))
+        .where(literal_column("candidates_fts").op("MATCH")(_fts5_match(text)))
+        .order_by(func.bm25(literal_column("candidates_fts"), *(literal_column(str(w)) for w in _FTS_WEIGHTS)))
+    )
+
+
+def search_candidates_query(
+    dialect_name: str,
+    text: Optional[str],
+    skills: Sequence[str],
+    match_all: bool = True,
+) -> Select:
+    """
+    Candidates matching the full-text query `text` and the `skills` filter.
+
+    Text matches are ordered by relevance, name hits weighing most, then
+    role, summary and experience. `match_all` requires every skill, otherwise
+    any one of them is enough; skill names match case-insensitively. Ties
+    and skill-only searches fall back to newest first.
+    """
+    query = select(Candidate)
+    if skills:
+        query = query.where(Candidate.id.in_(candidates_with_skills(skills, match_all)))
+    if text is not None and _TERM.search(text):
+        search = _postgres_search if dialect_name == "postgresql" else _sqlite_search
+        query = search(query, text)
+    return query.order_by(Candidate.created_at.desc(), Candidate.id.desc())
@@ -0,0 +1,85 @@
+import uuid
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skill import CandidateSkill, Skill
+
+
+def skill_key(name: str) -> str:
+    """Interning key for a skill name: surrounding and repeated whitespace dropped, case folded."""
+    return " ".join(name.split()).casefold()
+
+
+def _unique_skills(names: Iterable[str]) -> Dict[str, str]:
+    # key -> first spelling, in order of appearance
+    skills: Dict[str, str] = {}
+    for name in names:
+        key = skill_key(name)
+        if key and key not in skills:
+            skills[key] = " ".join(name.split())
+    return skills
+
+
+async def intern_skills(db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+    """Skill ids keyed by skill_key, creating skills not seen before."""
+    skills = _unique_skills(names)
+    if not skills:
+        return {}
+
+    result = await db.execute(select(Skill.key, Skill.id).where(Skill.key.in_(skills)))
+    ids = dict(result.all())
+    missing = [{"key": key, "name": name} for key, name in skills.items() if key not in ids]
+    if missing:
+        # Another transaction may intern the same skill concurrently; keep its row.
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        await db.execute(dialect_insert(Skill).values(missing).on_conflict_do_nothing(index_elements=[Skill.key]))
+        result = await db.execute(select(Skill.key, Skill.id).where(Skill.key.in_([row["key"] for row in missing])))
+        ids.update(result.all())
+    return ids
+
+
+async def set_candidate_skills(
+    db: AsyncSession,
+    skills_by_candidate: Mapping[uuid.UUID, Optional[Sequence[str]]],
+    replace: bool = True,
+) -> None:
+    """
+    Replace the skill links of each candidate with its listed skills.
+
+    Pass replace=False for candidates just inserted, which have no links yet.
+    """
+    if not skills_by_candidate:
+        return
+    ids = await intern_skills(db, (name for names in skills_by_candidate.values() for name in names or ()))
+    if replace:
+        await db.execute(
+            delete(CandidateSkill).where(CandidateSkill.candidate_id.in_(list(skills_by_candidate)))
+        )
+    links = [
+        {"candidate_id": candidate_id, "skill_id": ids[key]}
+        for candidate_id, names in skills_by_candidate.items()
+        for key in _unique_skills(names or ())
+    ]
+    if links:
+        await db.execute(insert(CandidateSkill), links)
+
+
+def candidates_with_skills(names: Sequence[str], match_all: bool = True):
+    """
+    Subquery of candidate ids having all (or any) of the named skills.
+
+    Resolved through the skills key index and the (skill_id, candidate_id)
+    index, without reading candidate rows.
+    """
+    keys: List[str] = list(_unique_skills(names))
+    query = (
+        select(CandidateSkill.candidate_id)
+        .join(Skill, Skill.id == CandidateSkill.skill_id)
+        .where(Skill.key.in_(keys))
+    )
+    if match_all and len(keys) > 1:
+        query = query.group_by(CandidateSkill.candidate_id).having(func.count() == len(keys))
+    return query
@@ -0,0 +1,125 @@
+import uuid
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import and_, delete, event, exists, insert, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.stage import JobPipelineStage, Stage
+
+# Pipeline of jobs that do not define their own, in board order.
+DEFAULT_PIPELINE_STAGES = ("Applied", "Screening", "Interview", "Offer", "Hired", "Rejected")
+
+# Stage codes never change once assigned, so they are cached for the process
+# once committed.
+_stage_codes: Dict[str, int] = {}
+# Session.info key: codes this session interned, cached when it commits
+_UNCOMMITTED = "uncommitted_stage_codes"
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_stages(session: Session) -> None:
+    _stage_codes.update(session.info.pop(_UNCOMMITTED, {}))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_uncommitted_stages(session: Session) -> None:
+    session.info.pop(_UNCOMMITTED, None)
+
+
+def _dialect_insert(dialect_name: str):
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+async def stage_codes(db: AsyncSession, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+    """
+    Codes of the stage `names`. Unknown names are left out, or interned
+    with `create`.
+    """
+    names = set(names)
+    uncommitted = db.info.get(_UNCOMMITTED, {})
+    codes = {name: _stage_codes.get(name) or uncommitted.get(name) for name in names}
+    missing = [name for name, code in codes.items() if code is None]
+    codes = {name: code for name, code in codes.items() if code is not None}
+    if not missing:
+        return codes
+
+    found = dict((await db.execute(select(Stage.name, Stage.code).where(Stage.name.in_(missing)))).all())
+    _stage_codes.update(found)
+    codes.update(found)
+    new = [name for name in missing if name not in found]
+    if new and create:
+        # Another transaction may intern the same stage concurrently; keep its row.
+        await db.execute(
+            _dialect_insert(db.get_bind().dialect.name)(Stage)
+            .values([{"name": name} for name in new])
+            .on_conflict_do_nothing(index_elements=[Stage.name])
+        )
+        interned = dict((await db.execute(select(Stage.name, Stage.code).where(Stage.name.in_(new)))).all())
+        db.info.setdefault(_UNCOMMITTED, {}).update(interned)
+        codes.update(interned)
+    return codes
+
+
+async def seed_default_stages(conn: AsyncConnection) -> None:
+    """Intern the default pipeline stages, in board order, on a database created without migrations."""
+    await conn.execute(
+        _dialect_insert(conn.dialect.name)(Stage)
+        .values([{"name": name} for name in DEFAULT_PIPELINE_STAGES])
+        .on_conflict_do_nothing(index_elements=[Stage.name])
+    )
+
+
+def stage_code_of(name: str):
+    """Scalar subquery for the code of the stage `name`, for filtering by name."""
+    return select(Stage.code).where(Stage.name == name).scalar_subquery()
+
+
+def stage_allowed(job_id, code, default_codes: Sequence[int]):
+    """
+    SQL condition: stage `code` belongs to the pipeline of job `job_id`, its
+    own or else the default one. Both may be columns or per-row expressions.
+    """
+    defined = select(JobPipelineStage.stage_code).where(JobPipelineStage.job_id == job_id)
+    return or_(
+        exists(defined.where(JobPipelineStage.stage_code == code)),
+        and_(code.in_(default_codes), ~exists(defined)),
+    )
+
+
+async def default_stage_codes(db: AsyncSession) -> List[int]:
+    """Codes of the default pipeline stages, for stage_allowed."""
+    codes = await stage_codes(db, DEFAULT_PIPELINE_STAGES)
+    return [codes[name] for name in DEFAULT_PIPELINE_STAGES if name in codes]
+
+
+async def pipeline_stages(db: AsyncSession, job_id: uuid.UUID) -> List[str]:
+    """Stage names of a job's pipeline in board order; the default pipeline unless it defines one."""
+    result = await db.execute(
+        select(Stage.name)
+        .join(JobPipelineStage, JobPipelineStage.stage_code == Stage.code)
+        .where(JobPipelineStage.job_id == job_id)
+        .order_by(JobPipelineStage.position)
+    )
+    return list(result.scalars()) or list(DEFAULT_PIPELINE_STAGES)
+
+
+async def set_pipeline_stages(db: AsyncSession, job_id: uuid.UUID, names: Sequence[str]) -> Dict[str, int]:
+    """
+    Replace a job's pipeline with `names`, interning new stage names.
+    Setting the default pipeline drops the job's own definition.
+    """
+    await db.execute(delete(JobPipelineStage).where(JobPipelineStage.job_id == job_id))
+    codes = await stage_codes(db, names, create=True)
+    if tuple(names) != DEFAULT_PIPELINE_STAGES:
+        await db.execute(insert(JobPipelineStage), [
+            {"job_id": job_id, "stage_code": codes[name], "position": position}
+            for position, name in enumerate(names)
+        ])
+    return codes
+
+
+def literal_code(code: int):
+    """A stage code as a bound SQL value, to compare or insert like the column."""
+    return literal(code, Stage.code.type)
@@ -0,0 +1,130 @@
+"""
+Latency of the /api/analytics endpoints over the maintained stage counters.
+
+The endpoints never read `applications`, so their cost depends on the
+number of jobs, sources and stages only. This seeds jobs plus the counter
+rows that `--applications` applications spread over them would produce,
+then times each endpoint in-process.
+
+Run with: python -m benchmarks.bench_analytics [--applications 5000000 --jobs 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+STAGES = ["Applied", "Screening", "Interview", "Offer", "Hired", "Rejected"]
+# Share of a stage's entrants moving on to the next one
+PROGRESSION = [0.4, 0.5, 0.4, 0.7]
+
+
+def counter_rows(job_ids, applications: int, sources, seed: int = 42):
+    """JobStageStats rows for `applications` applications spread evenly over `job_ids`."""
+    rng = random.Random(seed)
+    per_bucket = applications // (len(job_ids) * len(sources))
+    for job_id in job_ids:
+        for source in sources:
+            entered = [per_bucket]
+            for rate in PROGRESSION:
+                entered.append(int(entered[-1] * rate * rng.uniform(0.8, 1.2)))
+            # Half of those not moving on are rejected, the rest still wait
+            rejected = [(entered[n] - entered[n + 1]) // 2 for n in range(len(PROGRESSION))]
+            entered.append(sum(rejected))
+            for n, stage in enumerate(STAGES):
+                exited = entered[n + 1] + rejected[n] if n < len(PROGRESSION) else 0
+                yield {
+                    "job_id": job_id,
+                    "source": source,
+                    "stage": stage,
+                    "created": per_bucket if n == 0 else 0,
+                    "entered": entered[n],
+                    "exited": exited,
+                    "current": entered[n] - exited,
+                    "seconds_in_stage": exited * rng.uniform(1, 10) * 86400,
+                }
+
+
+async def run(applications: int, jobs: int, repeat: int) -> list:
+    from httpx import ASGITransport, AsyncClient
+
+    from app import main
+    from app.database import async_session_maker, engine, init_db
+    from app.models import Job, JobStageStats, SourceStageStats
+    from app.services.stages import stage_codes
+    from benchmarks.datagen import EPOCH, SOURCES, insert_rows
+
+    await init_db()
+    async with async_session_maker() as session:
+        codes = await stage_codes(session, STAGES)
+    rng = random.Random(7)
+    job_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(jobs)]
+    await insert_rows(engine, Job, (
+        {"id": job_id, "title": f"Job {n}", "department": "Engineering", "location": "Remote",
+         "job_type": "Full-time", "status": "Open", "created_at": EPOCH, "updated_at": EPOCH}
+        for n, job_id in enumerate(job_ids)
+    ))
+    rollup = defaultdict(lambda: defaultdict(float))
+    rows = []
+    for row in counter_rows(job_ids, applications, SOURCES):
+        row["stage_code"] = codes[row.pop("stage")]
+        rows.append(row)
+        for name in ("created", "entered", "exited", "current", "seconds_in_stage"):
+            rollup[row["source"], row["stage_code"]][name] += row[name]
+    await insert_rows(engine, JobStageStats, rows)
+    await insert_rows(engine, SourceStageStats, (
+        {"source": source, "stage_code": stage_code, **counters}
+        for (source, stage_code), counters in rollup.items()
+    ))
+
+    urls = {
+        "funnel_all_jobs": "/api/analytics/funnel",
+        "funnel_one_job": f"/api/analytics/funnel?job_id={job_ids[len(job_ids) // 2]}",
+        "time_in_stage_all_jobs": "/api/analytics/time-in-stage",
+        "time_in_stage_one_job": f"/api/analytics/time-in-stage?job_id={job_ids[0]}",
+        "sources": "/api/analytics/sources",
+    }
+    results = []
+    transport = ASGITransport(app=main.app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, url in urls.items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get(url)
+                samples.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            result = {
+                "endpoint": name,
+                "applications": applications,
+                "jobs": jobs,
+                "p50_ms": round(statistics.median(samples), 3),
+                "max_ms": round(max(samples), 3),
+            }
+            results.append(result)
+            print(json.dumps(result), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applications", type=int, default=5_000_000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["ENVIRONMENT"] = "benchmark"
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        asyncio.run(run(args.applications, args.jobs, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
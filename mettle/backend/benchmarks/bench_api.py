@@ -0,0 +1,342 @@
+"""
+API load test: latency percentiles and throughput per scenario over a seeded dataset.
+
+Seeds jobs, detailed candidates and their applications (benchmarks.datagen)
+into a scratch SQLite database, or into --database-url, then runs each
+scenario's requests with --concurrency requests in flight, in-process
+through ASGITransport or over HTTP against uvicorn (--target uvicorn).
+Scenarios:
+- list: a filtered page of candidates, or of a job's applications
+- search: full-text and skill search over candidates
+- pipeline: a job's pipeline board
+- apply: a new candidate applying to an open job
+- stage_move: an application moving to another stage
+- login: password login, dominated by bcrypt
+
+The response cache is off unless --response-cache is given, so reads hit
+the database. Prints one JSON document with p50/p95/p99, max and
+throughput per scenario, the commit and the dataset; --output saves it and
+--compare reports the change from a saved run of the same shape.
+
+Run with: python -m benchmarks.bench_api [--applications 10000 --target uvicorn
+          --requests 500 --concurrency 8 --output run.json --compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.stats import percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS = ["list", "search", "pipeline", "apply", "stage_move", "login"]
+PASSWORD = "bench-password"
+COMPARED_SETUP = ("target", "workers", "database", "response_cache", "dataset", "concurrency")
+
+
+@dataclass
+class Context:
+    """Ids and inputs the scenarios draw their requests from."""
+    job_ids: List[str]
+    application_ids: List[str]
+    candidate_ids: List[str] = field(default_factory=list)
+    login_email: str = ""
+
+
+async def list_page(client, context: Context, n: int):
+    from benchmarks.datagen import SOURCES, STATUSES
+
+    if n % 2:
+        return await client.get("/api/applications", params={"job_id": context.job_ids[n % len(context.job_ids)], "limit": 50})
+    return await client.get("/api/candidates", params={
+        "status_filter": STATUSES[n % len(STATUSES)], "source": SOURCES[n % len(SOURCES)], "limit": 50,
+    })
+
+
+async def search(client, context: Context, n: int):
+    from benchmarks.datagen import ROLES, SKILLS
+
+    if n % 2:
+        return await client.get("/api/candidates/search", params={"skills": SKILLS[n % len(SKILLS)], "limit": 20})
+    return await client.get("/api/candidates/search", params={"q": ROLES[n % len(ROLES)].split()[0], "limit": 20})
+
+
+async def pipeline(client, context: Context, n: int):
+    return await client.get(f"/api/jobs/{context.job_ids[n % len(context.job_ids)]}/pipeline")
+
+
+async def apply(client, context: Context, n: int):
+    return await client.post("/api/applications", json={
+        "candidate_id": context.candidate_ids[n], "job_id": context.job_ids[n % len(context.job_ids)],
+    })
+
+
+async def stage_move(client, context: Context, n: int):
+    from app.services.stages import DEFAULT_PIPELINE_STAGES
+
+    application_id = context.application_ids[n % len(context.application_ids)]
+    stage = DEFAULT_PIPELINE_STAGES[(n * 7) % len(DEFAULT_PIPELINE_STAGES)]
+    return await client.patch(f"/api/applications/{application_id}", json={"stage": stage})
+
+
+async def login(client, context: Context, n: int):
+    return await client.post("/api/auth/login", data={"username": context.login_email, "password": PASSWORD})
+
+
+SCENARIO_REQUESTS: Dict[str, Callable[..., Awaitable]] = {
+    "list": list_page,
+    "search": search,
+    "pipeline": pipeline,
+    "apply": apply,
+    "stage_move": stage_move,
+    "login": login,
+}
+
+
+async def seed(jobs: int, candidates: int, applications: int, seed: int) -> dict:
+    """Seed the dataset unless the database already holds jobs; returns the row counts it then holds."""
+    from sqlalchemy import func, select
+
+    from app.database import engine, init_db
+    from app.models import Application, Candidate, Job
+    from benchmarks.datagen import seed_dataset
+
+    await init_db()
+    async with engine.connect() as conn:
+        seeded = not await conn.scalar(select(func.count()).select_from(Job))
+    if seeded:
+        await seed_dataset(engine, jobs, candidates, applications, seed)
+    async with engine.connect() as conn:
+        counts = {
+            name: await conn.scalar(select(func.count()).select_from(model))
+            for name, model in (("jobs", Job), ("candidates", Candidate), ("applications", Application))
+        }
+    return {**counts, "seed": seed if seeded else None}
+
+
+async def prepare(client, scenarios: List[str], total_requests: int) -> Context:
+    """Pick the ids requests use, plus fresh candidates to apply and a user to log in, outside the timings."""
+    from sqlalchemy import func, select
+
+    from app.database import engine
+    from app.models import Application, Candidate, Job
+    from benchmarks.datagen import seed_candidates
+
+    async with engine.connect() as conn:
+        job_ids = (await conn.execute(select(Job.id).where(Job.status == "Open").order_by(Job.id).limit(500))).scalars()
+        application_ids = (await conn.execute(select(Application.id).order_by(Application.id).limit(5000))).scalars()
+        context = Context([str(row) for row in job_ids], [str(row) for row in application_ids])
+        existing = await conn.scalar(select(func.count()).select_from(Candidate))
+    random.Random(7).shuffle(context.application_ids)
+
+    if "apply" in scenarios:
+        # Candidates numbered past every existing one, so reruns never collide
+        await seed_candidates(engine, existing, existing + total_requests, detailed=False)
+        async with engine.connect() as conn:
+            fresh = await conn.execute(
+                select(Candidate.id).where(Candidate.email.in_([
+                    f"candidate{i}@example.com" for i in range(existing, existing + total_requests)
+                ]))
+            )
+            context.candidate_ids = [str(row) for row in fresh.scalars()]
+    if "login" in scenarios:
+        context.login_email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        (await client.post("/api/auth/register", json={
+            "email": context.login_email, "password": PASSWORD, "full_name": "Bench User",
+        })).raise_for_status()
+    return context
+
+
+async def run_scenario(client, name: str, context: Context, requests: int, warmup: int, concurrency: int) -> dict:
+    request = SCENARIO_REQUESTS[name]
+    for n in range(warmup):
+        await request(client, context, n)
+
+    samples, errors = [], 0
+    numbers = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        nonlocal errors
+        for n in numbers:
+            started = time.perf_counter()
+            response = await request(client, context, n)
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    result = {
+        "scenario": name,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": round(max(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+    print(json.dumps(result), file=sys.stderr, flush=True)
+    return result
+
+
+async def run_scenarios(client, args) -> list:
+    context = await prepare(client, args.scenarios, args.warmup + args.requests)
+    return [
+        await run_scenario(client, name, context, args.requests, args.warmup, args.concurrency)
+        for name in args.scenarios
+    ]
+
+
+async def run_inprocess(args) -> list:
+    from httpx import ASGITransport, AsyncClient
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            return await run_scenarios(client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(args) -> list:
+    import httpx
+
+    from app.database import engine
+
+    await engine.dispose()
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR, env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/api/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            return await run_scenarios(client, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _git(*command: str) -> str:
+    try:
+        return subprocess.run(["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Relative change of each scenario's percentiles and throughput from `baseline` (+0.1 is 10% higher)."""
+    before = {result["scenario"]: result for result in baseline["scenarios"]}
+    changes = []
+    for result in current["scenarios"]:
+        old = before.get(result["scenario"])
+        if old is None:
+            continue
+        changes.append({
+            "scenario": result["scenario"],
+            **{
+                f"{key}_change": round(result[key] / old[key] - 1, 4) if old[key] else None
+                for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+            },
+        })
+    return changes
+
+
+async def run(args) -> dict:
+    dataset = await seed(args.jobs, args.candidates, args.applications, args.seed)
+    scenarios = await (run_uvicorn(args) if args.target == "uvicorn" else run_inprocess(args))
+    from app.database import engine
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else None,
+        "database": engine.dialect.name,
+        "response_cache": args.response_cache,
+        # As found before the run; None for the seed when the database was reused
+        "dataset": dataset,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applications", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, help="default: one per 200 applications, at least 20")
+    parser.add_argument("--candidates", type=int, help="default: one per 2 applications, at least 100")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="seed (if empty) and use this database instead of a scratch SQLite file")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--response-cache", choices=["none", "memory"], default="none")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+    args.jobs = args.jobs or max(20, args.applications // 200)
+    args.candidates = args.candidates or max(100, args.applications // 2)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["ENVIRONMENT"] = "benchmark"
+        os.environ["RESPONSE_CACHE_BACKEND"] = args.response_cache
+        result = asyncio.run(run(args))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        result["compared_to"] = baseline["commit"]
+        # Runs only compare like for like: same data, target and load
+        result["comparable"] = all(result[key] == baseline.get(key) for key in COMPARED_SETUP)
+        result["changes"] = compare(result, baseline)
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
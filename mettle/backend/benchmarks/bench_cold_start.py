@@ -0,0 +1,96 @@
+"""
+Worker cold start: import time, startup and time to the first response.
+
+Each run is a fresh interpreter against a scratch SQLite database migrated
+to the Alembic head, booting in both startup schema modes: "create" (runs
+create_all) and "verify" (revision check only, the production default).
+A run reports the time to import app.main, to run the lifespan startup, to
+serve a first GET /api/jobs, and the process wall time around all of it.
+
+Exits non-zero when the median time from process start to the first
+response in verify mode exceeds --budget-ms, so it can gate CI.
+
+Run with: python -m benchmarks.bench_cold_start [--runs 10 --budget-ms 3000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.datagen import scratch_database_url
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    from httpx import ASGITransport, AsyncClient
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            (await client.get("/api/jobs?limit=20")).raise_for_status()
+        return ready, time.perf_counter()
+
+ready, served = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (served - ready) * 1000,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_to_first_response_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    results = {}
+    with scratch_database_url() as url:
+        env = {
+            **os.environ,
+            "DATABASE_URL": url,
+            "ENVIRONMENT": "benchmark",
+            "RESPONSE_CACHE_BACKEND": "none",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR, env=env, check=True, capture_output=True,
+        )
+        for mode in ("create", "verify"):
+            runs = [run_once({**env, "DB_STARTUP_SCHEMA": mode}) for _ in range(args.runs)]
+            result = {"startup_schema": mode, "runs": args.runs}
+            for key in runs[0]:
+                samples = [run[key] for run in runs]
+                result[f"{key.removesuffix('_ms')}_p50_ms"] = round(statistics.median(samples), 1)
+                result[f"{key.removesuffix('_ms')}_max_ms"] = round(max(samples), 1)
+            results[mode] = result
+            print(json.dumps(result), flush=True)
+
+    cold_start = results["verify"]["process_to_first_response_p50_ms"]
+    print(json.dumps({"budget_ms": args.budget_ms, "verify_cold_start_p50_ms": cold_start}), flush=True)
+    if cold_start > args.budget_ms:
+        sys.exit(f"Cold start {cold_start} ms is over the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Streaming export throughput and memory.
+
+Seeds detailed candidates into a scratch database, then drains the
+/api/candidates/export body generator in each format, sampling peak RSS as
+rows stream so flat memory is visible.
+
+Run with: python -m benchmarks.bench_export [--rows 1000000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def run(rows: int, batch_size: int) -> list:
+    from app.database import engine, init_db
+    from app.models import Candidate
+    from app.services.exports import iter_export
+    from benchmarks.datagen import seed_candidates
+
+    await init_db()
+    await seed_candidates(engine, 0, rows)
+    rss_after_seed = peak_rss_mb()
+
+    results = []
+    for file_format in ("csv", "ndjson"):
+        exported_bytes = 0
+        exported_rows = 0
+        rss_samples = []
+        started = time.perf_counter()
+        async for chunk in iter_export(Candidate.__table__, [], file_format, batch_size):
+            exported_bytes += len(chunk)
+            exported_rows += chunk.count("\n")
+            if exported_rows // max(rows // 10, 1) > len(rss_samples):
+                rss_samples.append(peak_rss_mb())
+        elapsed = time.perf_counter() - started
+        result = {
+            "format": file_format,
+            "rows": rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed),
+            "mb_per_sec": round(exported_bytes / elapsed / 1e6, 2),
+            "peak_rss_mb_after_seed": rss_after_seed,
+            "peak_rss_mb_by_decile": rss_samples,
+        }
+        results.append(result)
+        print(json.dumps(result), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from benchmarks.datagen import scratch_database_url
+
+    with scratch_database_url() as url:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = url
+        os.environ["ENVIRONMENT"] = "benchmark"
+        asyncio.run(run(args.rows, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
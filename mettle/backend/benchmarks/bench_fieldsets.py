@@ -0,0 +1,78 @@
+"""
+Payload and latency of sparse fieldsets on GET /api/candidates.
+
+Seeds detailed candidates, then requests 100-row pages through the app
+in-process with the response cache off: the full representation, the
+CandidateSummary view, and a two-field projection, each with and without
+FAST_LIST_SERIALIZATION.
+
+Run with: python -m benchmarks.bench_fieldsets [--rows 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+VARIANTS = {
+    "full": "",
+    "summary": "&view=summary",
+    "name_role": "&fields=name,role",
+}
+
+
+async def run(rows: int, page_size: int, repeat: int) -> list:
+    from httpx import ASGITransport, AsyncClient
+
+    from app import main
+    from app.config import settings
+    from app.database import engine, init_db
+    from benchmarks.datagen import seed_candidates
+
+    await init_db()
+    await seed_candidates(engine, 0, rows)
+
+    results = []
+    transport = ASGITransport(app=main.app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for fast in (False, True):
+            settings.fast_list_serialization = fast
+            for name, params in VARIANTS.items():
+                url = f"/api/candidates?limit={page_size}{params}"
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    samples.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+                result = {
+                    "variant": name,
+                    "fast_list_serialization": fast,
+                    "page_size": page_size,
+                    "body_bytes": len(response.content),
+                    "p50_ms": round(statistics.median(samples), 3),
+                }
+                results.append(result)
+                print(json.dumps(result), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["ENVIRONMENT"] = "benchmark"
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        asyncio.run(run(args.rows, args.page_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Latency of unrelated endpoints during a login storm.
+
+Fires concurrent logins at the app in-process while a probe keeps calling
+GET /api/jobs, and reports probe percentiles idle vs during the storm. With
+--inline, bcrypt runs on the event loop as it did before hashing moved to the
+worker pool, for comparison.
+
+Run with: python -m benchmarks.bench_login_storm [--logins 50] [--inline]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.stats import percentile
+
+
+def summarize(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+async def timed(client, method: str, url: str, **kwargs) -> float:
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(logins: int, probes: int, inline: bool) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from app import main
+    from app.database import init_db
+    from app.services import passwords
+
+    if inline:
+        auth_router = importlib.import_module("app.routers.auth")
+
+        async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+            return passwords.pwd_context.verify(plain_password, hashed_password)
+        auth_router.verify_password = verify_inline
+
+    await init_db()
+    transport = ASGITransport(app=main.app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"username": "storm@example.com", "password": "bench-password"}
+        registered = await client.post("/api/auth/register", json={
+            "email": credentials["username"],
+            "password": credentials["password"],
+            "full_name": "Storm Bench",
+        })
+        registered.raise_for_status()
+
+        idle = [await timed(client, "GET", "/api/jobs?limit=10") for _ in range(probes)]
+
+        storm_done = asyncio.Event()
+        during = []
+
+        async def probe():
+            while not storm_done.is_set():
+                during.append(await timed(client, "GET", "/api/jobs?limit=10"))
+
+        async def storm():
+            try:
+                return await asyncio.gather(*(
+                    timed(client, "POST", "/api/auth/login", data=credentials)
+                    for _ in range(logins)
+                ))
+            finally:
+                storm_done.set()
+
+        started = time.perf_counter()
+        login_samples, _ = await asyncio.gather(storm(), probe())
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": "inline" if inline else passwords.hasher.executor_kind,
+        "concurrent_logins": logins,
+        "storm_seconds": round(elapsed, 3),
+        "unrelated_idle": summarize(idle),
+        "unrelated_during_storm": summarize(during),
+        "login": summarize(login_samples),
+        "hasher": passwords.hasher.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop (baseline)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["ENVIRONMENT"] = "benchmark"
+        result = asyncio.run(run(args.logins, args.probes, args.inline))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Deep-page latency: offset vs keyset pagination on list_candidates.
+
+Seeds a scratch database incrementally up to each requested size and times
+fetching a page near the end of the table both ways: paginate() alone, and
+GET /api/candidates in-process (response cache off), which adds the total
+count, ETag and serialization every request pays for.
+
+Run with: python -m benchmarks.bench_pagination [--sizes 10000,100000,1000000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base, Candidate
+from app.pagination import encode_cursor, paginate
+from benchmarks.datagen import scratch_database_url, seed_candidates
+
+PAGE_SIZE = 100
+
+
+async def time_page(session_maker, repeat: int, **kwargs) -> float:
+    samples = []
+    for _ in range(repeat):
+        async with session_maker() as db:
+            started = time.perf_counter()
+            await paginate(
+                db, select(Candidate), Candidate.created_at, Candidate.id,
+                Response(), limit=PAGE_SIZE, **kwargs,
+            )
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def time_endpoint(client, repeat: int, url: str) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        (await client.get(url)).raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run(sizes, repeat: int, database_url: str) -> list:
+    # The app's engine reads DATABASE_URL, set by main() before this import
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+    engine = create_async_engine(database_url)
+    session_maker = lambda: AsyncSession(engine, expire_on_commit=False)  # noqa: E731
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    results = []
+    seeded = 0
+    for size in sizes:
+        await seed_candidates(engine, seeded, size, detailed=False)
+        seeded = size
+
+        depth = size - PAGE_SIZE
+        async with session_maker() as db:
+            boundary = (await db.execute(
+                select(Candidate.created_at, Candidate.id)
+                .order_by(Candidate.created_at.desc(), Candidate.id.desc())
+                .offset(depth - 1).limit(1)
+            )).one()
+        cursor = encode_cursor(boundary.created_at, boundary.id)
+
+        result = {
+            "rows": size,
+            "page_depth": depth,
+            "offset_ms": round(await time_page(session_maker, repeat, skip=depth), 3),
+            "keyset_ms": round(await time_page(session_maker, repeat, cursor=cursor), 3),
+            "endpoint_offset_ms": round(
+                await time_endpoint(client, repeat, f"/api/candidates?limit={PAGE_SIZE}&skip={depth}"), 3
+            ),
+            "endpoint_keyset_ms": round(
+                await time_endpoint(client, repeat, f"/api/candidates?limit={PAGE_SIZE}&cursor={cursor}"), 3
+            ),
+        }
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    await client.aclose()
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--database-url",
+        help="Scratch database to benchmark against (its tables are dropped). "
+             "Defaults to a temporary SQLite file.",
+    )
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    os.environ["ENVIRONMENT"] = "benchmark"
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+        asyncio.run(run(sizes, args.repeat, args.database_url))
+        return
+    with scratch_database_url() as url:
+        os.environ["DATABASE_URL"] = url
+        asyncio.run(run(sizes, args.repeat, url))
+
+
+if __name__ == "__main__":
+    main()
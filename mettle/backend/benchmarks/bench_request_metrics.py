@@ -0,0 +1,78 @@
+"""
+Overhead of request metrics: the same requests with instrumentation on and off.
+
+Runs GET /api/jobs and GET /api/jobs/{id} in-process against a scratch
+SQLite database (response cache off, so every request hits the database),
+alternating rounds with the metrics middleware and cursor hooks enabled and
+disabled, and reports the latency percentiles of each and the difference.
+
+Run with: python -m benchmarks.bench_request_metrics [--requests 2000 --rounds 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.stats import percentile
+
+
+async def run(requests: int, rounds: int) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from app import main
+    from app.database import init_db
+    from app.metrics import request_metrics
+
+    await init_db()
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://bench") as client:
+        job_ids = []
+        for n in range(50):
+            response = await client.post("/api/jobs", json={
+                "title": f"Bench Job {n}", "department": "Engineering", "location": "Remote", "job_type": "Full-time",
+            })
+            response.raise_for_status()
+            job_ids.append(response.json()["id"])
+        urls = ["/api/jobs?limit=20"] + [f"/api/jobs/{job_id}" for job_id in job_ids]
+
+        samples = {True: [], False: []}
+        for _ in range(rounds):
+            for enabled in (True, False):
+                request_metrics.enabled = enabled
+                for n in range(requests // rounds):
+                    started = time.perf_counter()
+                    (await client.get(urls[n % len(urls)])).raise_for_status()
+                    samples[enabled].append((time.perf_counter() - started) * 1000)
+        request_metrics.enabled = True
+
+    result = {"requests_per_mode": len(samples[True])}
+    for enabled, name in ((False, "off"), (True, "on")):
+        result[name] = {
+            "mean_ms": round(statistics.fmean(samples[enabled]), 4),
+            "p50_ms": percentile(samples[enabled], 50, digits=4),
+            "p99_ms": percentile(samples[enabled], 99, digits=4),
+        }
+    result["overhead_mean_ms"] = round(result["on"]["mean_ms"] - result["off"]["mean_ms"], 4)
+    result["overhead_p50_ms"] = round(result["on"]["p50_ms"] - result["off"]["p50_ms"], 4)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its engine) is imported.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["ENVIRONMENT"] = "benchmark"
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+        result = asyncio.run(run(args.requests, args.rounds))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
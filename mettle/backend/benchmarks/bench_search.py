@@ -0,0 +1,93 @@
+"""
+Candidate search latency: full-text index vs a LIKE scan.
+
+Seeds detailed candidates into a scratch database (the search index is
+maintained by the database as rows are inserted), then times a page of
+GET /api/candidates/search results for keyword, skill and combined queries
+against an unindexed LIKE scan over the same text.
+
+Run with: python -m benchmarks.bench_search [--rows 500000]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base, Candidate
+from app.services.search import search_candidates_query
+from benchmarks.datagen import scratch_database_url, seed_candidates
+
+PAGE_SIZE = 20
+
+# name: (text, skills, match_all)
+QUERIES = {
+    "keyword": ("kubernetes", [], True),
+    "rare_keyword": ("candidate 123457", [], True),
+    "skills_all": (None, ["Rust", "Kafka", "Terraform"], True),
+    "skills_any": (None, ["Rust", "Go"], False),
+    "rare_skill": (None, ["Haskell"], True),
+    "keyword_and_skills": ("devops engineer", ["AWS", "Docker"], True),
+}
+
+
+async def time_query(engine, query, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        async with AsyncSession(engine) as db:
+            started = time.perf_counter()
+            (await db.execute(query.limit(PAGE_SIZE))).scalars().all()
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run(rows: int, repeat: int, database_url: str) -> list:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    started = time.perf_counter()
+    await seed_candidates(engine, 0, rows)
+    print(json.dumps({"rows": rows, "seed_seconds": round(time.perf_counter() - started, 1)}), flush=True)
+
+    results = []
+    for name, (text, skills, match_all) in QUERIES.items():
+        query = search_candidates_query(engine.dialect.name, text, skills, match_all)
+        result = {"query": name, "rows": rows, "search_ms": round(await time_query(engine, query, repeat), 3)}
+        if text:
+            pattern = f"%{text}%"
+            scan = select(Candidate).where(or_(
+                Candidate.name.ilike(pattern), Candidate.role.ilike(pattern), Candidate.summary.ilike(pattern),
+            )).order_by(Candidate.created_at.desc(), Candidate.id.desc())
+            result["like_scan_ms"] = round(await time_query(engine, scan, repeat), 3)
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--database-url",
+        help="Scratch database to benchmark against (its tables are dropped). "
+             "Defaults to a temporary SQLite file.",
+    )
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(run(args.rows, args.repeat, args.database_url))
+        return
+    with scratch_database_url() as url:
+        asyncio.run(run(args.rows, args.repeat, url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+List response cost: per-row Pydantic validation vs the column fast path.
+
+Seeds detailed candidates (experience/education JSON) and times building the
+body of one list page three ways from the same query:
+- response_model: ORM objects validated and encoded by FastAPI, as
+  list_applications does by default.
+- type_adapter: ORM objects validated through a TypeAdapter and dumped with
+  dump_json, as the response-cached job and candidate lists do by default.
+- fast_path: response columns selected and the rows serialized directly
+  (FAST_LIST_SERIALIZATION).
+Fetch and serialization are timed separately.
+
+Run with: python -m benchmarks.bench_serialization [--rows 10000] [--page-sizes 20,100,500]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base, Candidate
+from app.pagination import paginate
+from app.schemas.candidate import CandidateResponse
+from app.serialization import render_rows, response_columns
+from app.services.response_cache import render_json
+from benchmarks.datagen import scratch_database_url, seed_candidates
+
+RESPONSE_FIELD = create_model_field("Response_list_candidates", List[CandidateResponse], mode="serialization")
+LIST_ADAPTER = TypeAdapter(List[CandidateResponse])
+COLUMNS = response_columns(Candidate, CandidateResponse)
+
+
+async def validated_body(rows) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=rows)
+    return JSONResponse(content).body
+
+
+async def type_adapter_body(rows) -> bytes:
+    return render_json(LIST_ADAPTER, rows, Response()).body
+
+
+async def fast_body(rows) -> bytes:
+    return render_rows(rows, Response()).body
+
+
+PATHS = {"response_model": validated_body, "type_adapter": type_adapter_body, "fast_path": fast_body}
+
+
+async def time_path(session_maker, repeat: int, page_size: int, path: str) -> dict:
+    fast = path == "fast_path"
+    fetch, serialize = [], []
+    for _ in range(repeat):
+        async with session_maker() as db:
+            started = time.perf_counter()
+            rows = await paginate(
+                db, select(*COLUMNS) if fast else select(Candidate),
+                Candidate.created_at, Candidate.id, Response(),
+                limit=page_size, scalars=not fast,
+            )
+            fetched = time.perf_counter()
+            body = await PATHS[path](rows)
+            done = time.perf_counter()
+        fetch.append((fetched - started) * 1000)
+        serialize.append((done - fetched) * 1000)
+    return {
+        "fetch_ms": round(statistics.median(fetch), 3),
+        "serialize_ms": round(statistics.median(serialize), 3),
+        "total_ms": round(statistics.median(f + s for f, s in zip(fetch, serialize)), 3),
+        "body_bytes": len(body),
+    }
+
+
+async def run(rows: int, page_sizes, repeat: int, database_url: str) -> list:
+    engine = create_async_engine(database_url)
+    session_maker = lambda: AsyncSession(engine, expire_on_commit=False)  # noqa: E731
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await seed_candidates(engine, 0, rows)
+
+    async with session_maker() as db:
+        sample = await paginate(db, select(Candidate), Candidate.created_at, Candidate.id, Response(), limit=50)
+        fast_sample = await paginate(
+            db, select(*COLUMNS), Candidate.created_at, Candidate.id, Response(), limit=50, scalars=False,
+        )
+    expected = json.loads(await validated_body(sample))
+    if json.loads(await type_adapter_body(sample)) != expected or json.loads(await fast_body(fast_sample)) != expected:
+        raise SystemExit("serialization paths disagree")
+
+    results = []
+    for page_size in page_sizes:
+        result = {"page_size": page_size}
+        for path in PATHS:
+            result[path] = await time_path(session_maker, repeat, page_size, path)
+        result["speedup"] = {
+            path: round(result[path]["total_ms"] / result["fast_path"]["total_ms"], 2)
+            for path in ("response_model", "type_adapter")
+        }
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--page-sizes", default="20,100,500")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument(
+        "--database-url",
+        help="Scratch database to benchmark against (its tables are dropped). "
+             "Defaults to a temporary SQLite file.",
+    )
+    args = parser.parse_args()
+
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    if args.database_url:
+        asyncio.run(run(args.rows, page_sizes, args.repeat, args.database_url))
+        return
+    with scratch_database_url() as url:
+        asyncio.run(run(args.rows, page_sizes, args.repeat, url))
+
+
+if __name__ == "__main__":
+    main()
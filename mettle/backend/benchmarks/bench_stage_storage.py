@@ -0,0 +1,130 @@
+"""
+On-disk size of applications with stage names vs smallint stage codes.
+
+Seeds the same applications into two scratch SQLite databases, one with
+the applications table as it is (a stage_code column) and one with the
+stage name stored as text as it used to be, then reports each table's and
+index's size from the dbstat virtual table. The table's payload (bytes of
+row data, without page slack) is reported too: rows only shrink by a few
+bytes, which whole pages of fixed size may not show.
+
+Run with: python -m benchmarks.bench_stage_storage [--rows 1000000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models import Application
+from app.services.stages import DEFAULT_PIPELINE_STAGES
+from benchmarks.datagen import EPOCH, SOURCES, STAGE_WEIGHTS, insert_rows, scratch_database_url
+
+
+def text_stage_table() -> Table:
+    """The applications table as it was before stage codes, with the same indexes."""
+    return Table(
+        "applications",
+        MetaData(),
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("candidate_id", UUID(as_uuid=True), nullable=False, index=True),
+        Column("job_id", UUID(as_uuid=True), nullable=False, index=True),
+        Column("source", String(50), nullable=False),
+        Column("stage", String(50), nullable=False),
+        Column("applied_at", DateTime(timezone=True), nullable=False),
+        Column("stage_entered_at", DateTime(timezone=True), nullable=False),
+        Column("created_at", DateTime(timezone=True), nullable=False),
+        Column("updated_at", DateTime(timezone=True), nullable=False),
+        UniqueConstraint("candidate_id", "job_id"),
+        Index("ix_applications_applied_at_id", "applied_at", "id"),
+        Index("ix_applications_job_id_applied_at_id", "job_id", "applied_at", "id"),
+        Index("ix_applications_job_id_stage_applied_at_id", "job_id", "stage", "applied_at", "id"),
+    )
+
+
+def application_rows(rows: int, jobs: int, stage_key: str, stages: dict, seed: int = 42):
+    rng = random.Random(seed)
+    job_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(jobs)]
+    for n in range(rows):
+        applied_at = EPOCH + timedelta(minutes=n)
+        stage = rng.choices(DEFAULT_PIPELINE_STAGES, STAGE_WEIGHTS)[0]
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "candidate_id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "job_id": job_ids[n % jobs],
+            "source": rng.choice(SOURCES),
+            stage_key: stages[stage],
+            "applied_at": applied_at,
+            "stage_entered_at": applied_at,
+            "created_at": applied_at,
+            "updated_at": applied_at,
+        }
+
+
+async def measure(table: Table, stage_key: str, stages: dict, rows: int, jobs: int) -> tuple:
+    """Bytes used by `table` and each of its indexes once seeded, and the table's payload bytes."""
+    with scratch_database_url() as url:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(table.create)
+        await insert_rows(engine, table, application_rows(rows, jobs, stage_key, stages))
+        async with engine.begin() as conn:
+            await conn.execute(text("VACUUM"))
+            sizes = dict((await conn.execute(text(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name NOT LIKE 'sqlite_%' GROUP BY name"
+            ))).all())
+            autoindexes = (await conn.execute(text(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'sqlite_autoindex_%'"
+            ))).scalar()
+            payload = (await conn.execute(text(
+                "SELECT SUM(payload) FROM dbstat WHERE name = :name"
+            ), {"name": table.name})).scalar()
+        await engine.dispose()
+    sizes["primary key and unique indexes"] = autoindexes or 0
+    return sizes, payload
+
+
+async def run(rows: int, jobs: int) -> list:
+    codes = {name: code for code, name in enumerate(DEFAULT_PIPELINE_STAGES, start=1)}
+    layouts = {
+        "stage_text": await measure(text_stage_table(), "stage", {name: name for name in codes}, rows, jobs),
+        "stage_code": await measure(Application.__table__, "stage_code", codes, rows, jobs),
+    }
+    results = []
+    for layout, (sizes, payload) in layouts.items():
+        result = {
+            "layout": layout,
+            "rows": rows,
+            "table_bytes": sizes.pop("applications"),
+            "table_payload_bytes": payload,
+            "index_bytes": sum(sizes.values()),
+            "indexes": sizes,
+        }
+        result["total_bytes"] = result["table_bytes"] + result["index_bytes"]
+        results.append(result)
+        print(json.dumps(result), flush=True)
+    before, after = results
+    print(json.dumps({
+        "table_reduction": round(1 - after["table_bytes"] / before["table_bytes"], 4),
+        "table_payload_reduction": round(1 - after["table_payload_bytes"] / before["table_payload_bytes"], 4),
+        "index_reduction": round(1 - after["index_bytes"] / before["index_bytes"], 4),
+        "total_reduction": round(1 - after["total_bytes"] / before["total_bytes"], 4),
+    }), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.jobs))
+
+
+if __name__ == "__main__":
+    main()
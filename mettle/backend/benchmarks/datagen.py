@@ -0,0 +1,220 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Row generators are deterministic for a given seed so runs are comparable
+across commits.
+"""
+import os
+import random
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from sqlalchemy import func, insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Application, Candidate, CandidateSkill, Job, Skill, Stage
+from app.services import analytics, history
+from app.services.skills import skill_key
+from app.services.stages import DEFAULT_PIPELINE_STAGES
+
+BATCH_SIZE = 5_000
+EPOCH = datetime(2024, 1, 1)
+
+ROLES = ["Backend Engineer", "Frontend Engineer", "Data Scientist", "Product Manager",
+         "DevOps Engineer", "QA Engineer", "Designer", "Sales Executive"]
+SOURCES = ["LinkedIn", "GitHub", "Referral", "CareerPage", "Indeed"]
+STATUSES = ["New", "Screening", "Interview", "Offer", "Hired", "Rejected"]
+LOCATIONS = ["Istanbul", "Ankara", "Izmir", "Berlin", "London", "Remote"]
+SKILLS = ["Python", "FastAPI", "Django", "React", "TypeScript", "PostgreSQL", "Kubernetes",
+          "Docker", "AWS", "Go", "Rust", "Java", "Kafka", "Redis", "GraphQL", "Terraform"]
+# Long tail: about 1 candidate in 50 lists one of these
+NICHE_SKILLS = ["Haskell", "Elixir", "OCaml", "Clojure", "Erlang", "Fortran", "COBOL", "Zig",
+                "Nim", "Crystal", "F#", "Prolog", "Solidity", "Julia", "Lua", "Ada"]
+COMPANIES = ["Albaraka Tech", "Trendyol", "Getir", "Insider", "Peak Games", "Papara"]
+SCHOOLS = ["METU", "Bogazici University", "ITU", "Bilkent University", "Koc University"]
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "HR", "Product"]
+JOB_TYPES = ["Full-time", "Contract", "Remote"]
+# Share of jobs per status, and of applications in each stage (pipeline order)
+JOB_STATUS_WEIGHTS = {"Open": 70, "Closed": 20, "Draft": 10}
+STAGE_WEIGHTS = [45, 20, 10, 3, 2, 20]
+
+
+def candidate_rows(start: int, stop: int, seed: int = 42, detailed: bool = True) -> Iterator[dict]:
+    """
+    Candidate rows `start`..`stop`; several rows share each created_at second.
+
+    With `detailed`, rows carry summary text and experience/education JSON
+    shaped like the API writes them (every schema key present).
+    """
+    rng = random.Random(seed * 1_000_003 + start)
+    for i in range(start, stop):
+        created = EPOCH + timedelta(seconds=i // 4)
+        skills = rng.sample(SKILLS, rng.randint(2, 6))
+        if rng.random() < 0.02:
+            skills.append(rng.choice(NICHE_SKILLS))
+        row = {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "role": rng.choice(ROLES),
+            "source": rng.choice(SOURCES),
+            "status": rng.choice(STATUSES),
+            "score": rng.randint(0, 100),
+            "location": rng.choice(LOCATIONS),
+            "skills": skills,
+            "tags": skills[:3],
+            "experience_years": rng.randint(0, 20),
+            "created_at": created,
+            "updated_at": created,
+        }
+        if detailed:
+            row["summary"] = (
+                f"{row['role']} with {row['experience_years']} years of experience in "
+                f"{', '.join(skills)}. " * 3
+            )
+            row["experience"] = [
+                {
+                    "id": f"exp-{i}-{n}",
+                    "title": rng.choice(ROLES),
+                    "company": rng.choice(COMPANIES),
+                    "start_date": f"{2010 + n * 3}-0{rng.randint(1, 9)}",
+                    "end_date": f"{2013 + n * 3}-0{rng.randint(1, 9)}",
+                    "location": rng.choice(LOCATIONS),
+                    "description": "Built and operated services used by millions of customers.",
+                }
+                for n in range(rng.randint(1, 4))
+            ]
+            row["education"] = [
+                {
+                    "id": f"edu-{i}",
+                    "school": rng.choice(SCHOOLS),
+                    "degree": "BSc Computer Engineering",
+                    "start_date": "2006-09",
+                    "end_date": "2010-06",
+                    "grade": None,
+                }
+            ]
+        yield row
+
+
+def job_rows(count: int, seed: int = 42) -> Iterator[dict]:
+    """`count` job rows, one created per hour from EPOCH, with requirements drawn from SKILLS."""
+    rng = random.Random(seed * 1_000_003 - 1)
+    for i in range(count):
+        created = EPOCH + timedelta(hours=i)
+        role = rng.choice(ROLES)
+        requirements = rng.sample(SKILLS, rng.randint(3, 6))
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "title": f"{role} {i}",
+            "department": rng.choice(DEPARTMENTS),
+            "location": rng.choice(LOCATIONS),
+            "job_type": rng.choice(JOB_TYPES),
+            "status": rng.choices(list(JOB_STATUS_WEIGHTS), list(JOB_STATUS_WEIGHTS.values()))[0],
+            "description": f"We are hiring a {role} to work with {', '.join(requirements)}.",
+            "requirements": requirements,
+            "applicants_count": 0,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def application_rows(job_ids, candidates, count: int, stage_codes: dict, seed: int = 42) -> Iterator[dict]:
+    """
+    `count` application rows over `job_ids` x `candidates`, (id, source)
+    pairs, each job/candidate pair at most once: every candidate applies to
+    about count / len(candidates) jobs. Stages follow STAGE_WEIGHTS;
+    `stage_codes` maps their names to codes.
+    """
+    jobs, candidate_count = len(job_ids), len(candidates)
+    if count > jobs * candidate_count:
+        raise ValueError(f"{count} applications need more than {jobs} jobs x {candidate_count} candidates")
+    rng = random.Random(seed * 1_000_003 + 1)
+    codes = [stage_codes[name] for name in DEFAULT_PIPELINE_STAGES]
+    for n in range(count):
+        candidate = n % candidate_count
+        candidate_id, source = candidates[candidate]
+        # Distinct rounds give a candidate distinct jobs; the stride spreads them
+        job = (n // candidate_count + candidate * 7919) % jobs
+        applied_at = EPOCH + timedelta(minutes=n)
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "candidate_id": candidate_id,
+            "source": source,
+            "job_id": job_ids[job],
+            "stage_code": rng.choices(codes, STAGE_WEIGHTS)[0],
+            "applied_at": applied_at,
+            "stage_entered_at": applied_at + timedelta(hours=rng.randint(0, 24 * 30)),
+            "created_at": applied_at,
+            "updated_at": applied_at,
+        }
+
+
+async def insert_rows(engine, model, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> None:
+    """Bulk insert `rows` into `model`'s table in batches, one transaction."""
+    rows = iter(rows)
+    async with engine.begin() as conn:
+        while True:
+            batch = [row for _, row in zip(range(batch_size), rows)]
+            if not batch:
+                break
+            await conn.execute(insert(model), batch)
+
+
+async def seed_candidates(engine, start: int, stop: int, seed: int = 42, detailed: bool = True) -> None:
+    """Insert candidate rows `start`..`stop` along with their candidate_skills links."""
+    async with engine.begin() as conn:
+        known = set((await conn.execute(select(Skill.key))).scalars())
+        missing = [{"name": name, "key": skill_key(name)} for name in SKILLS + NICHE_SKILLS if skill_key(name) not in known]
+        if missing:
+            await conn.execute(insert(Skill), missing)
+        skill_ids = dict((await conn.execute(select(Skill.key, Skill.id))).all())
+
+    rows = candidate_rows(start, stop, seed, detailed)
+    async with engine.begin() as conn:
+        while True:
+            batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+            if not batch:
+                break
+            await conn.execute(insert(Candidate), batch)
+            await conn.execute(insert(CandidateSkill), [
+                {"candidate_id": row["id"], "skill_id": skill_ids[skill_key(name)]}
+                for row in batch
+                for name in row["skills"]
+            ])
+
+
+async def seed_dataset(engine, jobs: int, candidates: int, applications: int, seed: int = 42) -> None:
+    """
+    Jobs, detailed candidates and their applications, in default pipeline
+    stages. What the API maintains on writes is rebuilt to match: jobs'
+    applicants_count, the stage counters and a created event per application.
+    Expects the schema and the default stages to exist (init_db).
+    """
+    await insert_rows(engine, Job, job_rows(jobs, seed))
+    await seed_candidates(engine, 0, candidates, seed)
+    async with engine.connect() as conn:
+        job_ids = list((await conn.execute(select(Job.id).order_by(Job.created_at))).scalars())
+        candidates = (await conn.execute(select(Candidate.id, Candidate.source).order_by(Candidate.email))).all()
+        stage_codes = dict((await conn.execute(
+            select(Stage.name, Stage.code).where(Stage.name.in_(DEFAULT_PIPELINE_STAGES))
+        )).all())
+    await insert_rows(engine, Application, application_rows(job_ids, candidates, applications, stage_codes, seed))
+
+    async with AsyncSession(engine) as session:
+        await session.execute(update(Job).values(applicants_count=(
+            select(func.count()).where(Application.job_id == Job.id).scalar_subquery()
+        )))
+        await analytics.rebuild(session)
+        await history.record_created(session, true())
+        await session.commit()
+
+
+@contextmanager
+def scratch_database_url() -> Iterator[str]:
+    """URL of a temporary SQLite database removed on exit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
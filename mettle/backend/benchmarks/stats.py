@@ -0,0 +1,10 @@
+"""
+Summary statistics shared by the benchmark scripts.
+"""
+
+
+def percentile(samples, pct: float, digits: int = 3) -> float:
+    """Nearest-rank `pct` percentile of `samples`, rounded to `digits`."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return round(ordered[index], digits)
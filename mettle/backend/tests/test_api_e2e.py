@@ -4,14 +4,19 @@ Backend API E2E Tests
 Run with: pytest tests/ -v
 """
 import pytest
+from contextlib import contextmanager
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 import asyncio
 
 # Import the FastAPI app
+import os
 import sys
 sys.path.insert(0, '..')
+# The response cache is off by default; the tests exercise it in memory
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "memory")
 from app.main import app
-from app.database import get_db, async_session_maker
+from app.database import get_db, async_session_maker, engine
 
 
 @pytest.fixture(scope="session")
@@ -30,6 +35,58 @@ async def client():
         yield ac
 
 
+@pytest.fixture
+def query_budget():
+    """
+    Context manager failing the test when a request made inside it runs
+    more than `max_statements` statements, or one statement shape more than
+    `max_repeats` times (default: the query guard's N+1 threshold).
+    """
+    from app.query_guard import query_guard
+    
+    @contextmanager
+    def budget(max_statements, max_repeats=None):
+        repeats = query_guard.repeat_threshold if max_repeats is None else max_repeats
+        with query_guard.observe() as requests:
+            yield requests
+        if not requests:
+            pytest.fail("No requests were observed; is the query guard enabled?")
+        failures = []
+        for request in requests:
+            if request.statements > max_statements:
+                failures.append(f"{request} ran {request.statements} statements (budget {max_statements})")
+            failures += [f"{request} ran {count} times: {shape}" for shape, count in request.repeated(repeats)]
+        if failures:
+            pytest.fail("Query budget exceeded:\n" + "\n".join(failures))
+    
+    return budget
+
+
+@contextmanager
+def recorded_statements():
+    """Collect the SQL statements sent to the primary database."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def intern_stages(*names):
+    """Cache stage codes up front, so counted requests skip the first-use lookup."""
+    from app.services.stages import default_stage_codes, stage_codes
+    
+    async with async_session_maker() as session:
+        await stage_codes(session, names)
+        await default_stage_codes(session)
+        await session.commit()
+
+
 class TestHealthEndpoint:
     """Test health check endpoint."""
     
@@ -50,6 +107,144 @@ class TestHealthEndpoint:
         assert response.json()["status"] == "ok"
 
 
+class TestAuthAPI:
+    """Test registration, login and password hash upgrades."""
+    
+    @pytest.mark.asyncio
+    async def test_register_login_and_me(self, client):
+        """Test that a registered user can log in and fetch their profile."""
+        import time
+        email = f"auth_{time.time()}@test.com"
+        response = await client.post("/api/auth/register", json={
+            "email": email,
+            "password": "s3cret-pass",
+            "full_name": "Auth Tester"
+        })
+        assert response.status_code == 200
+        
+        response = await client.post(
+            "/api/auth/login", data={"username": email, "password": "wrong-pass"}
+        )
+        assert response.status_code == 401
+        
+        response = await client.post(
+            "/api/auth/login", data={"username": email, "password": "s3cret-pass"}
+        )
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+        
+        me = await client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert me.status_code == 200
+        assert me.json()["email"] == email
+    
+    @pytest.mark.asyncio
+    async def test_login_rehashes_outdated_cost(self, client):
+        """Test that logging in upgrades a hash made with a lower bcrypt cost."""
+        import time
+        from sqlalchemy import select
+        from app.models.user import User
+        from app.services.passwords import pwd_context
+        
+        email = f"rehash_{time.time()}@test.com"
+        async with async_session_maker() as session:
+            session.add(User(
+                email=email,
+                hashed_password=pwd_context.hash("old-pass", rounds=4),
+                full_name="Rehash Tester",
+            ))
+            await session.commit()
+        
+        response = await client.post(
+            "/api/auth/login", data={"username": email, "password": "old-pass"}
+        )
+        assert response.status_code == 200
+        
+        async with async_session_maker() as session:
+            user = (await session.execute(select(User).where(User.email == email))).scalar_one()
+            assert not pwd_context.needs_update(user.hashed_password)
+            assert pwd_context.verify("old-pass", user.hashed_password)
+
+
+    @pytest.mark.asyncio
+    async def test_principal_cache_hit_and_invalidation(self, client):
+        """Test that /me is served from the principal cache until the role changes."""
+        import time
+        from sqlalchemy import select
+        from app.models.user import User
+        from app.services.principals import principal_cache
+        
+        email = f"cache_{time.time()}@test.com"
+        await client.post("/api/auth/register", json={
+            "email": email, "password": "cache-pass", "full_name": "Cache Tester"
+        })
+        login = await client.post(
+            "/api/auth/login", data={"username": email, "password": "cache-pass"}
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        await client.get("/api/auth/me", headers=headers)
+        hits_before = principal_cache.stats()["hits"]
+        me = await client.get("/api/auth/me", headers=headers)
+        assert me.json()["role"] == "recruiter"
+        assert principal_cache.stats()["hits"] == hits_before + 1
+        
+        async with async_session_maker() as session:
+            user = (await session.execute(select(User).where(User.email == email))).scalar_one()
+            user.role = "admin"
+            await session.commit()
+        
+        me = await client.get("/api/auth/me", headers=headers)
+        assert me.json()["role"] == "admin"
+    
+    @pytest.mark.asyncio
+    async def test_principal_cache_read_during_uncommitted_change(self, client):
+        """Test a user read between a role change's flush and its commit is not served after the commit."""
+        import time
+        from sqlalchemy import select
+        from app.models.user import User
+        
+        email = f"race_{time.time()}@test.com"
+        await client.post("/api/auth/register", json={
+            "email": email, "password": "race-pass", "full_name": "Race Tester"
+        })
+        login = await client.post(
+            "/api/auth/login", data={"username": email, "password": "race-pass"}
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        async with async_session_maker() as session:
+            user = (await session.execute(select(User).where(User.email == email))).scalar_one()
+            user.role = "admin"
+            await session.flush()
+            # Another request still sees, and caches, the committed row
+            me = await client.get("/api/auth/me", headers=headers)
+            assert me.json()["role"] == "recruiter"
+            await session.commit()
+        
+        me = await client.get("/api/auth/me", headers=headers)
+        assert me.json()["role"] == "admin"
+    
+    def test_principal_generations_are_bounded(self):
+        """Test invalidations share the cache's LRU, and a user loaded before one is not stored."""
+        import uuid
+        from app.models.user import User
+        from app.services.principals import PrincipalCache
+        
+        cache = PrincipalCache(max_size=4, ttl_seconds=60)
+        user = User(id=uuid.uuid4(), email="lru@test.com", full_name="LRU", role="recruiter", is_active=True)
+        generation = cache.generation(user.id)
+        cache.invalidate(user.id)
+        cache.put(user, 1, generation)
+        assert cache.get(user.id, 1) is None
+        
+        cache.put(user, 1, cache.generation(user.id))
+        assert cache.get(user.id, 1).email == "lru@test.com"
+        for _ in range(100):
+            cache.invalidate(uuid.uuid4())
+        assert cache.stats()["size"] == 4
+        assert cache.get(user.id, 1) is None
+
+
 class TestJobsAPI:
     """Test Jobs CRUD endpoints."""
     
@@ -200,6 +395,236 @@ class TestCandidatesAPI:
         assert response.status_code == 204
 
 
+class TestCandidateBulkImport:
+    """Test streaming bulk candidate import."""
+    
+    @pytest.mark.asyncio
+    async def test_ndjson_import_upserts_and_reports_errors(self, client):
+        """Test NDJSON rows are upserted on email and bad rows are reported."""
+        import json
+        import time
+        
+        email = f"bulk_{time.time()}@test.com"
+        rows = [
+            {"name": "Bulk One", "email": email, "role": "Developer", "source": "GitHub",
+             "skills": ["Go", "Rust", "SQL", "Kafka"]},
+            {"name": "Bulk Bad", "email": "not-an-email", "role": "Developer", "source": "GitHub"},
+        ]
+        body = "\n".join(json.dumps(row) for row in rows) + "\n{broken\n"
+        response = await client.post(
+            "/api/candidates/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        report = response.json()
+        assert report["processed"] == 3
+        assert report["upserted"] == 1
+        assert report["failed"] == 2
+        assert [error["row"] for error in report["errors"]] == [2, 3]
+        
+        update = json.dumps({"name": "Bulk Renamed", "email": email, "role": "Lead", "source": "GitHub"})
+        response = await client.post("/api/candidates/bulk?format=ndjson", content=update)
+        assert response.json()["upserted"] == 1
+        
+        candidates = (await client.get("/api/candidates?limit=500")).json()
+        matches = [c for c in candidates if c["email"] == email]
+        assert len(matches) == 1
+        assert matches[0]["name"] == "Bulk Renamed"
+        assert matches[0]["role"] == "Lead"
+    
+    @pytest.mark.asyncio
+    async def test_csv_import(self, client):
+        """Test CSV import with list cells and a quoted multi-line field."""
+        import time
+        
+        stamp = time.time()
+        body = (
+            "name,email,role,source,skills,summary\r\n"
+            f"CSV One,csv1_{stamp}@test.com,Developer,LinkedIn,Python;FastAPI,\"Line one\nline two\"\r\n"
+            f"CSV Two,csv2_{stamp}@test.com,Designer,Referral,,\r\n"
+        )
+        response = await client.post(
+            "/api/candidates/bulk", content=body, headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "processed": 2, "upserted": 2, "failed": 0, "errors": [], "errors_truncated": False
+        }
+    
+    @pytest.mark.asyncio
+    async def test_csv_malformed_quotes(self, client):
+        """Test a stray quote is kept, and an unterminated quoted field is reported rather than dropped."""
+        import time
+        from app.services.candidates import _iter_csv
+        
+        stamp = time.time()
+        body = (
+            "name,email,role,source\r\n"
+            f'Pat 5" Smith,quote1_{stamp}@test.com,Developer,LinkedIn\r\n'
+            f'"Sam Open,quote2_{stamp}@test.com,Developer,LinkedIn\r\n'
+            f"Lost Row,quote3_{stamp}@test.com,Developer,LinkedIn\r\n"
+        )
+        response = await client.post(
+            "/api/candidates/bulk", content=body, headers={"Content-Type": "text/csv"}
+        )
+        report = response.json()
+        assert report["processed"] == 2
+        assert report["upserted"] == 1
+        assert report["failed"] == 1
+        assert report["errors"][0]["row"] == 2
+        assert "unterminated" in report["errors"][0]["errors"][0]
+        
+        candidates = (await client.get("/api/candidates?limit=500")).json()
+        assert [c["name"] for c in candidates if c["email"] == f"quote1_{stamp}@test.com"] == ['Pat 5" Smith']
+        
+        async def lines():
+            yield "name,email"
+            yield '"open,a@test.com'
+            for _ in range(100):
+                yield "x" * 10
+            yield "Next,b@test.com"
+        
+        records = [record async for record in _iter_csv(lines(), max_record_chars=200)]
+        assert "exceeds 200 characters" in records[0]["__error__"]
+        assert records[-1] == {"name": "Next", "email": "b@test.com"}
+    
+    @pytest.mark.asyncio
+    async def test_overlong_lines_are_skipped(self):
+        """Test a line past the cap is reported once and parsing resumes at the next newline."""
+        from app.services.candidates import _iter_lines, _iter_ndjson
+        
+        async def chunks(*parts):
+            for part in parts:
+                yield part
+        
+        huge = [b'{"name": "' + b"x" * 40] * 5
+        stream = chunks(b'{"name": "A"}\n', *huge, b'"}\n{"name": "B"}\r\n', b"\r" * 80)
+        records = [record async for record in _iter_ndjson(_iter_lines(stream, max_line_chars=64))]
+        assert records == [
+            {"name": "A"},
+            {"__error__": "line exceeds 64 characters"},
+            {"name": "B"},
+            {"__error__": "line exceeds 64 characters"},
+        ]
+
+
+class TestExports:
+    """Test streaming CSV / NDJSON exports."""
+    
+    @pytest.mark.asyncio
+    async def test_export_candidates_ndjson_and_csv(self, client):
+        """Test exported candidates round-trip JSON columns in both formats."""
+        import csv
+        import io
+        import json
+        import time
+        
+        email = f"export_{time.time()}@test.com"
+        created = await client.post("/api/candidates", json={
+            "name": "Export, Candidate",
+            "email": email,
+            "role": "Analyst",
+            "source": "Referral",
+            "skills": ["SQL", "dbt"]
+        })
+        assert created.status_code == 201
+        
+        response = await client.get("/api/candidates/export?format=ndjson&source=Referral")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        exported = next(row for row in rows if row["email"] == email)
+        assert exported["id"] == created.json()["id"]
+        assert exported["skills"] == ["SQL", "dbt"]
+        assert exported["experience"] is None
+        assert all(row["source"] == "Referral" for row in rows)
+        
+        response = await client.get("/api/candidates/export")
+        assert response.headers["content-type"].startswith("text/csv")
+        reader = csv.DictReader(io.StringIO(response.text))
+        exported = next(row for row in reader if row["email"] == email)
+        assert exported["name"] == "Export, Candidate"
+        assert json.loads(exported["skills"]) == ["SQL", "dbt"]
+        assert exported["experience"] == ""
+    
+    @pytest.mark.asyncio
+    async def test_export_applications_filtered_by_job(self, client):
+        """Test application export honours the job filter."""
+        import uuid
+        response = await client.get(f"/api/applications/export?format=ndjson&job_id={uuid.uuid4()}")
+        assert response.status_code == 200
+        assert response.text == ""
+
+
+class TestCandidateSearch:
+    """Test full-text and skill search."""
+    
+    @pytest.mark.asyncio
+    async def test_search_ranks_text_and_filters_skills(self, client):
+        """Test ranked keyword search, AND/OR skills and index upkeep on update."""
+        import time
+        
+        word = f"zebra{int(time.time() * 1000)}"
+        in_name = await client.post("/api/candidates", json={
+            "name": f"Ada {word}", "email": f"search1_{word}@test.com", "role": "Developer",
+            "source": "GitHub", "skills": ["Elixir", "Erlang"],
+        })
+        in_experience = await client.post("/api/candidates", json={
+            "name": "Grace", "email": f"search2_{word}@test.com", "role": "Developer",
+            "source": "GitHub", "skills": ["Elixir"],
+            "experience": [{"id": "1", "title": "Engineer", "company": f"{word} Labs",
+                            "start_date": "2020-01"}],
+        })
+        assert in_name.status_code == 201 and in_experience.status_code == 201
+        
+        response = await client.get(f"/api/candidates/search?q={word}")
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()] == [in_name.json()["id"], in_experience.json()["id"]]
+        
+        response = await client.get(f"/api/candidates/search?q={word}&skills=Elixir,Erlang")
+        assert [c["id"] for c in response.json()] == [in_name.json()["id"]]
+        response = await client.get(
+            f"/api/candidates/search?q={word}&skills=Erlang&skills=Elixir&skills_match=any"
+        )
+        assert len(response.json()) == 2
+        
+        await client.patch(f"/api/candidates/{in_name.json()['id']}", json={"name": "Ada"})
+        response = await client.get(f"/api/candidates/search?q={word}")
+        assert [c["id"] for c in response.json()] == [in_experience.json()["id"]]
+    
+    @pytest.mark.asyncio
+    async def test_skill_links_follow_import_and_update(self, client):
+        """Test skill filters see imported and updated skills, case-insensitively."""
+        import json
+        import time
+        
+        stamp = int(time.time() * 1000)
+        skill, other = f"Cobol{stamp}", f"Fortran{stamp}"
+        email = f"skills_{stamp}@test.com"
+        row = {"name": "Skill Import", "email": email, "role": "Developer", "source": "GitHub",
+               "skills": [skill, f" {skill.lower()} "]}
+        response = await client.post("/api/candidates/bulk?format=ndjson", content=json.dumps(row))
+        assert response.json()["upserted"] == 1
+        
+        response = await client.get(f"/api/candidates/search?skills={skill.upper()}")
+        assert [c["email"] for c in response.json()] == [email]
+        assert response.json()[0]["skills"] == [skill, f" {skill.lower()} "]
+        
+        await client.patch(f"/api/candidates/{response.json()[0]['id']}", json={"skills": [other]})
+        assert (await client.get(f"/api/candidates/search?skills={skill}")).json() == []
+        response = await client.get(f"/api/candidates/search?skills={skill},{other}&skills_match=any")
+        assert [c["email"] for c in response.json()] == [email]
+    
+    @pytest.mark.asyncio
+    async def test_search_requires_query_or_skills(self, client):
+        """Test an empty search is rejected and query syntax is not interpreted."""
+        response = await client.get("/api/candidates/search?q=%20")
+        assert response.status_code == 400
+        response = await client.get('/api/candidates/search?q="unbalanced OR (')
+        assert response.status_code == 200
+
+
 class TestApplicationsAPI:
     """Test Applications (job-candidate linking) endpoints."""
     
@@ -279,6 +704,349 @@ class TestApplicationsAPI:
         assert all(a["job_id"] == TestApplicationsAPI.job_id for a in apps)
 
 
+class TestApplicationConstraints:
+    """Test application creation relying on database constraints."""
+    
+    @pytest.mark.asyncio
+    async def test_constraint_errors_map_to_http(self, client):
+        """Test duplicate and dangling applications return 400 and 404."""
+        import time
+        import uuid
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Constraint Test Job",
+            "department": "Engineering",
+            "location": "Remote",
+            "job_type": "Full-time"
+        })).json()["id"]
+        candidate_id = (await client.post("/api/candidates", json={
+            "name": "Constraint Candidate",
+            "email": f"constraint_{time.time()}@test.com",
+            "role": "Developer",
+            "source": "Referral"
+        })).json()["id"]
+        
+        payload = {"candidate_id": candidate_id, "job_id": job_id}
+        assert (await client.post("/api/applications", json=payload)).status_code == 201
+        
+        duplicate = await client.post("/api/applications", json=payload)
+        assert duplicate.status_code == 400
+        
+        missing_job = await client.post("/api/applications", json={
+            "candidate_id": candidate_id, "job_id": str(uuid.uuid4())
+        })
+        assert missing_job.status_code == 404
+        assert missing_job.json()["detail"] == "Job not found"
+        
+        missing_candidate = await client.post("/api/applications", json={
+            "candidate_id": str(uuid.uuid4()), "job_id": job_id
+        })
+        assert missing_candidate.status_code == 404
+        assert missing_candidate.json()["detail"] == "Candidate not found"
+        
+        job = await client.get(f"/api/jobs/{job_id}")
+        assert job.json()["applicants_count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_applies_count_exactly(self, client):
+        """Test 200 simultaneous applies to one job leave an exact applicants_count."""
+        import time
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Popular Job",
+            "department": "Engineering",
+            "location": "Remote",
+            "job_type": "Full-time"
+        })).json()["id"]
+        
+        candidate_ids = []
+        for i in range(200):
+            response = await client.post("/api/candidates", json={
+                "name": f"Concurrent Candidate {i}",
+                "email": f"concurrent_{i}_{time.time()}@test.com",
+                "role": "Developer",
+                "source": "Indeed"
+            })
+            candidate_ids.append(response.json()["id"])
+        
+        responses = await asyncio.gather(*(
+            client.post("/api/applications", json={"candidate_id": cid, "job_id": job_id})
+            for cid in candidate_ids
+        ))
+        assert all(r.status_code == 201 for r in responses)
+        
+        job = await client.get(f"/api/jobs/{job_id}")
+        assert job.json()["applicants_count"] == 200
+
+
+class TestBulkStageUpdate:
+    """Test bulk pipeline stage transitions."""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_moves_by_id_and_by_stage(self, client):
+        """Test explicit moves and whole-stage moves each run as one UPDATE plus analytics and history writes."""
+        import time
+        import uuid
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Bulk Move Job", "department": "Engineering", "location": "Remote", "job_type": "Full-time"
+        })).json()["id"]
+        application_ids = []
+        for i in range(3):
+            candidate_id = (await client.post("/api/candidates", json={
+                "name": f"Mover {i}", "email": f"mover_{i}_{time.time()}@test.com",
+                "role": "Developer", "source": "GitHub"
+            })).json()["id"]
+            application_ids.append((await client.post("/api/applications", json={
+                "candidate_id": candidate_id, "job_id": job_id
+            })).json()["id"])
+        
+        missing = str(uuid.uuid4())
+        await intern_stages("Interview", "Screening", "Rejected")
+        with recorded_statements() as statements:
+            response = await client.patch("/api/applications/bulk", json={"moves": [
+                {"id": application_ids[1], "stage": "Interview"},
+                {"id": missing, "stage": "Interview"},
+                {"id": application_ids[0], "stage": "Screening"},
+            ]})
+        assert response.status_code == 200
+        # Job and source stage counter upserts, the history events insert, then
+        # the UPDATE, however many rows move; the missing id costs one lookup
+        # to tell it from a move to a stage outside the job's pipeline
+        assert len(statements) == 5
+        result = response.json()
+        assert [(a["id"], a["stage"]) for a in result["updated"]] == [
+            (application_ids[1], "Interview"), (application_ids[0], "Screening")
+        ]
+        assert result["not_found"] == [missing]
+        
+        with recorded_statements() as statements:
+            response = await client.patch("/api/applications/bulk", json={
+                "job_id": job_id, "from_stage": "Applied", "to_stage": "Rejected"
+            })
+        # The target stage is checked against the job's pipeline once up front
+        assert len(statements) == 5
+        assert [a["id"] for a in response.json()["updated"]] == [application_ids[2]]
+        
+        board = (await client.get(f"/api/jobs/{job_id}/pipeline")).json()
+        counts = {s["stage"]: s["count"] for s in board["stages"]}
+        assert counts["Applied"] == 0
+        assert counts["Screening"] == counts["Interview"] == counts["Rejected"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_bulk_requires_one_mode(self, client):
+        """Test a request mixing or missing both modes is rejected."""
+        import uuid
+        
+        mixed = await client.patch("/api/applications/bulk", json={
+            "moves": [{"id": str(uuid.uuid4()), "stage": "Offer"}], "to_stage": "Offer"
+        })
+        assert mixed.status_code == 422
+        partial = await client.patch("/api/applications/bulk", json={"from_stage": "Applied"})
+        assert partial.status_code == 422
+
+
+class TestJobPipeline:
+    """Test the pipeline board aggregate."""
+    
+    @pytest.mark.asyncio
+    async def test_pipeline_counts_and_top_cards(self, client):
+        """Test per-stage counts, newest-first cards capped per stage, and 404s, each in one statement."""
+        import time
+        import uuid
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Board Job",
+            "department": "Engineering",
+            "location": "Remote",
+            "job_type": "Full-time"
+        })).json()["id"]
+        
+        with recorded_statements() as statements:
+            empty = await client.get(f"/api/jobs/{job_id}/pipeline")
+        assert len(statements) == 1
+        assert empty.status_code == 200
+        assert empty.json()["total"] == 0
+        assert [s["stage"] for s in empty.json()["stages"]][:2] == ["Applied", "Screening"]
+        
+        defined = await client.put(f"/api/jobs/{job_id}/stages", json={"stages": [
+            "Applied", "Screening", "Interview", "Offer", "Hired", "Rejected", "Sourced"
+        ]})
+        assert defined.status_code == 200
+        application_ids = []
+        for i, stage in enumerate(["Applied", "Applied", "Applied", "Interview", "Sourced"]):
+            candidate_id = (await client.post("/api/candidates", json={
+                "name": f"Board Candidate {i}",
+                "email": f"board_{i}_{time.time()}@test.com",
+                "role": "Developer",
+                "source": "GitHub",
+                "skills": ["Go", "SQL"]
+            })).json()["id"]
+            response = await client.post("/api/applications", json={
+                "candidate_id": candidate_id, "job_id": job_id, "stage": stage
+            })
+            application_ids.append(response.json()["id"])
+        
+        with recorded_statements() as statements:
+            response = await client.get(f"/api/jobs/{job_id}/pipeline?per_stage=2")
+        assert len(statements) == 1
+        assert response.status_code == 200
+        board = response.json()
+        assert board["total"] == 5
+        stages = {s["stage"]: s for s in board["stages"]}
+        assert board["stages"][-1]["stage"] == "Sourced"
+        assert stages["Applied"]["count"] == 3
+        assert [c["id"] for c in stages["Applied"]["cards"]] == application_ids[2:0:-1]
+        assert stages["Applied"]["cards"][0]["candidate"]["name"] == "Board Candidate 2"
+        assert stages["Applied"]["cards"][0]["candidate"]["tags"] == ["Go", "SQL"]
+        assert stages["Interview"]["count"] == 1
+        assert stages["Offer"] == {"stage": "Offer", "count": 0, "cards": []}
+        
+        with recorded_statements() as statements:
+            missing = await client.get(f"/api/jobs/{uuid.uuid4()}/pipeline")
+        assert len(statements) == 1
+        assert missing.status_code == 404
+
+
+class TestWriteStatementCounts:
+    """Guard the number of SQL statements each write endpoint issues (commit excluded)."""
+    
+    async def assert_statements(self, expected, request):
+        with recorded_statements() as statements:
+            response = await request
+        assert response.status_code < 300, response.text
+        assert len(statements) == expected, "\n".join(statements)
+        return response.json()
+    
+    @pytest.mark.asyncio
+    async def test_write_endpoints_issue_one_statement(self, client):
+        """Test creates and updates use INSERT/UPDATE ... RETURNING and nothing else."""
+        import time
+        
+        stamp = time.time()
+        job = await self.assert_statements(1, client.post("/api/jobs", json={
+            "title": "Counted Job", "department": "Engineering", "location": "Remote", "job_type": "Full-time"
+        }))
+        assert job["created_at"] and job["updated_at"]
+        await self.assert_statements(1, client.patch(f"/api/jobs/{job['id']}", json={"status": "Open"}))
+        
+        candidate = await self.assert_statements(1, client.post("/api/candidates", json={
+            "name": "Counted", "email": f"counted_{stamp}@test.com", "role": "Developer", "source": "GitHub"
+        }))
+        updated = await self.assert_statements(1, client.patch(
+            f"/api/candidates/{candidate['id']}", json={"score": 90}
+        ))
+        assert updated["score"] == 90 and updated["created_at"] == candidate["created_at"]
+        
+        # Insert, the two analytics counter upserts, the history event and the
+        # job's applicants_count increment
+        await intern_stages("Applied", "Interview")
+        application = await self.assert_statements(5, client.post("/api/applications", json={
+            "candidate_id": candidate["id"], "job_id": job["id"]
+        }))
+        # Analytics counter upserts, the history event and the UPDATE
+        moved = await self.assert_statements(4, client.patch(
+            f"/api/applications/{application['id']}", json={"stage": "Interview"}
+        ))
+        assert moved["stage"] == "Interview"
+        
+        await self.assert_statements(1, client.post("/api/auth/register", json={
+            "email": f"counted_{stamp}@test.com", "password": "secret123", "full_name": "Counted User"
+        }))
+    
+    @pytest.mark.asyncio
+    async def test_deletes_are_set_based(self, client):
+        """Test deletes never load rows: fixed statements, whatever cascades, with applicants_count kept."""
+        import uuid
+        
+        async def deleted(expected, request):
+            with recorded_statements() as statements:
+                response = await request
+            assert response.status_code < 300, response.text
+            assert len(statements) == expected, "\n".join(statements)
+            return response
+        
+        async def applicants(job_id):
+            return (await client.get(f"/api/jobs/{job_id}")).json()["applicants_count"]
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Deleted Job", "department": "Marketing", "location": "Remote", "job_type": "Full-time"
+        })).json()["id"]
+        candidate_ids, application_ids = [], []
+        for n in range(4):
+            candidate_ids.append((await client.post("/api/candidates", json={
+                "name": f"Deleted {n}", "email": f"deleted_{uuid.uuid4().hex}@test.com",
+                "role": "Marketer", "source": "Indeed",
+            })).json()["id"])
+            application_ids.append((await client.post("/api/applications", json={
+                "candidate_id": candidate_ids[-1], "job_id": job_id
+            })).json()["id"])
+        
+        # Analytics counter upserts, the applicants_count decrement and the DELETE
+        await deleted(4, client.delete(f"/api/applications/{application_ids[0]}"))
+        assert await applicants(job_id) == 3
+        missing = str(uuid.uuid4())
+        result = (await deleted(4, client.request("DELETE", "/api/applications/bulk", json={
+            "ids": [application_ids[1], missing, application_ids[2]]
+        }))).json()
+        assert result == {"deleted": [application_ids[1], application_ids[2]], "not_found": [missing]}
+        assert await applicants(job_id) == 1
+        assert (await client.delete(f"/api/applications/{application_ids[0]}")).status_code == 404
+        
+        # Deleting a candidate takes their applications off the job's count
+        await deleted(4, client.delete(f"/api/candidates/{candidate_ids[2]}"))
+        assert await applicants(job_id) == 1
+        await deleted(4, client.delete(f"/api/candidates/{candidate_ids[3]}"))
+        assert await applicants(job_id) == 0
+        
+        await client.post("/api/applications", json={"candidate_id": candidate_ids[0], "job_id": job_id})
+        # Source roll-up upsert and the DELETE; applications cascade in the database
+        await deleted(2, client.delete(f"/api/jobs/{job_id}"))
+        listed = await client.get("/api/applications", params={"candidate_id": candidate_ids[0]})
+        assert listed.json() == []
+        assert (await client.delete(f"/api/jobs/{job_id}")).status_code == 404
+        
+        # Bulk deletes take the same statements as a single delete, however many rows
+        job_ids = [(await client.post("/api/jobs", json={
+            "title": f"Deleted Job {n}", "department": "Marketing", "location": "Remote", "job_type": "Full-time"
+        })).json()["id"] for n in range(2)]
+        for other_job_id in job_ids:
+            await client.post("/api/applications", json={"candidate_id": candidate_ids[0], "job_id": other_job_id})
+            await client.post("/api/applications", json={"candidate_id": candidate_ids[1], "job_id": other_job_id})
+        result = (await deleted(4, client.request("DELETE", "/api/candidates/bulk", json={
+            "ids": [candidate_ids[0], missing, candidate_ids[1], candidate_ids[0]]
+        }))).json()
+        assert result == {"deleted": [candidate_ids[0], candidate_ids[1]], "not_found": [missing]}
+        assert [await applicants(other_job_id) for other_job_id in job_ids] == [0, 0]
+        assert (await client.get(f"/api/candidates/{candidate_ids[1]}")).status_code == 404
+        
+        result = (await deleted(2, client.request("DELETE", "/api/jobs/bulk", json={
+            "ids": [job_ids[1], missing, job_ids[0]]
+        }))).json()
+        assert result == {"deleted": [job_ids[1], job_ids[0]], "not_found": [missing]}
+        assert (await client.get(f"/api/jobs/{job_ids[0]}")).status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_candidate_skills_statements(self, client):
+        """Test skill links add a fixed number of statements, however many skills."""
+        import time
+        
+        skills = ["Python", "Go", "Rust", "SQL"]
+        await client.post("/api/candidates", json={
+            "name": "Seed", "email": f"skills_seed_{time.time()}@test.com", "role": "Developer",
+            "source": "GitHub", "skills": skills,
+        })
+        # Insert, skill id lookup, link insert
+        candidate = await self.assert_statements(3, client.post("/api/candidates", json={
+            "name": "Skilled", "email": f"skilled_{time.time()}@test.com", "role": "Developer",
+            "source": "GitHub", "skills": skills,
+        }))
+        # Update, skill id lookup, link delete, link insert
+        await self.assert_statements(4, client.patch(
+            f"/api/candidates/{candidate['id']}", json={"skills": skills[:2]}
+        ))
+
+
 class TestIntegrationFlow:
     """Test complete ATS workflow end-to-end."""
     
@@ -357,3 +1125,1031 @@ class TestIntegrationFlow:
         assert final_candidate.json()["status"] == "Hired"
         
         print("\n✅ Complete hiring flow test passed!")
+
+
+class TestConditionalRequests:
+    """Test ETag / If-None-Match revalidation of read endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_list_etag_revalidates_from_the_page(self, client):
+        """Test an unchanged list answers 304 from the page query and the total, without a full-set aggregate."""
+        import time
+        from app.services.response_cache import response_cache
+        
+        url = "/api/candidates?source=Indeed&limit=5"
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+        
+        # Revalidate against the database, not the response cache
+        await response_cache.backend.clear()
+        with recorded_statements() as statements:
+            cached = await client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert len(statements) == 2
+        assert not any("max(" in statement.lower() for statement in statements)
+        
+        other_page = await client.get(url.replace("limit=5", "limit=6"), headers={"If-None-Match": etag})
+        assert other_page.status_code == 200
+        
+        await client.post("/api/candidates", json={
+            "name": "Etag", "email": f"etag_{time.time()}@test.com", "role": "Developer", "source": "Indeed"
+        })
+        changed = await client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    
+    @pytest.mark.asyncio
+    async def test_item_etag_changes_on_update(self, client):
+        """Test a single resource revalidates until it is written, even within a second."""
+        job = (await client.post("/api/jobs", json={
+            "title": "Etag Job", "department": "Engineering", "location": "Remote", "job_type": "Full-time"
+        })).json()
+        first = await client.get(f"/api/jobs/{job['id']}")
+        etag = first.headers["etag"]
+        
+        cached = await client.get(f"/api/jobs/{job['id']}", headers={"If-None-Match": f'"other", {etag}'})
+        assert cached.status_code == 304
+        
+        await client.patch(f"/api/jobs/{job['id']}", json={"status": "Open"})
+        changed = await client.get(f"/api/jobs/{job['id']}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["status"] == "Open"
+    
+    def test_inserts_set_subsecond_timestamps(self):
+        """Test inserts write now() themselves rather than rely on a migrated table's CURRENT_TIMESTAMP default."""
+        from sqlalchemy import insert, literal, select
+        from sqlalchemy.dialects import sqlite
+        from app.models.application import Application
+        from app.models.candidate import Candidate
+        from app.models.job import Job
+        
+        subsecond_now = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+        statements = [
+            insert(Job).values(title="Job"),
+            insert(Candidate).values([{"name": "A", "email": "a@test.com"}, {"name": "B", "email": "b@test.com"}]),
+            insert(Application).from_select(["candidate_id", "job_id"], select(Candidate.id, literal(1))),
+        ]
+        for statement in statements:
+            sql = str(statement.compile(dialect=sqlite.dialect()))
+            columns = sql.split("(", 1)[1].split(")", 1)[0]
+            assert "created_at" in columns and "updated_at" in columns
+            assert subsecond_now in sql
+
+
+class TestResponseCache:
+    """Test server-side caching of read responses and its invalidation."""
+    
+    @staticmethod
+    def _request(path, query=b""):
+        from starlette.requests import Request
+        
+        return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+    
+    @staticmethod
+    async def _fake_redis():
+        """Start a RESP server implementing the commands RedisCacheBackend sends."""
+        import time
+        
+        data = {}
+        
+        def get(key):
+            value, expires_at = data.get(key, (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                data.pop(key)
+                return None
+            return value
+        
+        def bulk(value):
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        
+        async def handle(reader, writer):
+            while line := await reader.readline():
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                command, args = args[0].upper(), args[1:]
+                if command == b"GET":
+                    writer.write(bulk(get(args[0])))
+                elif command == b"MGET":
+                    writer.write(b"*%d\r\n" % len(args) + b"".join(bulk(get(key)) for key in args))
+                elif command == b"SET":
+                    options = [arg.upper() for arg in args[2:]]
+                    if b"NX" in options and get(args[0]) is not None:
+                        writer.write(b"$-1\r\n")
+                        continue
+                    ttl = int(options[options.index(b"PX") + 1]) / 1000
+                    data[args[0]] = (args[1], time.monotonic() + ttl)
+                    writer.write(b"+OK\r\n")
+                elif command == b"DEL":
+                    writer.write(b":%d\r\n" % sum(data.pop(key, None) is not None for key in args))
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server, data
+    
+    @pytest.mark.asyncio
+    async def test_job_reads_cached_until_written(self, client):
+        """Test repeated job reads skip the database until a write to that job or department."""
+        import uuid
+        from app.services.response_cache import response_cache
+        
+        job = (await client.post("/api/jobs", json={
+            "title": "Cached Job", "department": "Product", "location": "Remote", "job_type": "Full-time"
+        })).json()
+        list_url = "/api/jobs?department=Product&limit=5"
+        first = await client.get(list_url)
+        assert first.json()[0]["id"] == job["id"]
+        await client.get(f"/api/jobs/{job['id']}")
+        
+        hits = response_cache.stats()["hits"]
+        with recorded_statements() as statements:
+            listed = await client.get(list_url)
+            fetched = await client.get(f"/api/jobs/{job['id']}")
+            revalidated = await client.get(list_url, headers={"If-None-Match": first.headers["etag"]})
+        assert statements == []
+        assert listed.json() == first.json()
+        assert listed.headers["etag"] == first.headers["etag"]
+        assert fetched.json()["title"] == "Cached Job"
+        assert revalidated.status_code == 304
+        assert response_cache.stats()["hits"] == hits + 3
+        
+        # Writes elsewhere leave the entries alone
+        await client.post("/api/jobs", json={
+            "title": "Elsewhere", "department": "Sales", "location": "Remote", "job_type": "Full-time"
+        })
+        with recorded_statements() as statements:
+            await client.get(list_url)
+        assert statements == []
+        
+        await client.patch(f"/api/jobs/{job['id']}", json={"title": "Renamed"})
+        assert (await client.get(f"/api/jobs/{job['id']}")).json()["title"] == "Renamed"
+        assert (await client.get(list_url)).json()[0]["title"] == "Renamed"
+        
+        candidate = (await client.post("/api/candidates", json={
+            "name": "Cache Applicant", "email": f"cache_{uuid.uuid4().hex}@test.com",
+            "role": "Developer", "source": "Referral",
+        })).json()
+        await client.post("/api/applications", json={"candidate_id": candidate["id"], "job_id": job["id"]})
+        assert (await client.get(f"/api/jobs/{job['id']}")).json()["applicants_count"] == 1
+        assert (await client.get(list_url)).json()[0]["applicants_count"] == 1
+        
+        await client.delete(f"/api/jobs/{job['id']}")
+        assert (await client.get(f"/api/jobs/{job['id']}")).status_code == 404
+        assert job["id"] not in [item["id"] for item in (await client.get(list_url)).json()]
+    
+    @pytest.mark.asyncio
+    async def test_candidate_cache_invalidated_by_bulk_import(self, client):
+        """Test a bulk import refreshes cached candidates it upserts."""
+        import json
+        import uuid
+        
+        email = f"cache_{uuid.uuid4().hex}@test.com"
+        candidate = (await client.post("/api/candidates", json={
+            "name": "Before Import", "email": email, "role": "Developer", "source": "Referral"
+        })).json()
+        assert (await client.get(f"/api/candidates/{candidate['id']}")).json()["name"] == "Before Import"
+        
+        body = json.dumps({"name": "After Import", "email": email, "role": "Developer", "source": "Referral"})
+        await client.post("/api/candidates/bulk?format=ndjson", content=body)
+        assert (await client.get(f"/api/candidates/{candidate['id']}")).json()["name"] == "After Import"
+    
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_one_request_refreshes(self):
+        """Test an expired entry is served stale while another request holds the refresh."""
+        from fastapi import Response
+        from app.services.cache_backends import MemoryCacheBackend
+        from app.services.response_cache import ResponseCache
+        
+        cache = ResponseCache(MemoryCacheBackend(100), ttl_seconds=0, stale_seconds=60)
+        loads = []
+        
+        async def load():
+            loads.append(1)
+            return Response(content=b'{"n": %d}' % len(loads), media_type="application/json")
+        
+        request = self._request("/api/jobs", b"limit=5")
+        assert (await cache.serve(request, ["jobs:list"], load)).body == b'{"n": 1}'
+        
+        assert await cache.backend.try_lock(cache.key(request), 10)
+        assert (await cache.serve(request, ["jobs:list"], load)).body == b'{"n": 1}'
+        await cache.backend.unlock(cache.key(request))
+        
+        assert (await cache.serve(request, ["jobs:list"], load)).body == b'{"n": 2}'
+        stats = cache.stats()
+        assert (stats["misses"], stats["stale_served"], stats["hits"]) == (2, 1, 0)
+        assert stats["hit_ratio"] == round(1 / 3, 4)
+    
+    @pytest.mark.asyncio
+    async def test_redis_backend(self):
+        """Test the Redis backend against a local fake server, and falling back when it is down."""
+        from fastapi import Response
+        from app.services.cache_backends import RedisCacheBackend
+        from app.services.response_cache import ResponseCache
+        
+        server, data = await self._fake_redis()
+        port = server.sockets[0].getsockname()[1]
+        cache = ResponseCache(
+            RedisCacheBackend(f"redis://127.0.0.1:{port}/0", key_prefix="test:"),
+            ttl_seconds=30,
+            stale_seconds=30,
+        )
+        loads = []
+        
+        async def load():
+            loads.append(1)
+            return Response(content=b"[]", media_type="application/json", headers={"ETag": 'W/"abc"'})
+        
+        first = self._request("/api/jobs", b"department=Sales&limit=5")
+        other_page = self._request("/api/jobs", b"department=Sales&limit=6")
+        tags = ["jobs:list", "jobs:department:Sales"]
+        try:
+            await cache.serve(first, tags, load)
+            hit = await cache.serve(first, tags, load)
+            await cache.serve(other_page, tags, load)
+            assert len(loads) == 2
+            assert hit.headers["etag"] == 'W/"abc"'
+            assert b"test:/api/jobs?department=Sales&limit=5" in data
+            
+            await cache.invalidate(["jobs:department:Sales"])
+            await cache.serve(first, tags, load)
+            assert len(loads) == 3
+            assert b"test:tag:jobs:department:Sales" in data
+            
+            # Concurrent commands share the pool instead of queueing on one connection
+            replies = await asyncio.gather(*(cache.backend.fetch(f"missing{n}", tags) for n in range(20)))
+            assert {entry for entry, _ in replies} == {None}
+            assert all(versions == replies[0][1] for _, versions in replies)
+        finally:
+            server.close()
+            await server.wait_closed()
+            await cache.backend.close()
+        
+        response = await cache.serve(first, tags, load)
+        assert response.status_code == 200
+        assert len(loads) == 4
+        stats = cache.stats()
+        assert stats["backend"] == "redis"
+        assert (stats["hits"], stats["misses"], stats["invalidations"], stats["errors"]) == (1, 3, 1, 1)
+
+
+class TestFastListSerialization:
+    """Test list endpoints serialized from selected columns."""
+    
+    @pytest.mark.asyncio
+    async def test_fast_path_matches_validated_output(self, client, monkeypatch):
+        """Test both serialization paths return the same bodies and cursor headers."""
+        import uuid
+        from app.config import settings
+        from app.services.response_cache import response_cache
+        
+        # Four of each under a location of their own: a first page of three
+        # and a second page, whatever else the database holds
+        location = f"Fast {uuid.uuid4().hex}"
+        candidates = [(await client.post("/api/candidates", json={
+            "name": f"Fast Path {n}", "email": f"fast_{uuid.uuid4().hex}@test.com", "role": "Developer",
+            "source": "GitHub", "location": location, "skills": ["Rust"],
+            "experience": [{"id": "1", "title": "Engineer", "company": "Fast Co", "start_date": "2020"}],
+        })).json() for n in range(4)]
+        jobs = [(await client.post("/api/jobs", json={
+            "title": f"Fast Job {n}", "department": "HR", "location": location, "job_type": "Full-time",
+        })).json() for n in range(4)]
+        for candidate in candidates:
+            await client.post("/api/applications", json={"candidate_id": candidate["id"], "job_id": jobs[0]["id"]})
+        
+        urls = [
+            f"/api/candidates?limit=3&location={location}",
+            f"/api/jobs?limit=3&location={location}",
+            f"/api/applications?limit=3&job_id={jobs[0]['id']}",
+        ]
+        validated = [await client.get(url) for url in urls]
+        monkeypatch.setattr(settings, "fast_list_serialization", True)
+        await response_cache.backend.clear()
+        fast = [await client.get(url) for url in urls]
+        
+        for slow_response, fast_response in zip(validated, fast):
+            assert fast_response.status_code == 200
+            assert len(fast_response.json()) == 3
+            assert fast_response.json() == slow_response.json()
+            assert fast_response.headers["x-next-cursor"] == slow_response.headers["x-next-cursor"]
+            assert fast_response.headers["etag"] == slow_response.headers["etag"]
+        assert {item["experience"][0]["company"] for item in fast[0].json()} == {"Fast Co"}
+        
+        for url, response, created in zip(urls, fast, [candidates, jobs, candidates]):
+            next_page = await client.get(f"{url}&cursor={response.headers['x-next-cursor']}")
+            assert next_page.status_code == 200
+            assert len(next_page.json()) == 1
+            first_ids = [item["id"] for item in response.json()]
+            assert next_page.json()[0]["id"] not in first_ids
+            key = "candidate_id" if "applications" in url else "id"
+            assert {item[key] for item in response.json() + next_page.json()} == {item["id"] for item in created}
+    
+    @pytest.mark.asyncio
+    async def test_openapi_keeps_response_models(self, client):
+        """Test list endpoints still document their item schemas."""
+        schema = (await client.get("/openapi.json")).json()
+        for path, models in [
+            ("/api/candidates", ["CandidateResponse", "CandidateSummary"]),
+            ("/api/jobs", ["JobResponse"]),
+            ("/api/applications", ["ApplicationResponse"]),
+        ]:
+            content = schema["paths"][path]["get"]["responses"]["200"]["content"]["application/json"]
+            variants = content["schema"].get("anyOf", [content["schema"]])
+            assert [variant["items"]["$ref"] for variant in variants] == [
+                f"#/components/schemas/{model}" for model in models
+            ]
+
+
+class TestSparseFieldsets:
+    """Test column projection on the candidate list."""
+    
+    @pytest.mark.asyncio
+    async def test_summary_view_skips_heavy_columns(self, client):
+        """Test view=summary returns CandidateSummary items without reading summary/JSON columns."""
+        import uuid
+        
+        location = f"Sparse {uuid.uuid4().hex}"
+        created = [(await client.post("/api/candidates", json={
+            "name": f"Sparse {n}", "email": f"sparse_{uuid.uuid4().hex}@test.com", "role": "Developer",
+            "source": "GitHub", "location": location, "summary": "Long text " * 50,
+            "experience": [{"id": "1", "title": "Engineer", "company": "Sparse Co", "start_date": "2020"}],
+        })).json() for n in range(3)]
+        with recorded_statements() as statements:
+            response = await client.get(f"/api/candidates?view=summary&limit=2&location={location}")
+        assert response.status_code == 200
+        items = response.json()
+        assert len(items) == 2
+        assert {item["id"] for item in items} < {candidate["id"] for candidate in created}
+        for item in items:
+            assert set(item) == {"id", "name", "email", "photo_url", "role", "status", "score", "created_at"}
+        assert "x-next-cursor" in response.headers
+        page_query = statements[0].lower()
+        assert "candidates.name" in page_query
+        for column in ("summary", "experience", "education", "certifications"):
+            assert f"candidates.{column}" not in page_query
+    
+    @pytest.mark.asyncio
+    async def test_fields_projection(self, client, monkeypatch):
+        """Test fields= returns only the named fields plus id, on both serialization paths."""
+        from app.config import settings
+        from app.services.response_cache import response_cache
+        
+        full = (await client.get("/api/candidates?limit=3")).json()
+        expected = [{key: value for key, value in item.items() if key in ("id", "name", "role", "score")} for item in full]
+        for fast in (False, True):
+            monkeypatch.setattr(settings, "fast_list_serialization", fast)
+            await response_cache.backend.clear()
+            response = await client.get("/api/candidates?limit=3&fields=score,name&fields=role")
+            assert response.status_code == 200
+            assert [list(item.items()) for item in response.json()] == [list(item.items()) for item in expected]
+        
+        unknown = await client.get("/api/candidates?fields=name,password")
+        assert unknown.status_code == 400
+        both = await client.get("/api/candidates?fields=name&view=summary")
+        assert both.status_code == 400
+
+
+class TestListFilters:
+    """Test declarative filters, sorts and X-Total-Count on list endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_candidate_filters_sort_and_total(self, client):
+        """Test location/score/experience filters, sort by score and keyset pages across ties."""
+        import uuid
+        
+        location = f"Filterville {uuid.uuid4().hex[:8]}"
+        scores = [90, 75, 75, 75, 40, 10]
+        for n, score in enumerate(scores):
+            created = await client.post("/api/candidates", json={
+                "name": f"Filter {n}", "email": f"filter_{uuid.uuid4().hex}@test.com",
+                "role": "Developer", "source": "Referral", "location": location,
+            })
+            await client.patch(f"/api/candidates/{created.json()['id']}", json={"score": score})
+        
+        base = f"/api/candidates?location={location}"
+        ranged = await client.get(f"{base}&score_min=40&score_max=80&sort=-score")
+        assert [item["score"] for item in ranged.json()] == [75, 75, 75, 40]
+        assert ranged.headers["x-total-count"] == "4"
+        
+        ascending = await client.get(f"{base}&sort=score&view=summary")
+        assert [item["score"] for item in ascending.json()] == sorted(scores)
+        assert ascending.headers["x-total-count"] == str(len(scores))
+        
+        pages, url = [], f"{base}&sort=-score&limit=2"
+        while url:
+            page = await client.get(url)
+            pages.append(page.json())
+            token = page.headers.get("x-next-cursor")
+            url = f"{base}&sort=-score&limit=2&cursor={token}" if token else None
+        assert [item["score"] for page in pages for item in page] == sorted(scores, reverse=True)
+        assert len({item["id"] for page in pages for item in page}) == len(scores)
+        
+        back = await client.get(f"{base}&sort=-score&limit=2&cursor={page.headers['x-prev-cursor']}")
+        assert back.json() == pages[-2]
+        
+        none = await client.get(f"{base}&experience_min=1")
+        assert none.json() == [] and none.headers["x-total-count"] == "0"
+    
+    @pytest.mark.asyncio
+    async def test_rejects_unlisted_values(self, client):
+        """Test sort keys, filter values and cursors outside the spec are rejected."""
+        assert (await client.get("/api/candidates?sort=email")).status_code == 422
+        assert (await client.get("/api/candidates?score_min=101")).status_code == 422
+        assert (await client.get("/api/jobs?department=Legal")).status_code == 422
+        
+        listed = await client.get("/api/candidates?limit=1")
+        token = listed.headers["x-next-cursor"]
+        assert (await client.get(f"/api/candidates?limit=1&sort=-score&cursor={token}")).status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_job_filters_and_sort(self, client):
+        """Test job status/department filters with a title sort."""
+        import uuid
+        
+        prefix = uuid.uuid4().hex[:8]
+        for title in ("b", "a", "c"):
+            job = (await client.post("/api/jobs", json={
+                "title": f"{prefix} {title}", "department": "Marketing", "location": prefix, "job_type": "Contract",
+            })).json()
+            if title != "c":
+                await client.patch(f"/api/jobs/{job['id']}", json={"status": "Open"})
+        
+        response = await client.get(f"/api/jobs?location={prefix}&department=Marketing&status_filter=Open&sort=title")
+        assert [job["title"] for job in response.json()] == [f"{prefix} a", f"{prefix} b"]
+        assert response.headers["x-total-count"] == "2"
+        
+        schema = (await client.get("/openapi.json")).json()
+        parameters = {p["name"]: p for p in schema["paths"]["/api/jobs"]["get"]["parameters"]}
+        assert {"status_filter", "department", "job_type", "location", "created_after", "sort"} <= set(parameters)
+        assert "-applicants_count" in parameters["sort"]["schema"]["enum"]
+    
+    @pytest.mark.asyncio
+    async def test_total_count_is_bounded(self, client, monkeypatch):
+        """Test X-Total-Count counts at most exact_count_limit rows before falling back, and the Postgres estimate query."""
+        import uuid
+        from sqlalchemy import select
+        from sqlalchemy.dialects import postgresql
+        from app.config import settings
+        from app.models.job import Job
+        from app.pagination import _Explain
+        
+        location = f"Count {uuid.uuid4().hex}"
+        for n in range(3):
+            await client.post("/api/jobs", json={
+                "title": f"Count {n}", "department": "Sales", "location": location, "job_type": "Contract",
+            })
+        monkeypatch.setattr(settings, "exact_count_limit", 2)
+        with recorded_statements() as statements:
+            response = await client.get(f"/api/jobs?location={location}&limit=1")
+        assert response.headers["x-total-count"] == "3"
+        # SQLite has no estimate, so the capped count is followed by a full one
+        assert "x-total-count-estimated" not in response.headers
+        counts = [statement for statement in statements if "count(*)" in statement.lower()]
+        assert len(counts) == 2 and "LIMIT" in counts[0]
+        
+        explain = str(_Explain(select(Job.id).where(Job.location == location)).compile(dialect=postgresql.dialect()))
+        assert explain.startswith("EXPLAIN (FORMAT JSON) SELECT jobs.id")
+
+
+class TestAnalytics:
+    """Test the recruiting analytics endpoints and their maintained counters."""
+    
+    @staticmethod
+    async def _sources(client):
+        return {item["source"]: item for item in (await client.get("/api/analytics/sources")).json()}
+    
+    @pytest.mark.asyncio
+    async def test_counters_follow_application_writes(self, client):
+        """Test funnel, time in stage and sources after creates, moves and deletes."""
+        import uuid
+        
+        before = await self._sources(client)
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Analytics Job", "department": "Product", "location": "Remote", "job_type": "Full-time",
+        })).json()["id"]
+        applications = {}
+        for name, source in (("hired", "Referral"), ("rejected", "Referral"), ("withdrawn", "Indeed"), ("removed", "Indeed")):
+            candidate = (await client.post("/api/candidates", json={
+                "name": f"Analytics {name}", "email": f"analytics_{uuid.uuid4().hex}@test.com",
+                "role": "Developer", "source": source,
+            })).json()
+            applications[name] = (await client.post("/api/applications", json={
+                "candidate_id": candidate["id"], "job_id": job_id,
+            })).json()
+        
+        for name in ("hired", "rejected"):
+            await client.patch(f"/api/applications/{applications[name]['id']}", json={"stage": "Screening"})
+        await client.patch("/api/applications/bulk", json={
+            "moves": [{"id": applications["hired"]["id"], "stage": "Interview"}],
+        })
+        await client.patch("/api/applications/bulk", json={
+            "job_id": job_id, "from_stage": "Screening", "to_stage": "Rejected",
+        })
+        for _ in range(2):  # the repeat is not a move
+            moved = await client.patch(f"/api/applications/{applications['hired']['id']}", json={"stage": "Hired"})
+            assert moved.status_code == 200
+        await client.delete(f"/api/applications/{applications['removed']['id']}")
+        await client.delete(f"/api/candidates/{applications['withdrawn']['candidate_id']}")
+        
+        funnel = (await client.get(f"/api/analytics/funnel?job_id={job_id}")).json()
+        assert funnel["applications"] == 4
+        stages = {stage["stage"]: stage for stage in funnel["stages"]}
+        assert list(stages) == ["Applied", "Screening", "Interview", "Offer", "Hired", "Rejected"]
+        assert [(stages[s]["entered"], stages[s]["current"]) for s in stages] == [
+            (4, 0), (2, 0), (1, 0), (0, 0), (1, 1), (1, 1),
+        ]
+        assert stages["Screening"]["conversion_from_previous"] == 0.5
+        assert stages["Offer"]["conversion_from_previous"] == 0.0
+        assert stages["Hired"]["conversion_from_previous"] is None
+        assert stages["Rejected"]["conversion_from_previous"] is None
+        assert stages["Rejected"]["share_of_applications"] == 0.25
+        
+        times = {item["stage"]: item for item in (await client.get(f"/api/analytics/time-in-stage?job_id={job_id}")).json()}
+        assert times["Applied"]["exited"] == 2 and times["Applied"]["average_hours"] >= 0
+        assert times["Hired"]["exited"] == 0 and times["Hired"]["average_hours"] is None
+        
+        after = await self._sources(client)
+        for source, created, hires in (("Referral", 2, 1), ("Indeed", 2, 0)):
+            previous = before.get(source, {"applications": 0, "hires": 0})
+            assert after[source]["applications"] - previous["applications"] == created
+            assert after[source]["hires"] - previous["hires"] == hires
+        
+        await client.delete(f"/api/jobs/{job_id}")
+        assert {source: item["applications"] for source, item in (await self._sources(client)).items()} == {
+            source: item["applications"] for source, item in before.items()
+        }
+    
+    @pytest.mark.asyncio
+    async def test_candidate_source_change_keeps_attribution(self, client):
+        """Test applications stay counted under the source the candidate applied from."""
+        import uuid
+        
+        before = await self._sources(client)
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Source Job", "department": "Sales", "location": "Remote", "job_type": "Full-time",
+        })).json()["id"]
+        candidate = (await client.post("/api/candidates", json={
+            "name": "Source Mover", "email": f"source_{uuid.uuid4().hex}@test.com",
+            "role": "Developer", "source": "LinkedIn",
+        })).json()
+        application = (await client.post("/api/applications", json={
+            "candidate_id": candidate["id"], "job_id": job_id,
+        })).json()
+        
+        moved = await client.patch(f"/api/candidates/{candidate['id']}", json={"source": "GitHub"})
+        assert moved.status_code == 200 and moved.json()["source"] == "GitHub"
+        await client.patch(f"/api/applications/{application['id']}", json={"stage": "Screening"})
+        
+        def delta(sources, source, key):
+            return sources.get(source, {}).get(key, 0) - before.get(source, {}).get(key, 0)
+        
+        after = await self._sources(client)
+        assert (delta(after, "LinkedIn", "applications"), delta(after, "LinkedIn", "in_pipeline")) == (1, 1)
+        assert (delta(after, "GitHub", "applications"), delta(after, "GitHub", "in_pipeline")) == (0, 0)
+        funnel = (await client.get(f"/api/analytics/funnel?job_id={job_id}")).json()
+        assert {stage["stage"]: stage["current"] for stage in funnel["stages"]}["Screening"] == 1
+        assert all(stage["current"] >= 0 for stage in funnel["stages"])
+        
+        await client.delete(f"/api/applications/{application['id']}")
+        after = await self._sources(client)
+        assert (delta(after, "LinkedIn", "in_pipeline"), delta(after, "GitHub", "in_pipeline")) == (0, 0)
+    
+    @pytest.mark.asyncio
+    async def test_moves_lock_applications_first(self):
+        """Test the rows a move reads its old stage from are locked, in id order, on Postgres."""
+        from types import SimpleNamespace
+        from sqlalchemy.dialects import postgresql
+        from app.models.application import Application
+        from app.services.applicants import lock_applications
+        
+        executed = []
+        
+        class Session:
+            def get_bind(self):
+                return SimpleNamespace(dialect=postgresql.dialect())
+            
+            async def execute(self, statement):
+                executed.append(str(statement.compile(dialect=postgresql.dialect())))
+        
+        await lock_applications(Session(), Application.job_id == Application.job_id)
+        assert len(executed) == 1
+        assert executed[0].endswith("ORDER BY applications.id FOR UPDATE OF applications")
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_current_counts(self, client):
+        """Test rebuilding the counters reproduces the maintained current counts."""
+        from sqlalchemy import select
+        from app.database import async_session_maker
+        from app.models.analytics import JobStageStats
+        from app.services import analytics
+        
+        async def current_counts():
+            async with async_session_maker() as session:
+                rows = await session.execute(select(
+                    JobStageStats.job_id, JobStageStats.source, JobStageStats.stage_code, JobStageStats.current,
+                ).where(JobStageStats.current != 0))
+                return set(rows.all())
+        
+        maintained = await current_counts()
+        async with async_session_maker() as session:
+            await analytics.rebuild(session)
+            await session.commit()
+        assert await current_counts() == maintained
+        
+        overall = (await client.get("/api/analytics/funnel")).json()
+        assert overall["job_id"] is None
+        assert overall["applications"] == sum(stage["current"] for stage in overall["stages"])
+
+
+class TestJobStages:
+    """Test per-job pipeline definitions and the stage checks on application writes."""
+    
+    @pytest.mark.asyncio
+    async def test_writes_only_enter_pipeline_stages(self, client):
+        """Test create, PATCH and bulk moves reject stages outside the job's pipeline."""
+        import uuid
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Stages Job", "department": "Product", "location": "Remote", "job_type": "Contract",
+        })).json()["id"]
+        default = (await client.get(f"/api/jobs/{job_id}/stages")).json()
+        assert default["is_default"] and default["stages"][0] == "Applied"
+        
+        candidate_ids = [(await client.post("/api/candidates", json={
+            "name": f"Stages {n}", "email": f"stages_{uuid.uuid4().hex}@test.com",
+            "role": "Designer", "source": "Referral",
+        })).json()["id"] for n in range(3)]
+        rejected = await client.post("/api/applications", json={
+            "candidate_id": candidate_ids[0], "job_id": job_id, "stage": "Portfolio review",
+        })
+        assert rejected.status_code == 400
+        
+        defined = await client.put(f"/api/jobs/{job_id}/stages", json={
+            "stages": ["Applied", "Portfolio review", "Hired"],
+        })
+        assert defined.json() == {
+            "job_id": job_id, "stages": ["Applied", "Portfolio review", "Hired"], "is_default": False,
+        }
+        first, second = [(await client.post("/api/applications", json={
+            "candidate_id": candidate_id, "job_id": job_id,
+        })).json()["id"] for candidate_id in candidate_ids[:2]]
+        created = await client.post("/api/applications", json={
+            "candidate_id": candidate_ids[2], "job_id": job_id, "stage": "Portfolio review",
+        })
+        assert created.status_code == 201
+        assert created.json()["stage"] == "Portfolio review"
+        
+        assert (await client.patch(f"/api/applications/{first}", json={"stage": "Interview"})).status_code == 400
+        assert (await client.patch(f"/api/applications/{uuid.uuid4()}", json={"stage": "Hired"})).status_code == 404
+        moved = await client.patch(f"/api/applications/{first}", json={"stage": "Portfolio review"})
+        assert moved.json()["stage"] == "Portfolio review"
+        
+        # One disallowed move fails the whole batch
+        bulk = await client.patch("/api/applications/bulk", json={"moves": [
+            {"id": first, "stage": "Hired"}, {"id": second, "stage": "Offer"},
+        ]})
+        assert bulk.status_code == 400
+        assert (await client.get(f"/api/applications/{first}")).json()["stage"] == "Portfolio review"
+        by_stage = await client.patch("/api/applications/bulk", json={
+            "job_id": job_id, "from_stage": "Applied", "to_stage": "Screening",
+        })
+        assert by_stage.status_code == 400
+        
+        listed = await client.get("/api/applications", params={"job_id": job_id, "stage": "Portfolio review"})
+        assert sorted(a["id"] for a in listed.json()) == sorted([first, created.json()["id"]])
+    
+    @pytest.mark.asyncio
+    async def test_stage_holding_applications_cannot_be_dropped(self, client):
+        """Test redefining a pipeline keeps stages in use, and restoring the default pipeline."""
+        import uuid
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "Redefined Job", "department": "Sales", "location": "Berlin", "job_type": "Full-time",
+        })).json()["id"]
+        await client.put(f"/api/jobs/{job_id}/stages", json={"stages": ["Applied", "Call", "Hired"]})
+        candidate_id = (await client.post("/api/candidates", json={
+            "name": "Redefined", "email": f"redefined_{uuid.uuid4().hex}@test.com",
+            "role": "Account Executive", "source": "LinkedIn",
+        })).json()["id"]
+        application_id = (await client.post("/api/applications", json={
+            "candidate_id": candidate_id, "job_id": job_id, "stage": "Call",
+        })).json()["id"]
+        
+        dropped = await client.put(f"/api/jobs/{job_id}/stages", json={"stages": ["Applied", "Hired"]})
+        assert dropped.status_code == 400
+        assert (await client.get(f"/api/jobs/{job_id}/stages")).json()["stages"] == ["Applied", "Call", "Hired"]
+        
+        await client.patch(f"/api/applications/{application_id}", json={"stage": "Applied"})
+        restored = await client.put(f"/api/jobs/{job_id}/stages", json={"stages": [
+            "Applied", "Screening", "Interview", "Offer", "Hired", "Rejected",
+        ]})
+        assert restored.json()["is_default"] is True
+        assert (await client.get(f"/api/jobs/{job_id}/stages")).json() == restored.json()
+        
+        duplicate = await client.put(f"/api/jobs/{job_id}/stages", json={"stages": ["Applied", "Applied"]})
+        assert duplicate.status_code == 422
+        missing = await client.put(f"/api/jobs/{uuid.uuid4()}/stages", json={"stages": ["Applied"]})
+        assert missing.status_code == 404
+
+
+class TestApplicationHistory:
+    """Test the append-only application stage event log and its stream."""
+    
+    @pytest.mark.asyncio
+    async def test_stage_changes_are_logged_and_streamed(self, client):
+        """Test creation, single and bulk moves each log one event per changed application."""
+        import csv
+        import io
+        import json
+        import uuid
+        
+        email = f"history_{uuid.uuid4().hex}@test.com"
+        user = (await client.post("/api/auth/register", json={
+            "email": email, "password": "history-pass", "full_name": "History User",
+        })).json()
+        login = await client.post("/api/auth/login", data={"username": email, "password": "history-pass"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        job_id = (await client.post("/api/jobs", json={
+            "title": "History Job", "department": "HR", "location": "Remote", "job_type": "Full-time",
+        })).json()["id"]
+        await client.put(f"/api/jobs/{job_id}/stages", json={
+            "stages": ["Applied", "Screening", "Take-home", "Rejected"],
+        })
+        application_ids = []
+        for n in range(2):
+            candidate_id = (await client.post("/api/candidates", json={
+                "name": f"History {n}", "email": f"history_{uuid.uuid4().hex}@test.com",
+                "role": "Developer", "source": "CareerPage",
+            })).json()["id"]
+            application_ids.append((await client.post("/api/applications", json={
+                "candidate_id": candidate_id, "job_id": job_id,
+            })).json()["id"])
+        first, second = application_ids
+        
+        for _ in range(2):  # the repeat is not a move
+            await client.patch(f"/api/applications/{first}", json={"stage": "Screening"}, headers=headers)
+        await client.patch("/api/applications/bulk", json={"moves": [
+            {"id": first, "stage": "Take-home"}, {"id": second, "stage": "Applied"},
+        ]})
+        await client.patch("/api/applications/bulk", json={
+            "job_id": job_id, "from_stage": "Applied", "to_stage": "Rejected",
+        })
+        
+        response = await client.get(f"/api/jobs/{job_id}/history")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [(e["application_id"], e["from_stage"], e["to_stage"]) for e in events] == [
+            (first, None, "Applied"),
+            (second, None, "Applied"),
+            (first, "Applied", "Screening"),
+            (first, "Screening", "Take-home"),
+            (second, "Applied", "Rejected"),
+        ]
+        assert [e["actor_id"] for e in events] == [None, None, user["id"], None, None]
+        
+        since = events[2]["occurred_at"]
+        exported = await client.get(f"/api/jobs/{job_id}/history", params={"format": "csv", "since": since})
+        rows = list(csv.DictReader(io.StringIO(exported.text)))
+        assert [row["to_stage"] for row in rows] == ["Screening", "Take-home", "Rejected"]
+        
+        missing = await client.get(f"/api/jobs/{uuid.uuid4()}/history")
+        assert missing.status_code == 404
+
+
+class TestStartup:
+    """Test the production startup path: schema revision check and pool warm-up."""
+    
+    @pytest.mark.asyncio
+    async def test_verify_requires_migration_head(self):
+        """Test verify startup refuses a database not at the Alembic head, and passes once it is."""
+        import os
+        import tempfile
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from app.database import SchemaRevisionError, migration_heads, verify_db
+        
+        # A scratch database, so the shared one's alembic_version is never touched
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'verify.db')}")
+            try:
+                with pytest.raises(SchemaRevisionError, match="no Alembic revision"):
+                    await verify_db(scratch)
+                async with scratch.begin() as conn:
+                    await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+                    await conn.execute(text("INSERT INTO alembic_version VALUES ('0000000000')"))
+                with pytest.raises(SchemaRevisionError, match="expected"):
+                    await verify_db(scratch)
+                async with scratch.begin() as conn:
+                    await conn.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": migration_heads().pop()})
+                await verify_db(scratch)
+            finally:
+                await scratch.dispose()
+    
+    def test_migration_heads_match_alembic(self):
+        """Test the parsed migration heads agree with Alembic's own script graph."""
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+        from app.database import MIGRATIONS_DIR, migration_heads
+        
+        config = Config()
+        config.set_main_option("script_location", str(MIGRATIONS_DIR.parent))
+        assert migration_heads() == set(ScriptDirectory.from_config(config).get_heads())
+    
+    @pytest.mark.asyncio
+    async def test_warm_pools_fills_stage_cache(self):
+        """Test warming up caches the default stage codes before any request."""
+        from app.database import warm_pools
+        from app.services import stages
+        
+        stages._stage_codes.clear()
+        await warm_pools()
+        assert set(stages.DEFAULT_PIPELINE_STAGES) <= set(stages._stage_codes)
+
+
+class TestRequestMetrics:
+    """Test per-request timing: Server-Timing headers and the /metrics endpoint."""
+    
+    @pytest.mark.asyncio
+    async def test_server_timing_counts_statements(self, client):
+        """Test the Server-Timing header reports the request's DB time and statement count."""
+        import re
+        
+        await client.get("/api/jobs?limit=5")
+        with recorded_statements() as statements:
+            response = await client.get("/api/jobs?limit=5")
+        assert response.status_code == 200
+        timing = response.headers["server-timing"]
+        assert re.match(r"app;dur=[\d.]+, db;dur=[\d.]+;desc=\"(\d+) statements\", pool;dur=[\d.]+$", timing)
+        assert f'desc="{len(statements)} statements"' in timing
+    
+    @pytest.mark.asyncio
+    async def test_metrics_are_labelled_by_route_template(self, client):
+        """Test /metrics reports requests by route template and status, with histograms and pool gauges."""
+        import uuid
+        from app.metrics import request_metrics
+        
+        request_metrics.reset()
+        job_id = uuid.uuid4()
+        assert (await client.get(f"/api/jobs/{job_id}")).status_code == 404
+        assert (await client.get("/api/no-such-route")).status_code == 404
+        
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'mettle_http_requests_total{method="GET",route="/api/jobs/{job_id}",status="404"} 1' in body
+        assert 'mettle_http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+        assert str(job_id) not in body
+        assert 'mettle_http_request_duration_seconds_bucket{method="GET",route="/api/jobs/{job_id}",le="+Inf"} 1' in body
+        assert 'mettle_http_request_db_statements_count{method="GET",route="/api/jobs/{job_id}"} 1' in body
+        assert 'mettle_db_pool_checkouts_total{pool="primary"}' in body
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket whose bound they do not exceed."""
+        from app.metrics import Histogram
+        
+        histogram = Histogram((1, 5, 10))
+        for value in (0, 1, 2, 5, 7, 50):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [(1, 2), (5, 4), (10, 5), ("+Inf", 6)]
+        assert histogram.sum == 65
+
+
+class TestQueryGuard:
+    """Test the N+1 and slow query guard and the query_budget fixture."""
+    
+    def test_fingerprint_ignores_values(self):
+        """Test statements differing only in literals, binds or IN list length share a shape."""
+        from app.query_guard import fingerprint
+        
+        assert fingerprint("SELECT * FROM jobs WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM jobs WHERE id IN (?)")
+        assert fingerprint("SELECT * FROM jobs WHERE title = 'a' LIMIT 10") == "SELECT * FROM jobs WHERE title = ? LIMIT ?"
+        assert fingerprint("SELECT $1, $2 FROM anon_1") == "SELECT ?, ? FROM anon_1"
+        assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?)"
+    
+    @pytest.mark.asyncio
+    async def test_routes_within_budget(self, client, query_budget):
+        """Test a job's create, read and application stay within a declared statement budget."""
+        import time
+        
+        await intern_stages("Applied")
+        with query_budget(5) as requests:
+            job = (await client.post("/api/jobs", json={
+                "title": "Budget Job", "department": "Engineering", "location": "Remote", "job_type": "Full-time"
+            })).json()
+            candidate = (await client.post("/api/candidates", json={
+                "name": "Budget", "email": f"budget_{time.time()}@test.com", "role": "Developer", "source": "GitHub"
+            })).json()
+            await client.post("/api/applications", json={"candidate_id": candidate["id"], "job_id": job["id"]})
+            await client.get(f"/api/jobs/{job['id']}")
+        assert [str(request) for request in requests] == [
+            "POST /api/jobs", "POST /api/candidates", "POST /api/applications", "GET /api/jobs/{job_id}",
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_budget_failure_names_route(self, client, query_budget):
+        """Test exceeding the budget fails the test with the route and its statement count."""
+        import uuid
+        
+        with pytest.raises(pytest.fail.Exception, match=r"GET /api/jobs/\{job_id\} ran 1 statements \(budget 0\)"):
+            with query_budget(0):
+                await client.get(f"/api/jobs/{uuid.uuid4()}")
+    
+    def test_repeated_shapes_are_flagged(self, caplog):
+        """Test a statement shape repeated past the threshold is logged as a possible N+1."""
+        from app.query_guard import QueryGuard, RequestQueries, fingerprint
+        
+        guard = QueryGuard(enabled=True, repeat_threshold=2)
+        queries = RequestQueries("GET", "/api/jobs/{job_id}")
+        for n in range(3):
+            queries.shapes[fingerprint(f"SELECT * FROM applications WHERE job_id = {n}")] += 1
+        queries.shapes[fingerprint("SELECT * FROM jobs")] += 1
+        with caplog.at_level("WARNING", logger="app.query_guard"):
+            guard.finish(queries)
+        assert len(caplog.records) == 1
+        assert "Possible N+1 in GET /api/jobs/{job_id}: ran 3 times: SELECT * FROM applications WHERE job_id = ?" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_slow_queries_are_logged_with_plan(self, client, caplog):
+        """Test statements over the slow query budget are logged with their EXPLAIN plan."""
+        import uuid
+        from app.query_guard import query_guard
+        
+        slow_query_ms = query_guard.slow_query_ms
+        query_guard.slow_query_ms = -1
+        try:
+            with caplog.at_level("WARNING", logger="app.query_guard"):
+                assert (await client.get(f"/api/jobs/{uuid.uuid4()}")).status_code == 404
+        finally:
+            query_guard.slow_query_ms = slow_query_ms
+        slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+        assert slow and all("in GET /api/jobs/{job_id}:" in message for message in slow)
+        assert any("SCAN" in message or "SEARCH" in message for message in slow), slow
+        assert not any("EXPLAIN failed" in message for message in slow), slow
+
+
+class TestCursorPagination:
+    """Test keyset (cursor) pagination on list endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_application_pages_follow_cursors(self, client):
+        """Walk a job's applications forward and back using cursor headers."""
+        import time
+        
+        job_response = await client.post("/api/jobs", json={
+            "title": "Pagination Test Job",
+            "department": "Engineering",
+            "location": "Remote",
+            "job_type": "Full-time"
+        })
+        assert job_response.status_code == 201
+        job_id = job_response.json()["id"]
+        
+        for i in range(3):
+            candidate_response = await client.post("/api/candidates", json={
+                "name": f"Pagination Candidate {i}",
+                "email": f"page_{i}_{time.time()}@test.com",
+                "role": "Developer",
+                "source": "GitHub"
+            })
+            assert candidate_response.status_code == 201
+            app_response = await client.post("/api/applications", json={
+                "candidate_id": candidate_response.json()["id"],
+                "job_id": job_id
+            })
+            assert app_response.status_code == 201
+        
+        first = await client.get(f"/api/applications?job_id={job_id}&limit=2")
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+        assert "X-Prev-Cursor" not in first.headers
+        
+        second = await client.get(
+            f"/api/applications?job_id={job_id}&limit=2&cursor={first.headers['X-Next-Cursor']}"
+        )
+        assert second.status_code == 200
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+        
+        back = await client.get(
+            f"/api/applications?job_id={job_id}&limit=2&cursor={second.headers['X-Prev-Cursor']}"
+        )
+        assert [a["id"] for a in back.json()] == [a["id"] for a in first.json()]
+        
+        seen = {a["id"] for a in first.json()} | {a["id"] for a in second.json()}
+        assert len(seen) == 3
+    
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_rejected(self, client):
+        """Test that a malformed cursor returns 400."""
+        response = await client.get("/api/candidates?cursor=not-a-cursor")
+        assert response.status_code == 400